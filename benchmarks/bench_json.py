@@ -0,0 +1,148 @@
+"""
+JSON response benchmark: serialization time and bytes on the wire.
+
+Serializes synthetic payloads shaped like the largest list endpoints (documents with
+extracted_data blobs, audit log pages, reconciliation batch details) with Flask's
+default provider and with the orjson provider, then reports the response size
+uncompressed, gzipped and (if the brotli package is installed) brotli-compressed.
+
+    python benchmarks/bench_json.py [--documents 2000] [--repeat 5]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("AUDIT_WRITER_MODE", "inline")
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.micro_automator.responses import OrjsonProvider, brotli, orjson
+
+
+def make_payloads(documents, seed=7):
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    docs = [
+        {
+            "id": i,
+            "filename": f"policy_schedule_{i}.pdf",
+            "upload_date": (started + timedelta(minutes=i)).isoformat(),
+            "extracted_data": {
+                "name": rng.choice(["Priya Sharma", "Rahul Verma", "Anita Desai"]),
+                "dob": "1988-04-12",
+                "policyId": f"TRTL-LIFE-{rng.randint(1000, 9999)}",
+                "policyType": "SecureLife Term Plan",
+                "premiumAmount": round(rng.uniform(5000, 50000), 2),
+                "premiumFrequency": "Yearly",
+                "expirationDate": "2031-04-12",
+            },
+            "ai_summary": "Policy schedule for a term life plan with annual premium and nominee details. "
+            * 3,
+            "ai_category": "New Policy Document",
+            "ai_sentiment": "Neutral",
+            "ai_action_items": [
+                "Verify nominee",
+                "Collect KYC documents",
+                "Schedule renewal call",
+            ],
+        }
+        for i in range(documents)
+    ]
+    audits = {
+        "items": [
+            {
+                "id": i,
+                "eventType": rng.choice(
+                    ["client_created", "document_processed", "reminder_sent"]
+                ),
+                "details": {"clientId": rng.randint(1, 500), "source": "api"},
+                "timestamp": started + timedelta(seconds=i),
+            }
+            for i in range(1000)
+        ],
+        "nextCursor": "MjAyNC0wMS0wMVQwMDoxNjo0MHwxMDAw",
+    }
+    transactions = [
+        {
+            "id": i,
+            "source": "bank_statement",
+            "date": "2024-03-01",
+            "amount": round(rng.uniform(100, 90000), 2),
+            "referenceId": f"UTR{rng.randint(10**9, 10**10)}",
+            "description": "UPI/P-SHARMA/premium",
+            "status": "unmatched",
+            "matchId": None,
+        }
+        for i in range(5000)
+    ]
+    batch = {
+        "batchId": 1,
+        "timestamp": started,
+        "status": "completed",
+        "matchedCount": 1200,
+        "exceptions": {"bank": transactions[:2500], "policy": transactions[2500:]},
+    }
+    return {"documents": docs, "audit page": audits, "batch details": batch}
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {"default (json)": DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+    else:
+        print("orjson is not installed; only the default provider is measured.")
+
+    for name, payload in make_payloads(args.documents).items():
+        print(f"{name}:")
+        body = None
+        with app.test_request_context():
+            for provider_name, provider in providers.items():
+                ms, response = best_of(
+                    lambda p=provider, o=payload: p.response(o), args.repeat
+                )
+                body = response.get_data()
+                print(f"  serialize  {provider_name:<16} {ms:8.1f} ms")
+
+        gzip_ms, gzipped = best_of(
+            lambda b=body: gzip.compress(b, compresslevel=6, mtime=0), args.repeat
+        )
+        print(f"  wire       identity         {len(body) / 1024:8.0f} KB")
+        print(
+            f"  wire       gzip -6          {len(gzipped) / 1024:8.0f} KB  ({gzip_ms:.1f} ms)"
+        )
+        if brotli is not None:
+            br_ms, compressed = best_of(
+                lambda b=body: brotli.compress(b, quality=4), args.repeat
+            )
+            print(
+                f"  wire       brotli q4        {len(compressed) / 1024:8.0f} KB  ({br_ms:.1f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+End-to-end load tests: seeded databases, stubbed Gemini/Tesseract, mixed traffic
+against every blueprint, and p50/p95/p99 per endpoint saved as JSON.
+
+    python -m benchmarks.loadtest run --clients 2000 --concurrency 16 --duration 60
+    python -m benchmarks.loadtest compare results/base.json results/new.json
+"""
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+
+from . import __doc__ as DESCRIPTION
+from .runner import compare, run_load, write_results
+
+
+def _prepare_database(args):
+    """Points the app at --database-url (default: a fresh temporary SQLite file) and seeds it."""
+    url = (
+        args.database_url
+        or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'loadtest.db')}"
+    )
+    # create_app reads DATABASE_URL from the environment
+    os.environ["DATABASE_URL"] = url
+
+    from src.micro_automator.app import create_app
+    from src.micro_automator.extensions import db
+
+    from .seed import seed_database
+
+    app = create_app()
+    # Uploaded photos from documents.process go to a throwaway folder
+    app.config["UPLOAD_FOLDER"] = tempfile.mkdtemp(prefix="loadtest-uploads-")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        report = seed_database(args.clients, seed=args.seed)
+        db.session.remove()
+    print(f"Seeded {url} in {report['seconds']} s: {json.dumps(report['plan'])}")
+    return app
+
+
+def seed_command(args):
+    _prepare_database(args)
+
+
+def run_command(args):
+    from .scenarios import TrafficMix
+    from .stubs import install_stubs, use_stubbed_extraction
+
+    server = None
+    target = args.target
+    if not target:
+        from werkzeug.serving import make_server
+
+        install_stubs(
+            args.llm_latency_ms, args.ocr_latency_ms, args.jitter_ms, seed=args.seed
+        )
+        app = use_stubbed_extraction(_prepare_database(args))
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        target = f"http://127.0.0.1:{server.server_port}"
+        print(f"Serving the stubbed app in-process at {target}")
+
+    mix = TrafficMix(args.clients)
+    print(
+        f"Running {args.concurrency} workers for {args.duration:.0f} s against {target} ..."
+    )
+    results = run_load(
+        target, mix, args.concurrency, args.duration, args.requests, seed=args.seed
+    )
+    results["meta"].update(
+        clients=args.clients,
+        llmLatencyMs=args.llm_latency_ms,
+        ocrLatencyMs=args.ocr_latency_ms,
+    )
+    if server:
+        server.shutdown()
+
+    print(
+        f"\n{'endpoint':<26} {'reqs':>6} {'err':>4} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for name, row in list(results["endpoints"].items()) + [("TOTAL", results["total"])]:
+        print(
+            f"{name:<26} {row['requests']:>6} {row['errors']:>4} {row['throughputRps']:>7} "
+            f"{row['p50Ms']:>8} {row['p95Ms']:>8} {row['p99Ms']:>8}"
+        )
+
+    output = args.output or os.path.join(
+        "results", f"loadtest-{results['meta']['gitCommit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    write_results(results, output)
+    print(f"\nResults written to {output}")
+
+
+def compare_command(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold, args.metric)
+
+    print(f"{'endpoint':<26} {'before':>9} {'after':>9} {'change':>8}")
+    for name, before, after, change in rows:
+        change_text = f"{change:+.0%}" if change is not None else "new"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(
+            f"{name:<26} {before if before is not None else '-':>9} {after:>9} {change_text:>8}{flag}"
+        )
+    if regressions:
+        print(
+            f"\n{len(regressions)} endpoint(s) regressed by more than {args.threshold:.0%} on {args.metric}."
+        )
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadtest",
+        description=DESCRIPTION,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_seed_options(command):
+        command.add_argument(
+            "--database-url",
+            help="SQLite or PostgreSQL URL; its tables are dropped and reseeded.",
+        )
+        command.add_argument(
+            "--clients",
+            type=int,
+            default=2000,
+            help="Scale; other tables grow with it.",
+        )
+        command.add_argument("--seed", type=int, default=1)
+
+    seed = commands.add_parser(
+        "seed", help="Create the schema and seed load-test data."
+    )
+    add_seed_options(seed)
+    seed.set_defaults(func=seed_command)
+
+    run = commands.add_parser(
+        "run", help="Drive mixed traffic and record latency per endpoint."
+    )
+    add_seed_options(run)
+    run.add_argument(
+        "--target",
+        help="Base URL of an already seeded, stubbed server. "
+        "Without it the stubbed app is seeded and served in-process.",
+    )
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--duration", type=float, default=30.0, help="Seconds to run.")
+    run.add_argument(
+        "--requests", type=int, default=None, help="Stop after this many requests."
+    )
+    run.add_argument("--llm-latency-ms", type=float, default=800)
+    run.add_argument("--ocr-latency-ms", type=float, default=300)
+    run.add_argument("--jitter-ms", type=float, default=100)
+    run.add_argument(
+        "--output", help="Results JSON path (default: results/loadtest-<commit>.json)."
+    )
+    run.set_defaults(func=run_command)
+
+    comparison = commands.add_parser(
+        "compare", help="Compare two result files and flag regressions."
+    )
+    comparison.add_argument("baseline")
+    comparison.add_argument("current")
+    comparison.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed growth, e.g. 0.2 = 20%%."
+    )
+    comparison.add_argument(
+        "--metric", default="p95Ms", choices=("p50Ms", "p95Ms", "p99Ms", "meanMs")
+    )
+    comparison.set_defaults(func=compare_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Drives a TrafficMix against a running server and summarizes latency per endpoint.
+"""
+
+import http.client
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import UTC, datetime
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _Connection:
+    """One keep-alive connection per worker, reopened whenever the server closes it."""
+
+    def __init__(self, target, timeout):
+        parts = urlsplit(target)
+        self.cls = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self.conn = None
+
+    def send(self, request):
+        headers = {"Accept-Encoding": "gzip"}
+        if request.content_type:
+            headers["Content-Type"] = request.content_type
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = self.cls(self.netloc, timeout=self.timeout)
+            try:
+                self.conn.request(
+                    request.method, request.path, body=request.body, headers=headers
+                )
+                response = self.conn.getresponse()
+                body = response.read()
+                if response.will_close:
+                    self.close()
+                return response.status, len(body)
+            except (
+                http.client.RemoteDisconnected,
+                ConnectionResetError,
+                BrokenPipeError,
+            ):
+                # A stale keep-alive connection; retry once on a fresh one
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_load(
+    target, mix, concurrency=8, duration=30.0, max_requests=None, seed=0, timeout=120
+):
+    """
+    Sends requests from `concurrency` threads until `duration` seconds have passed (or
+    `max_requests` were sent). Returns a results dict ready to be written as JSON.
+    """
+    samples = {}
+    lock = threading.Lock()
+    sent = [0]
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        conn = _Connection(target, timeout)
+        local = {}
+        try:
+            while time.monotonic() < deadline:
+                with lock:
+                    if max_requests is not None and sent[0] >= max_requests:
+                        break
+                    sent[0] += 1
+                request = mix.next(rng)
+                started = time.perf_counter()
+                try:
+                    status, size = conn.send(request)
+                except OSError:
+                    status, size = 0, 0
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                local.setdefault(request.name, []).append((elapsed_ms, status, size))
+        finally:
+            conn.close()
+            with lock:
+                for name, rows in local.items():
+                    samples.setdefault(name, []).extend(rows)
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(i,), daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "target": target,
+            "concurrency": concurrency,
+            "durationSeconds": round(wall, 2),
+            "startedAt": datetime.now(UTC).isoformat(),
+            "gitCommit": _git_commit(),
+            "python": platform.python_version(),
+        },
+        "total": _summarize([row for rows in samples.values() for row in rows], wall),
+        "endpoints": {
+            name: _summarize(rows, wall) for name, rows in sorted(samples.items())
+        },
+    }
+
+
+def _summarize(rows, wall):
+    latencies = sorted(row[0] for row in rows)
+    errors = sum(1 for _, status, _ in rows if status == 0 or status >= 500)
+    return {
+        "requests": len(rows),
+        "errors": errors,
+        "throughputRps": round(len(rows) / wall, 2) if wall else None,
+        "p50Ms": _round(percentile(latencies, 50)),
+        "p95Ms": _round(percentile(latencies, 95)),
+        "p99Ms": _round(percentile(latencies, 99)),
+        "meanMs": _round(sum(latencies) / len(latencies)) if latencies else None,
+        "maxMs": _round(latencies[-1]) if latencies else None,
+        "meanBytes": round(sum(row[2] for row in rows) / len(rows)) if rows else None,
+    }
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold=0.2, metric="p95Ms"):
+    """
+    Lists endpoints whose `metric` grew by more than `threshold` (a fraction) or whose
+    error count went up. Returns (rows, regressions).
+    """
+    rows, regressions = [], []
+    for name, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if not before or before[metric] is None or now[metric] is None:
+            rows.append((name, None, now[metric], None))
+            continue
+        change = (
+            (now[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        )
+        rows.append((name, before[metric], now[metric], change))
+        if change > threshold or now["errors"] > before["errors"]:
+            regressions.append(name)
+    return rows, regressions
+
+
+def write_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,278 @@
+"""
+Weighted traffic mix covering every blueprint.
+
+Each scenario returns a Request for the runner to send. Row ids are drawn from the
+ranges that seed_plan() produces, so the mix assumes a freshly seeded database.
+"""
+
+import io
+import itertools
+import json
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from typing import NamedTuple
+from urllib.parse import quote
+
+from .seed import LAST_NAMES, seed_plan
+
+
+class Request(NamedTuple):
+    name: str
+    method: str
+    path: str
+    body: bytes = None
+    content_type: str = None
+
+
+# Repeats and rephrasings, as real users ask them, so the answer cache sees realistic hits
+CHATBOT_QUESTIONS = (
+    "How do I add a new client?",
+    "how do i add a new client",
+    "How can I add new clients?",
+    "How do I upload a PAN card?",
+    "Where do I see follow-ups?",
+    "How does reconciliation work?",
+    "Can I upload an Aadhaar card?",
+    "What does the dashboard show?",
+)
+
+
+def _json(name, method, path, payload):
+    return Request(name, method, path, json.dumps(payload).encode(), "application/json")
+
+
+def _multipart(name, path, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for field, (filename, content_type, data) in (
+        files.items() if isinstance(files, dict) else files
+    ):
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode()
+            + data
+            + b"\r\n"
+        )
+    body = b"".join(parts) + f"--{boundary}--\r\n".encode()
+    return Request(
+        name, "POST", path, body, f"multipart/form-data; boundary={boundary}"
+    )
+
+
+def _png():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (320, 200), (240, 240, 240)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _statement_pdf(rows):
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page()
+    text = "\n".join(
+        f"{day} {amount:.2f} {reference} {description}"
+        for day, amount, reference, description in rows
+    )
+    page.insert_text((40, 60), text, fontsize=9)
+    return doc.tobytes()
+
+
+class TrafficMix:
+    """Picks scenarios by weight; one instance is shared by all worker threads."""
+
+    def __init__(self, clients):
+        self.plan = seed_plan(clients)
+        self._counter = itertools.count()
+        self._png = _png()
+        today = date.today()
+        rows = [
+            (
+                (today - timedelta(days=i)).isoformat(),
+                1000 + i * 250,
+                f"POL-{9000 + i}",
+                f"Premium {i}",
+            )
+            for i in range(20)
+        ]
+        self._bank_pdf = _statement_pdf(rows)
+        self._policy_pdf = _statement_pdf(rows[::2])
+
+        self.scenarios = [
+            (10, self.clients_list),
+            (5, self.clients_search),
+            (2, self.clients_create),
+            (2, self.follow_up_create),
+            (10, self.dashboard_snapshot),
+            (3, self.dashboard_stats),
+            (3, self.documents_list),
+            (2, self.documents_filtered),
+            (2, self.document_detail),
+            (3, self.documents_search),
+            (1, self.documents_process),
+            (1, self.documents_process_bulk),
+            (5, self.audits_page),
+            (2, self.audits_filtered),
+            (3, self.batch_details),
+            (1, self.reconciliation_run),
+            (2, self.chatbot_ask),
+            (1, self.chatbot_stream),
+            (2, self.send_reminder),
+        ]
+        self._weights = list(
+            itertools.accumulate(weight for weight, _ in self.scenarios)
+        )
+
+    def next(self, rng):
+        _, scenario = self.scenarios[
+            rng.choices(range(len(self.scenarios)), cum_weights=self._weights)[0]
+        ]
+        return scenario(rng)
+
+    def _client_id(self, rng):
+        return rng.randint(1, self.plan["clients"])
+
+    # --- Scenarios ---
+
+    def clients_list(self, rng):
+        return Request("clients.list", "GET", "/api/clients/")
+
+    def clients_search(self, rng):
+        return Request(
+            "clients.search", "GET", f"/api/clients/?search={rng.choice(LAST_NAMES)}"
+        )
+
+    def clients_create(self, rng):
+        return _json(
+            "clients.create",
+            "POST",
+            "/api/clients/",
+            {
+                "name": f"Load Test {uuid.uuid4().hex[:12]}",
+                "email": "lt@example.com",
+                "status": "Prospective",
+            },
+        )
+
+    def follow_up_create(self, rng):
+        due = (
+            datetime.now(UTC).replace(tzinfo=None) + timedelta(days=rng.randint(1, 30))
+        ).isoformat()
+        return _json(
+            "clients.follow_up",
+            "POST",
+            f"/api/clients/{self._client_id(rng)}/follow-ups",
+            {
+                "dueDate": due,
+                "type": rng.choice(("Call", "Text")),
+                "notes": "Load test",
+            },
+        )
+
+    def dashboard_snapshot(self, rng):
+        return Request("dashboard.snapshot", "GET", "/api/dashboard/snapshot")
+
+    def dashboard_stats(self, rng):
+        return Request("dashboard.stats", "GET", "/api/dashboard/stats")
+
+    def documents_list(self, rng):
+        return Request("documents.list", "GET", "/api/documents/")
+
+    def documents_filtered(self, rng):
+        category = rng.choice(("New Policy Document", "Policy Renewal", "KYC Document"))
+        return Request(
+            "documents.filtered",
+            "GET",
+            f"/api/documents/?category={quote(category)}&limit=20",
+        )
+
+    def document_detail(self, rng):
+        return Request(
+            "documents.detail",
+            "GET",
+            f"/api/documents/{rng.randint(1, self.plan['documents'])}",
+        )
+
+    def documents_search(self, rng):
+        query = (
+            f"TRTL-LIFE-{rng.randint(1, self.plan['documents']):06d}"
+            if rng.random() < 0.5
+            else "grace period"
+        )
+        return Request(
+            "documents.search", "GET", f"/api/documents/search?q={quote(query)}"
+        )
+
+    def documents_process(self, rng):
+        return _multipart(
+            "documents.process",
+            "/api/documents/process",
+            {"document": (f"kit_{next(self._counter)}.png", "image/png", self._png)},
+        )
+
+    def documents_process_bulk(self, rng):
+        return _multipart(
+            "documents.process_bulk",
+            "/api/documents/process-bulk",
+            [
+                (
+                    "documents",
+                    (f"kit_{next(self._counter)}.png", "image/png", self._png),
+                )
+                for _ in range(3)
+            ],
+        )
+
+    def audits_page(self, rng):
+        return Request("audits.page", "GET", "/api/audits/?limit=100")
+
+    def audits_filtered(self, rng):
+        return Request(
+            "audits.filtered",
+            "GET",
+            "/api/audits/?eventType=client_created,login&limit=50",
+        )
+
+    def batch_details(self, rng):
+        return Request(
+            "reconciliation.batch",
+            "GET",
+            f"/api/reconciliation/batches/{rng.randint(1, self.plan['reconciliation_batches'])}",
+        )
+
+    def reconciliation_run(self, rng):
+        return _multipart(
+            "reconciliation.run",
+            "/api/reconciliation/run",
+            {
+                "bank_statement": ("bank.pdf", "application/pdf", self._bank_pdf),
+                "policy_log": ("policy.pdf", "application/pdf", self._policy_pdf),
+            },
+        )
+
+    def chatbot_ask(self, rng):
+        return _json(
+            "chatbot.ask",
+            "POST",
+            "/api/chatbot/ask",
+            {"question": rng.choice(CHATBOT_QUESTIONS)},
+        )
+
+    def chatbot_stream(self, rng):
+        return _json(
+            "chatbot.stream",
+            "POST",
+            "/api/chatbot/ask?stream=sse",
+            {"question": rng.choice(CHATBOT_QUESTIONS)},
+        )
+
+    def send_reminder(self, rng):
+        client_id = self._client_id(rng)
+        return _json(
+            "automation.send_reminder",
+            "POST",
+            "/api/automation/send_reminder",
+            {"name": f"Client {client_id}", "email": f"client{client_id}@example.com"},
+        )
@@ -0,0 +1,228 @@
+"""
+Seeds a database with realistic volumes for load testing.
+
+Everything scales with the number of clients. Ids are assigned in insertion order on
+an empty database, so traffic scenarios can address rows by id using seed_plan().
+"""
+
+import random
+import time
+from datetime import UTC, date, datetime, timedelta
+
+from src.micro_automator.extensions import db
+from src.micro_automator.models import (
+    AuditLog,
+    Client,
+    Document,
+    ReconciliationBatch,
+    Reminder,
+    Transaction,
+)
+from src.micro_automator.models.client import FollowUp, Form
+from src.micro_automator.search import reindex_documents
+
+FIRST_NAMES = (
+    "Priya",
+    "Rahul",
+    "Anita",
+    "Vikram",
+    "Sneha",
+    "Arjun",
+    "Kavya",
+    "Rohan",
+    "Meera",
+    "Aditya",
+)
+LAST_NAMES = (
+    "Sharma",
+    "Verma",
+    "Desai",
+    "Iyer",
+    "Reddy",
+    "Nair",
+    "Gupta",
+    "Khan",
+    "Patel",
+    "Singh",
+)
+POLICY_TYPES = (
+    "SecureLife Term Plan",
+    "HealthFirst Family Floater",
+    "WealthPlus ULIP",
+    "Motor Comprehensive",
+)
+FORM_TYPES = ("Aadhaar", "PAN", "Proposal Form")
+AUDIT_EVENTS = (
+    "client_created",
+    "document_processed",
+    "reminder_sent",
+    "follow_up_scheduled",
+    "login",
+)
+
+CHUNK_SIZE = 5000
+
+
+def seed_plan(clients):
+    """Row counts per table for a given scale."""
+    batches = max(1, clients // 200)
+    return {
+        "clients": clients,
+        "follow_ups": clients * 3,
+        "forms": clients * 2,
+        "documents": clients // 2,
+        "reminders": clients,
+        "audit_logs": clients * 20,
+        "reconciliation_batches": batches,
+        "transactions": batches * 200,
+    }
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(db.insert(model), rows[start : start + CHUNK_SIZE])
+
+
+def seed_database(clients=2000, seed=1):
+    """Bulk-inserts a full data set into an empty schema. Returns the plan and elapsed time."""
+    rng = random.Random(seed)
+    plan = seed_plan(clients)
+    now = datetime.now(UTC).replace(tzinfo=None, microsecond=0)
+    started = time.perf_counter()
+
+    _insert(
+        Client,
+        [
+            {
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+                "email": f"client{i}@example.com",
+                "phone": f"9{rng.randint(100000000, 999999999)}",
+                "status": rng.choice(("Prospective", "Engaged", "Active")),
+                "policy_type": rng.choice(POLICY_TYPES),
+                "policy_id": f"TRTL-LIFE-{i:06d}",
+                "premium_amount": round(rng.uniform(5000, 60000), 2),
+                "expiration_date": date.today() + timedelta(days=rng.randint(-30, 365)),
+                "last_contact": now - timedelta(days=rng.randint(0, 120)),
+            }
+            for i in range(1, clients + 1)
+        ],
+    )
+
+    _insert(
+        FollowUp,
+        [
+            {
+                "client_id": rng.randint(1, clients),
+                "due_date": now + timedelta(hours=rng.randint(-240, 240)),
+                "type": rng.choice(("Call", "Text")),
+                "notes": "Discuss renewal options",
+                "completed": rng.random() < 0.4,
+            }
+            for _ in range(plan["follow_ups"])
+        ],
+    )
+
+    _insert(
+        Form,
+        [
+            {
+                "client_id": rng.randint(1, clients),
+                "form_type": rng.choice(FORM_TYPES),
+                "status": "Uploaded",
+                "file_url": None,
+                "created_at": now - timedelta(days=rng.randint(0, 365)),
+            }
+            for _ in range(plan["forms"])
+        ],
+    )
+
+    _insert(
+        Document,
+        [
+            {
+                "filename": f"policy_schedule_{i}.pdf",
+                "client_id": i,
+                "extracted_text": (
+                    f"POLICY SCHEDULE\nPolicy Number: TRTL-LIFE-{i:06d}\nPolicyholder: Client {i}\n"
+                    f"Plan: {rng.choice(POLICY_TYPES)}\nNominee: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}\n"
+                    "Premium is payable yearly. The policy lapses if the premium is not paid within "
+                    "the grace period of 30 days.\n" * 3
+                ),
+                "upload_date": now - timedelta(minutes=i * 7),
+                "extracted_data": {
+                    "name": f"Client {i}",
+                    "dob": "1988-04-12",
+                    "policyId": f"TRTL-LIFE-{i:06d}",
+                    "policyType": rng.choice(POLICY_TYPES),
+                    "premiumAmount": round(rng.uniform(5000, 60000), 2),
+                    "premiumFrequency": "Yearly",
+                    "expirationDate": "2031-04-12",
+                },
+                "ai_summary": "Policy schedule for a term life plan with annual premium and nominee details.",
+                "ai_category": rng.choice(
+                    ("New Policy Document", "Policy Renewal", "KYC Document", "Other")
+                ),
+                "ai_sentiment": "Neutral",
+                "ai_action_items": ["Verify nominee", "Collect KYC documents"],
+            }
+            for i in range(1, plan["documents"] + 1)
+        ],
+    )
+
+    _insert(
+        Reminder,
+        [
+            {
+                "client_id": i,
+                "message": "Your policy is due for renewal.",
+                "due_at": now + timedelta(days=rng.randint(-5, 30)),
+                "status": rng.choice(("pending", "sent", "sent", "failed")),
+                "kind": "renewal",
+                "attempts": 0,
+            }
+            for i in range(1, clients + 1)
+        ],
+    )
+
+    _insert(
+        AuditLog,
+        [
+            {
+                "event_type": rng.choice(AUDIT_EVENTS),
+                "details": {"clientId": rng.randint(1, clients), "source": "api"},
+                "timestamp": now - timedelta(seconds=i * 37),
+            }
+            for i in range(plan["audit_logs"])
+        ],
+    )
+
+    _insert(
+        ReconciliationBatch,
+        [
+            {"timestamp": now - timedelta(days=i), "status": "Completed"}
+            for i in range(plan["reconciliation_batches"])
+        ],
+    )
+    transactions = []
+    for batch_id in range(1, plan["reconciliation_batches"] + 1):
+        for n in range(200):
+            matched = n < 140
+            transactions.append(
+                {
+                    "batch_id": batch_id,
+                    "source": "bank_statement" if n % 2 == 0 else "policy_log",
+                    "transaction_date": date.today()
+                    - timedelta(days=rng.randint(0, 60)),
+                    "amount": round(rng.uniform(100, 90000), 2),
+                    "reference_id": f"UTR{rng.randint(10**9, 10**10)}",
+                    "description": "UPI/P-SHARMA/premium",
+                    "status": "matched" if matched else "unmatched",
+                    "match_id": None,
+                }
+            )
+    _insert(Transaction, transactions)
+
+    db.session.commit()
+    # Bulk inserts bypass the ORM events that keep the search index current
+    reindex_documents(db.session)
+    return {"plan": plan, "seconds": round(time.perf_counter() - started, 2)}
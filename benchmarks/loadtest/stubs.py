@@ -0,0 +1,167 @@
+"""
+Deterministic local stand-ins for Gemini and Tesseract, with configurable latency.
+
+install_stubs() swaps them in before the app handles requests: the Gemini stub is
+installed through llm's cached module, so every get_model() call uses it, and
+pytesseract is replaced in sys.modules for the lazy import in extraction.py.
+use_stubbed_extraction(app) then keeps extraction in this process, where the stubs are.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+import types
+
+from src.micro_automator import llm
+
+TRANSACTION_LINE = re.compile(r"(\d{4}-\d{2}-\d{2})\s+([\d.]+)\s+(\S+)\s+(.+)")
+
+
+class Latency:
+    """Sleeps for `mean_ms` plus up to `jitter_ms`, from a seeded generator."""
+
+    def __init__(self, mean_ms=0, jitter_ms=0, seed=0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    def wait(self, fraction=1.0):
+        delay = (
+            self.mean_ms
+            + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        ) * fraction
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Answers the app's prompts with well-formed, prompt-dependent responses."""
+
+    def __init__(self, name, latency):
+        self.name = name
+        self.latency = latency
+
+    def generate_content(self, prompt, stream=False):
+        if stream:
+            return self._stream(prompt)
+        self.latency.wait()
+        return StubResponse(self._answer(prompt))
+
+    def _answer(self, prompt):
+        if "data extraction AI for an insurance agent" in prompt:
+            return json.dumps(self._document(prompt))
+        if "data entry clerk" in prompt:
+            return json.dumps(self._transactions(prompt))
+        if "reconcile two lists" in prompt:
+            return json.dumps({"matched_pairs": []})
+        return "You can add clients from the Clients page or by uploading a policy document."
+
+    def _stream(self, prompt):
+        # Like the real API, the first chunk arrives after a quarter of the full latency
+        words = self._answer(prompt).split(" ")
+        chunks = [
+            " ".join(words[i : i + 4]) + (" " if i + 4 < len(words) else "")
+            for i in range(0, len(words), 4)
+        ]
+        self.latency.wait(0.25)
+        for i, chunk in enumerate(chunks):
+            if i:
+                self.latency.wait(0.75 / (len(chunks) - 1))
+            yield StubResponse(chunk)
+
+    def _document(self, prompt):
+        n = int(hashlib.sha1(prompt.encode()).hexdigest()[:6], 16) % 500
+        return {
+            "extraction": {
+                "name": f"Loadtest Client {n}",
+                "dob": "1990-01-01",
+                "aadhaarNumber": None,
+                "panNumber": None,
+                "policyId": f"LT-{n:04d}",
+                "policyType": "SecureLife Term Plan",
+                "premiumAmount": 22222.0,
+                "premiumFrequency": "Yearly",
+                "expirationDate": "2030-12-31",
+            },
+            "analysis": {
+                "summary": "A policy schedule for a term plan.",
+                "category": "New Policy Document",
+            },
+        }
+
+    def _transactions(self, prompt):
+        return [
+            {
+                "transaction_date": day,
+                "amount": float(amount),
+                "reference_id": reference,
+                "description": description,
+            }
+            for day, amount, reference, description in TRANSACTION_LINE.findall(prompt)
+        ]
+
+
+def _stub_genai(latency):
+    module = types.ModuleType("google.generativeai")
+    module.GenerativeModel = lambda name, **kwargs: StubModel(name, latency)
+    module.configure = lambda **kwargs: None
+    return module
+
+
+def _stub_pytesseract(latency):
+    module = types.ModuleType("pytesseract")
+
+    def image_to_string(image, *args, **kwargs):
+        latency.wait()
+        return (
+            "Welcome Kit\nName: Loadtest Client\nPolicy Number: LT-0001\n"
+            "Premium: 22222.00 Yearly\nPolicy End Date: 2030-12-31\n"
+        )
+
+    module.image_to_string = image_to_string
+    return module
+
+
+def install_stubs(llm_latency_ms=800, ocr_latency_ms=300, jitter_ms=100, seed=0):
+    llm._genai = _stub_genai(Latency(llm_latency_ms, jitter_ms, seed))
+    sys.modules["pytesseract"] = _stub_pytesseract(
+        Latency(ocr_latency_ms, jitter_ms, seed + 1)
+    )
+
+
+def use_stubbed_extraction(app):
+    """
+    Moves the app's extract stage onto threads. The stubs only exist in this process,
+    and Config has read DOCUMENT_EXTRACT_EXECUTOR long before the stubs are installed,
+    so the stage is rebuilt from the app's config instead.
+    """
+    from src.micro_automator.extensions import document_pipeline
+
+    app.config["DOCUMENT_EXTRACT_EXECUTOR"] = "thread"
+    document_pipeline.init_app(app)
+    return app
+
+
+def create_loadtest_app():
+    """
+    App factory for serving the load-test target from gunicorn, e.g.
+    gunicorn --threads 16 'benchmarks.loadtest.stubs:create_loadtest_app()'
+    with LOADTEST_LLM_LATENCY_MS / LOADTEST_OCR_LATENCY_MS controlling stub latency.
+    """
+    from src.micro_automator.app import create_app
+
+    install_stubs(
+        llm_latency_ms=float(os.environ.get("LOADTEST_LLM_LATENCY_MS", "800")),
+        ocr_latency_ms=float(os.environ.get("LOADTEST_OCR_LATENCY_MS", "300")),
+        jitter_ms=float(os.environ.get("LOADTEST_JITTER_MS", "100")),
+    )
+    return use_stubbed_extraction(create_app())
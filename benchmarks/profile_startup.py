@@ -0,0 +1,122 @@
+"""
+Startup-time profile of the web app.
+
+Imports src.micro_automator.app in a fresh interpreter with `python -X importtime`
+and reports the slowest modules by cumulative import time, plus the total. Heavy
+modules that should only load on first use (see llm.HEAVY_MODULES) are flagged.
+
+    python benchmarks/profile_startup.py [--top 20] [--budget-ms 1500] [--json]
+
+With --budget-ms the script exits non-zero when the total exceeds the budget, so it
+can guard against startup regressions in CI.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.micro_automator.llm import HEAVY_MODULES
+
+TARGET = "src.micro_automator.app"
+
+
+def profile_imports(target=TARGET):
+    """
+    Returns (wall_ms, rows, heavy): rows are dicts of module, self_ms, cumulative_ms and
+    depth, and heavy lists the HEAVY_MODULES that were loaded.
+    """
+    env = dict(os.environ)
+    # A throwaway database keeps the profile independent of any real DATABASE_URL
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.setdefault("AUDIT_WRITER_MODE", "inline")
+    started = time.perf_counter()
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f'import sys, {target}; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))',
+        ],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {target} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    # The module list is the last line; libraries may print their own warnings before it
+    last_line = (result.stdout.strip().splitlines() or [""])[-1]
+    heavy = [m for m in last_line.split(",") if m in HEAVY_MODULES]
+    return wall_ms, rows, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    wall_ms, rows, heavy = profile_imports()
+    total = next((r["cumulative_ms"] for r in rows if r["module"] == TARGET), 0)
+    slowest = sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[: args.top]
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "totalImportMs": total,
+                    "wallMs": wall_ms,
+                    "heavyModulesLoaded": heavy,
+                    "modules": slowest,
+                },
+                indent=2,
+            )
+        )
+    else:
+        print(
+            f"Import of {TARGET}: {total:.0f} ms ({wall_ms:.0f} ms wall, including interpreter start)"
+        )
+        print(f"  {'cumulative':>10}  {'self':>8}  module")
+        for r in slowest:
+            print(
+                f"  {r['cumulative_ms']:8.1f}ms  {r['self_ms']:6.1f}ms  {'  ' * r['depth']}{r['module']}"
+            )
+        if heavy:
+            print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(
+            f"Startup import time {total:.0f} ms exceeds the {args.budget_ms:.0f} ms budget.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,14 @@ def get_metadata():
     return target_db.metadata
 
 
+# Full-text search objects are managed by src/micro_automator/search.py, not the models
+SEARCH_INDEX_OBJECTS = ('document_fts', 'search_vector', 'ix_document_search_vector')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and compare_to is None and (name or '').startswith(SEARCH_INDEX_OBJECTS))
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -93,6 +101,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
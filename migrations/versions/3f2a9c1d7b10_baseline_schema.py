@@ -0,0 +1,142 @@
+"""baseline schema
+
+Revision ID: 3f2a9c1d7b10
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f2a9c1d7b10"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by db.create_all() already have these tables, so only
+    # create the ones that are missing and let later revisions build on top.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "client" not in existing:
+        op.create_table(
+            "client",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=150), nullable=False),
+            sa.Column("email", sa.String(length=150), nullable=True),
+            sa.Column("phone", sa.String(length=50), nullable=True),
+            sa.Column("status", sa.String(length=50), nullable=True),
+            sa.Column("policy_type", sa.String(length=100), nullable=True),
+            sa.Column("policy_id", sa.String(length=100), nullable=True),
+            sa.Column("premium_amount", sa.Float(), nullable=True),
+            sa.Column("expiration_date", sa.Date(), nullable=True),
+            sa.Column("last_contact", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("name"),
+        )
+    if "document" not in existing:
+        op.create_table(
+            "document",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("filename", sa.String(length=255), nullable=False),
+            sa.Column("upload_date", sa.DateTime(), nullable=True),
+            sa.Column("extracted_data", sa.JSON(), nullable=True),
+            sa.Column("ai_summary", sa.Text(), nullable=True),
+            sa.Column("ai_category", sa.String(length=100), nullable=True),
+            sa.Column("ai_sentiment", sa.String(length=50), nullable=True),
+            sa.Column("ai_action_items", sa.JSON(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "reconciliation_batch" not in existing:
+        op.create_table(
+            "reconciliation_batch",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("timestamp", sa.DateTime(), nullable=True),
+            sa.Column("status", sa.String(length=50), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "audit_log" not in existing:
+        op.create_table(
+            "audit_log",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("event_type", sa.String(length=100), nullable=False),
+            sa.Column("details", sa.JSON(), nullable=True),
+            sa.Column("timestamp", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "follow_up" not in existing:
+        op.create_table(
+            "follow_up",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("client_id", sa.Integer(), nullable=False),
+            sa.Column("due_date", sa.DateTime(), nullable=False),
+            sa.Column("type", sa.String(length=50), nullable=False),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("completed", sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["client_id"],
+                ["client.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "form" not in existing:
+        op.create_table(
+            "form",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("client_id", sa.Integer(), nullable=False),
+            sa.Column("form_type", sa.String(length=100), nullable=False),
+            sa.Column("status", sa.String(length=50), nullable=True),
+            sa.Column("file_url", sa.String(length=512), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["client_id"],
+                ["client.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "reminder" not in existing:
+        op.create_table(
+            "reminder",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("client_id", sa.Integer(), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("due_at", sa.DateTime(), nullable=False),
+            sa.Column("status", sa.String(length=50), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["client_id"],
+                ["client.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "transaction" not in existing:
+        op.create_table(
+            "transaction",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("batch_id", sa.Integer(), nullable=False),
+            sa.Column("source", sa.String(length=50), nullable=False),
+            sa.Column("transaction_date", sa.Date(), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("reference_id", sa.String(length=255), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("status", sa.String(length=50), nullable=True),
+            sa.Column("match_id", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["batch_id"],
+                ["reconciliation_batch.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade():
+    op.drop_table("transaction")
+    op.drop_table("reminder")
+    op.drop_table("form")
+    op.drop_table("follow_up")
+    op.drop_table("audit_log")
+    op.drop_table("reconciliation_batch")
+    op.drop_table("document")
+    op.drop_table("client")
@@ -0,0 +1,38 @@
+"""audit log keyset indexes
+
+Revision ID: 8c4e2b7a9d21
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8c4e2b7a9d21"
+down_revision = "3f2a9c1d7b10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables created by db.create_all() may already carry the model's indexes
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("audit_log")}
+    with op.batch_alter_table("audit_log", schema=None) as batch_op:
+        if "ix_audit_log_timestamp_id" not in existing:
+            batch_op.create_index(
+                "ix_audit_log_timestamp_id", ["timestamp", "id"], unique=False
+            )
+        if "ix_audit_log_event_type_timestamp" not in existing:
+            batch_op.create_index(
+                "ix_audit_log_event_type_timestamp",
+                ["event_type", "timestamp", "id"],
+                unique=False,
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("audit_log", schema=None) as batch_op:
+        batch_op.drop_index("ix_audit_log_event_type_timestamp")
+        batch_op.drop_index("ix_audit_log_timestamp_id")
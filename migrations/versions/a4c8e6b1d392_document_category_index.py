@@ -0,0 +1,39 @@
+"""document category index
+
+Revision ID: a4c8e6b1d392
+Revises: f6d1b9e4a270
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4c8e6b1d392"
+down_revision = "f6d1b9e4a270"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables created by db.create_all() may already carry the model's indexes
+    if "ix_document_category_upload_date_id" in {
+        ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("document")
+    }:
+        return
+    columns = ["ai_category", "upload_date", "id"]
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_document_category_upload_date_id",
+                "document",
+                columns,
+                postgresql_concurrently=True,
+            )
+    else:
+        op.create_index("ix_document_category_upload_date_id", "document", columns)
+
+
+def downgrade():
+    op.drop_index("ix_document_category_upload_date_id", table_name="document")
@@ -0,0 +1,31 @@
+"""data version
+
+Revision ID: a4e8c2f61d90
+Revises: b9e2d4a6c713
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4e8c2f61d90"
+down_revision = "b9e2d4a6c713"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "data_version" not in sa.inspect(op.get_bind()).get_table_names():
+        table = op.create_table(
+            "data_version",
+            sa.Column("name", sa.String(length=50), nullable=False),
+            sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+        op.bulk_insert(table, [{"name": "dashboard", "version": 0}])
+
+
+def downgrade():
+    op.drop_table("data_version")
@@ -0,0 +1,51 @@
+"""reminder kind and unique (client_id, due_at, kind)
+
+Revision ID: b7d1e4f20a63
+Revises: 8c4e2b7a9d21
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7d1e4f20a63"
+down_revision = "8c4e2b7a9d21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("reminder")}
+    constraints = {uc["name"] for uc in inspector.get_unique_constraints("reminder")}
+
+    if "kind" not in columns:
+        with op.batch_alter_table("reminder", schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "kind",
+                    sa.String(length=50),
+                    nullable=False,
+                    server_default="renewal",
+                )
+            )
+
+    # Older reminders were de-duplicated by message text only; keep the first of each key
+    op.execute(
+        "DELETE FROM reminder WHERE id NOT IN "
+        "(SELECT MIN(id) FROM reminder GROUP BY client_id, due_at, kind)"
+    )
+
+    if "uq_reminder_client_due_kind" not in constraints:
+        with op.batch_alter_table("reminder", schema=None) as batch_op:
+            batch_op.create_unique_constraint(
+                "uq_reminder_client_due_kind", ["client_id", "due_at", "kind"]
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("reminder", schema=None) as batch_op:
+        batch_op.drop_constraint("uq_reminder_client_due_kind", type_="unique")
+        batch_op.drop_column("kind")
@@ -0,0 +1,30 @@
+"""client photo url
+
+Revision ID: b9e2d4a6c713
+Revises: c3f7a1d95e28
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b9e2d4a6c713"
+down_revision = "c3f7a1d95e28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("client")}
+    if "photo_url" not in columns:
+        with op.batch_alter_table("client", schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column("photo_url", sa.String(length=512), nullable=True)
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("client", schema=None) as batch_op:
+        batch_op.drop_column("photo_url")
@@ -0,0 +1,86 @@
+"""document client link, stored text and full-text search index
+
+Revision ID: c3f7a1d95e28
+Revises: a4c8e6b1d392
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3f7a1d95e28"
+down_revision = "a4c8e6b1d392"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("document")}
+    indexes = {ix["name"] for ix in inspector.get_indexes("document")}
+
+    with op.batch_alter_table("document", schema=None) as batch_op:
+        if "client_id" not in columns:
+            batch_op.add_column(sa.Column("client_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                "fk_document_client_id_client",
+                "client",
+                ["client_id"],
+                ["id"],
+                ondelete="SET NULL",
+            )
+        if "extracted_text" not in columns:
+            # zlib-compressed by the model's CompressedText type
+            batch_op.add_column(
+                sa.Column("extracted_text", sa.LargeBinary(), nullable=True)
+            )
+        if "ix_document_client_id" not in indexes:
+            batch_op.create_index("ix_document_client_id", ["client_id"], unique=False)
+
+    # The search index lives outside the ORM model; existing rows are indexed on their
+    # identifiers and summaries (their text was never stored)
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE document ADD COLUMN IF NOT EXISTS search_vector tsvector"
+        )
+        op.execute(
+            "UPDATE document SET search_vector = "
+            "setweight(to_tsvector('simple', concat_ws(' ', filename, extracted_data->>'policyId', "
+            "extracted_data->>'name')), 'A') || "
+            "setweight(to_tsvector('english', concat_ws(' ', ai_summary, ai_category)), 'B')"
+        )
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_search_vector "
+                "ON document USING gin (search_vector)"
+            )
+    elif bind.dialect.name == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS document_fts "
+            "USING fts5(title, summary, body, tokenize='porter unicode61')"
+        )
+        op.execute("DELETE FROM document_fts")
+        op.execute(
+            "INSERT INTO document_fts (rowid, title, summary, body) "
+            "SELECT id, trim(filename || ' ' || coalesce(json_extract(extracted_data, '$.policyId'), '') || ' ' || "
+            "coalesce(json_extract(extracted_data, '$.name'), '')), "
+            "trim(coalesce(ai_summary, '') || ' ' || coalesce(ai_category, '')), '' FROM document"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_document_search_vector")
+        op.execute("ALTER TABLE document DROP COLUMN IF EXISTS search_vector")
+    elif bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS document_fts")
+
+    with op.batch_alter_table("document", schema=None) as batch_op:
+        batch_op.drop_index("ix_document_client_id")
+        batch_op.drop_constraint("fk_document_client_id_client", type_="foreignkey")
+        batch_op.drop_column("extracted_text")
+        batch_op.drop_column("client_id")
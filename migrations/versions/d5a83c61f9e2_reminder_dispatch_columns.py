@@ -0,0 +1,52 @@
+"""reminder dispatch bookkeeping columns
+
+Revision ID: d5a83c61f9e2
+Revises: b7d1e4f20a63
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d5a83c61f9e2"
+down_revision = "b7d1e4f20a63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("reminder")}
+    indexes = {ix["name"] for ix in inspector.get_indexes("reminder")}
+
+    with op.batch_alter_table("reminder", schema=None) as batch_op:
+        if "attempts" not in columns:
+            batch_op.add_column(
+                sa.Column("attempts", sa.Integer(), nullable=False, server_default="0")
+            )
+        if "claimed_at" not in columns:
+            batch_op.add_column(sa.Column("claimed_at", sa.DateTime(), nullable=True))
+        if "next_attempt_at" not in columns:
+            batch_op.add_column(
+                sa.Column("next_attempt_at", sa.DateTime(), nullable=True)
+            )
+        if "sent_at" not in columns:
+            batch_op.add_column(sa.Column("sent_at", sa.DateTime(), nullable=True))
+        if "last_error" not in columns:
+            batch_op.add_column(sa.Column("last_error", sa.Text(), nullable=True))
+        if "ix_reminder_status_due_at" not in indexes:
+            batch_op.create_index(
+                "ix_reminder_status_due_at", ["status", "due_at"], unique=False
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("reminder", schema=None) as batch_op:
+        batch_op.drop_index("ix_reminder_status_due_at")
+        batch_op.drop_column("last_error")
+        batch_op.drop_column("sent_at")
+        batch_op.drop_column("next_attempt_at")
+        batch_op.drop_column("claimed_at")
+        batch_op.drop_column("attempts")
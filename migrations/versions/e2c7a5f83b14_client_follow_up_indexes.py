@@ -0,0 +1,56 @@
+"""client, follow-up and form indexes
+
+Revision ID: e2c7a5f83b14
+Revises: d5a83c61f9e2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e2c7a5f83b14"
+down_revision = "d5a83c61f9e2"
+branch_labels = None
+depends_on = None
+
+
+def _create_index(name, table, columns, **kw):
+    # Tables created by db.create_all() may already carry the model's indexes
+    if name in {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}:
+        return
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking writes on a live table; CONCURRENTLY cannot run in a transaction
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+
+def upgrade():
+    _create_index("ix_client_status_last_contact", "client", ["status", "last_contact"])
+    _create_index(
+        "ix_client_status_expiration_date", "client", ["status", "expiration_date"]
+    )
+    _create_index(
+        "ix_follow_up_client_completed_due_date",
+        "follow_up",
+        ["client_id", "completed", "due_date"],
+    )
+    _create_index(
+        "ix_follow_up_open_due_date",
+        "follow_up",
+        ["due_date"],
+        postgresql_where=sa.text("NOT completed"),
+        sqlite_where=sa.text("completed = 0"),
+    )
+    _create_index("ix_form_client_id", "form", ["client_id"])
+
+
+def downgrade():
+    op.drop_index("ix_form_client_id", table_name="form")
+    op.drop_index("ix_follow_up_open_due_date", table_name="follow_up")
+    op.drop_index("ix_follow_up_client_completed_due_date", table_name="follow_up")
+    op.drop_index("ix_client_status_expiration_date", table_name="client")
+    op.drop_index("ix_client_status_last_contact", table_name="client")
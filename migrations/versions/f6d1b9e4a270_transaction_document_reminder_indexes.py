@@ -0,0 +1,44 @@
+"""transaction, document and reminder indexes
+
+Revision ID: f6d1b9e4a270
+Revises: e2c7a5f83b14
+Create Date: 2026-10-19 13:10:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f6d1b9e4a270"
+down_revision = "e2c7a5f83b14"
+branch_labels = None
+depends_on = None
+
+
+def _create_index(name, table, columns, **kw):
+    # Tables created by db.create_all() may already carry the model's indexes
+    if name in {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}:
+        return
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking writes on a live table; CONCURRENTLY cannot run in a transaction
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+
+def upgrade():
+    _create_index(
+        "ix_transaction_batch_status_source",
+        "transaction",
+        ["batch_id", "status", "source"],
+    )
+    _create_index("ix_document_upload_date_id", "document", ["upload_date", "id"])
+    _create_index("ix_reminder_kind_due_at", "reminder", ["kind", "due_at"])
+
+
+def downgrade():
+    op.drop_index("ix_reminder_kind_due_at", table_name="reminder")
+    op.drop_index("ix_document_upload_date_id", table_name="document")
+    op.drop_index("ix_transaction_batch_status_source", table_name="transaction")
@@ -0,0 +1,207 @@
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Words that do not change what a help question asks for. Interrogatives (how, why,
+# what) and negations are kept: "Why can't I ..." needs another answer than "How do I ...".
+FILLER_WORDS = frozenset(
+    [
+        "a",
+        "an",
+        "the",
+        "please",
+        "can",
+        "could",
+        "would",
+        "you",
+        "i",
+        "me",
+        "my",
+        "we",
+        "our",
+        "to",
+        "do",
+        "does",
+        "is",
+        "are",
+        "of",
+        "for",
+        "in",
+        "on",
+        "with",
+    ]
+)
+# Contractions are spelled out so their negation survives as a word of its own
+CONTRACTIONS = (
+    (re.compile(r"\bcan't\b|\bcannot\b"), "can not"),
+    (re.compile(r"\bwon't\b"), "will not"),
+    (re.compile(r"n't\b"), " not"),
+)
+EMBEDDING_DIMENSIONS = 1024
+
+
+def normalize_question(question):
+    """Lowercases, drops punctuation and filler words: 'How do I upload a PAN card?' -> 'how upload pan card'."""
+    text = question.lower().replace("\u2019", "'")
+    for pattern, replacement in CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    words = re.findall(r"\w+", text)
+    return " ".join(w for w in words if w not in FILLER_WORDS) or " ".join(words)
+
+
+def _within_one_edit(a, b):
+    """True when b is a with one character inserted, deleted or replaced, or two adjacent ones swapped."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    for i, (x, y) in enumerate(zip(a, b, strict=False)):
+        if x != y:
+            if len(a) < len(b):
+                return a[i:] == b[i + 1 :]
+            return (
+                a[i + 1 :] == b[i + 1 :]
+                or a[i + 2 :] == b[i + 2 :]
+                and a[i : i + 2] == b[i : i + 2][::-1]
+            )
+    return True
+
+
+def same_words(a, b):
+    """
+    True when two normalized questions have the same words apart from typos (one edit
+    in a word of four or more letters). Close embeddings alone also pair "active" with
+    "inactive", or a question with its negation.
+    """
+
+    def covered(words, others):
+        return all(
+            any(
+                w == o or (min(len(w), len(o)) >= 4 and _within_one_edit(w, o))
+                for o in others
+            )
+            for w in words
+        )
+
+    a, b = set(a.split()), set(b.split())
+    return covered(a, b) and covered(b, a)
+
+
+def embed(normalized):
+    """
+    A local, dependency-free embedding: character trigrams of each word, hashed into
+    EMBEDDING_DIMENSIONS buckets and L2-normalized. Close paraphrases and typos share
+    most trigrams, so their cosine similarity stays high.
+    """
+    vector = {}
+    for word in normalized.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            bucket = int.from_bytes(
+                hashlib.blake2b(padded[i : i + 3].encode(), digest_size=4).digest(),
+                "little",
+            )
+            bucket %= EMBEDDING_DIMENSIONS
+            vector[bucket] = vector.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {k: v / norm for k, v in vector.items()}
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class AnswerCache:
+    """
+    An in-process LRU cache of chatbot answers keyed by the normalized question, with a
+    TTL so answers pick up prompt or product changes. With CHATBOT_CACHE_SIMILARITY set,
+    a miss falls back to the most similar cached question above that cosine similarity
+    that also has the same words apart from typos.
+    Each gunicorn worker keeps its own cache.
+    """
+
+    def __init__(self):
+        self._entries = (
+            OrderedDict()
+        )  # normalized question -> (answer, embedding, expires_at)
+        self._lock = threading.Lock()
+        self.enabled = True
+        self.max_entries = 1000
+        self.ttl = 3600
+        self.similarity = 0.0
+        self.hits = self.similar_hits = self.misses = 0
+
+    def init_app(self, app):
+        app.extensions["answer_cache"] = self
+        self.enabled = app.config.get("CHATBOT_CACHE_ENABLED", True)
+        self.max_entries = app.config.get("CHATBOT_CACHE_SIZE", 1000)
+        self.ttl = app.config.get("CHATBOT_CACHE_TTL", 3600)
+        self.similarity = app.config.get("CHATBOT_CACHE_SIMILARITY", 0.0)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.similar_hits = self.misses = 0
+
+    def get(self, question):
+        """Returns (answer, 'exact' | 'similar'), or (None, 'miss')."""
+        if not self.enabled:
+            return None, "miss"
+        key = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[2] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], "exact"
+            if entry:
+                del self._entries[key]
+
+            if self.similarity:
+                match = self._most_similar(key, embed(key), now)
+                if match:
+                    self._entries.move_to_end(match)
+                    self.similar_hits += 1
+                    return self._entries[match][0], "similar"
+            self.misses += 1
+            return None, "miss"
+
+    def _most_similar(self, question, vector, now):
+        best, best_score = None, self.similarity
+        for key, (_, embedding, expires_at) in self._entries.items():
+            if expires_at > now and same_words(question, key):
+                score = cosine(vector, embedding)
+                if score >= best_score:
+                    best, best_score = key, score
+        return best
+
+    def put(self, question, answer):
+        if not self.enabled:
+            return
+        key = normalize_question(question)
+        embedding = embed(key) if self.similarity else None
+        with self._lock:
+            self._entries[key] = (answer, embedding, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similarHits": self.similar_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.similar_hits) / lookups, 4)
+                if lookups
+                else None,
+            }
@@ -1,11 +1,16 @@
 import os
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, abort, jsonify, send_from_directory
 from flask_cors import CORS
 from sqlalchemy import text
 from flask_migrate import Migrate
 
-from .extensions import db
+from .extensions import db, event_broker, audit_writer, reminder_dispatcher, upload_store, answer_cache, document_pipeline
 from .config import Config
+from .database import engine_options, init_database, normalize_db_url, pool_stats
+from .responses import init_compression, init_json
+from .storage import is_content_addressed
+from .instrumentation import init_instrumentation
+from . import llm
 from .views.documents import documents_bp
 from .views.automation import automation_bp
 from .views.clients import clients_bp
@@ -13,6 +18,7 @@ from .views.dashboard import dashboard_bp
 from .views.reconciliation import reconciliation_bp
 from .views.chatbot import chatbot_bp
 from .views.audits import audits_bp
+from .views.events import events_bp
 
 from . import models
 
@@ -22,19 +28,28 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.url_map.strict_slashes = False
     app.config.from_object(config_class)
+    init_json(app)
     
     # Configure folder for storing extracted photos
-    app.config['UPLOAD_FOLDER'] = 'uploads'
+    app.config.setdefault('UPLOAD_FOLDER', 'uploads')
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
-    db_url = os.environ.get('DATABASE_URL')
-    if db_url and db_url.startswith("postgres://"):
-        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    db_url = normalize_db_url(os.environ.get('DATABASE_URL'))
     app.config['SQLALCHEMY_DATABASE_URI'] = db_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config, db_url)
 
     db.init_app(app)
+    init_database(app, db)
     migrate.init_app(app, db)
+    event_broker.init_app(app)
+    audit_writer.init_app(app)
+    reminder_dispatcher.init_app(app)
+    upload_store.init_app(app)
+    answer_cache.init_app(app)
+    document_pipeline.init_app(app)
     CORS(app)
+    init_compression(app)
+    init_instrumentation(app, db)
 
     app.register_blueprint(documents_bp, url_prefix='/api/documents')
     app.register_blueprint(automation_bp, url_prefix='/api/automation')
@@ -43,10 +58,23 @@ def create_app(config_class=Config):
     app.register_blueprint(reconciliation_bp, url_prefix='/api/reconciliation')
     app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
     app.register_blueprint(audits_bp, url_prefix='/api/audits')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
     # Add a route to serve the uploaded/extracted photos
     @app.route('/uploads/<path:filename>')
     def serve_upload(filename):
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        if not is_content_addressed(filename):
+            # Files saved before the content-addressed store; they may be overwritten, so revalidate
+            return send_from_directory(app.config['UPLOAD_FOLDER'], filename, max_age=0)
+        if not upload_store.ensure_thumbnail(filename) and not os.path.exists(upload_store.path(filename)):
+            abort(404)
+        # The name is the content hash, so it doubles as a strong ETag and the bytes never change.
+        # send_file also answers If-None-Match with 304 and Range requests with 206.
+        response = send_from_directory(app.config['UPLOAD_FOLDER'], filename,
+                                       etag=os.path.basename(filename).split('.')[0],
+                                       max_age=app.config['UPLOAD_CACHE_MAX_AGE'])
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
     # --- Health Check Routes ---
     @app.route('/')
     def api_root_health():
@@ -61,9 +89,17 @@ def create_app(config_class=Config):
         except Exception as e:
             return jsonify({"status": "error", "database": "disconnected", "details": str(e)}), 500
 
-    # Create database tables if they don't exist
-    with app.app_context():
-        db.create_all()
+    @app.route('/api/db-pool-stats')
+    def database_pool_stats():
+        return jsonify(pool_stats(db))
+
+    # The schema is managed by Alembic (`flask db upgrade`); create_all is only a local-dev shortcut
+    if app.config.get('AUTO_CREATE_TABLES'):
+        with app.app_context():
+            db.create_all()
+
+    if not app.config.get('LAZY_IMPORTS', True):
+        llm.preload()
 
     return app
 
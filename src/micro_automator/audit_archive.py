@@ -0,0 +1,88 @@
+import glob
+import gzip
+import json
+import logging
+import os
+from datetime import UTC, datetime, timedelta
+
+from .extensions import db
+from .models.shared import AuditLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATTERN = "audit_log-*.ndjson.gz"
+
+
+def _archive_path(archive_dir, month):
+    return os.path.join(archive_dir, f"audit_log-{month}.ndjson.gz")
+
+
+def archive_audit_logs(archive_dir, older_than_days=90, batch_size=5000, now=None):
+    """
+    Moves audit rows older than the retention window into monthly gzip NDJSON files.
+
+    Each batch is appended to its month's file as a new gzip member and synced to
+    disk before the rows are deleted, so a crash can at worst leave a row in both
+    places, never in neither.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = (now or datetime.now(UTC).replace(tzinfo=None)) - timedelta(
+        days=older_than_days
+    )
+    archived = 0
+
+    while True:
+        logs = (
+            AuditLog.query.filter(AuditLog.timestamp < cutoff)
+            .order_by(AuditLog.timestamp.asc(), AuditLog.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not logs:
+            break
+
+        by_month = {}
+        for log in logs:
+            by_month.setdefault(log.timestamp.strftime("%Y-%m"), []).append(
+                log.to_dict()
+            )
+
+        for month, rows in by_month.items():
+            payload = "".join(json.dumps(row) + "\n" for row in rows).encode()
+            with open(_archive_path(archive_dir, month), "ab") as f:
+                f.write(gzip.compress(payload))
+                f.flush()
+                os.fsync(f.fileno())
+
+        ids = [log.id for log in logs]
+        AuditLog.query.filter(AuditLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(ids)
+        logger.info(
+            f"Archived {len(ids)} audit log rows older than {cutoff.isoformat()}."
+        )
+
+    return {"archived": archived, "cutoff": cutoff.isoformat()}
+
+
+def iter_archived_logs(archive_dir, event_types=None, since=None, until=None):
+    """Yields archived audit rows (oldest first) matching the filters."""
+    for path in sorted(glob.glob(os.path.join(archive_dir, ARCHIVE_PATTERN))):
+        month = os.path.basename(path)[len("audit_log-") : -len(".ndjson.gz")]
+        # Skip whole files whose month falls outside the requested range
+        if since and month < since.strftime("%Y-%m"):
+            continue
+        if until and month > until.strftime("%Y-%m"):
+            continue
+
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                row = json.loads(line)
+                if event_types and row["eventType"] not in event_types:
+                    continue
+                timestamp = datetime.fromisoformat(row["timestamp"])
+                if since and timestamp < since:
+                    continue
+                if until and timestamp >= until:
+                    continue
+                yield row
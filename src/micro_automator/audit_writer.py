@@ -0,0 +1,311 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import UTC, datetime
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """
+    Buffers audit events in memory and writes them in batched multi-row inserts from
+    a background thread, independently of the request's own transaction.
+
+    The buffer is bounded. When it is full the AUDIT_BACKPRESSURE policy decides what
+    happens: 'block' waits up to AUDIT_BLOCK_TIMEOUT seconds and then drops the event,
+    'drop' drops it immediately, and 'inline' hands it back to the caller to be written
+    through its session. With AUDIT_SPOOL_FOLDER set, every accepted event is appended
+    to an on-disk segment first, and segments left behind by a crash are replayed at
+    startup.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._queue = queue.SimpleQueue()
+        self._slots = None
+        self._spool_file = None
+        self._segment = 0
+        self._started = int(time.time())
+        self._pending = []
+        # Spool segments whose events are in self._pending and not yet committed
+        self._unflushed_segments = []
+        # How many of the pending rows hold a buffer slot (recovered rows do not)
+        self._slotted = 0
+        self.dropped = 0
+        self.written = 0
+
+    def init_app(self, app):
+        app.extensions["audit_writer"] = self
+        if (
+            app.config.get("AUDIT_WRITER_MODE", "buffered") != "buffered"
+            or self._running
+        ):
+            return
+
+        self._app = app
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", 500)
+        self.flush_interval = app.config.get("AUDIT_FLUSH_INTERVAL", 2.0)
+        self.policy = app.config.get("AUDIT_BACKPRESSURE", "block")
+        self.block_timeout = app.config.get("AUDIT_BLOCK_TIMEOUT", 0.5)
+        self.spool_dir = app.config.get("AUDIT_SPOOL_FOLDER")
+        self._slots = threading.BoundedSemaphore(
+            app.config.get("AUDIT_BUFFER_SIZE", 10000)
+        )
+
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._recover_spool()
+            self._open_segment()
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="audit-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def buffered(self):
+        return self._queue.qsize() + len(self._pending)
+
+    def write(self, event_type, details=None):
+        """
+        Queues an audit event. Returns False when the caller should write it itself,
+        either because the writer is not running or because the 'inline' policy applies.
+        """
+        if not self._running:
+            return False
+
+        timeout = self.block_timeout if self.policy == "block" else 0
+        if not self._slots.acquire(timeout=timeout):
+            if self.policy == "inline":
+                return False
+            self.dropped += 1
+            logger.warning(f"Audit buffer full, dropped '{event_type}' event.")
+            return True
+
+        row = {
+            "event_type": event_type,
+            "details": details,
+            "timestamp": datetime.now(UTC).replace(tzinfo=None),
+        }
+        with self._lock:
+            # Spooling and queueing under one lock keeps each segment equal to what a flush drains
+            if self._spool_file:
+                self._spool_file.write(json.dumps(row, default=str) + "\n")
+                self._spool_file.flush()
+            self._queue.put(row)
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Writes everything buffered so far. Called by the background thread and on shutdown."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            self._unflushed_segments.extend(self._seal_segment())
+            while True:
+                try:
+                    self._pending.append(self._queue.get_nowait())
+                    self._slotted += 1
+                except queue.Empty:
+                    break
+        if not self._pending:
+            self._remove_unflushed_segments()
+            return 0
+
+        from .extensions import db, event_broker
+        from .models.shared import AuditLog
+
+        rows = self._pending
+        try:
+            with self._app.app_context():
+                for start in range(0, len(rows), self.batch_size):
+                    db.session.execute(
+                        db.insert(AuditLog), rows[start : start + self.batch_size]
+                    )
+                db.session.commit()
+                db.session.remove()
+        except Exception:
+            # Keep the rows (and their spool segments) and retry on the next flush
+            logger.exception(f"Could not write {len(rows)} buffered audit events.")
+            return 0
+
+        self._pending = []
+        self._remove_unflushed_segments()
+        for _ in range(self._slotted):
+            self._slots.release()
+        self._slotted = 0
+        self.written += len(rows)
+        for row in rows:
+            event_broker.publish(
+                "audit.logged",
+                {"eventType": row["event_type"], "details": row["details"]},
+            )
+        return len(rows)
+
+    def close(self):
+        """Stops the background thread and flushes whatever is still buffered."""
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+        self.flush()
+        if self._spool_file:
+            self._spool_file.close()
+            # The active segment is empty after a successful flush; otherwise keep it for recovery
+            if not self._pending:
+                self._unflushed_segments.append(self._spool_file.name)
+                self._remove_unflushed_segments()
+            self._spool_file = None
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit writer flush failed.")
+
+    # --- Durable spooling ---
+
+    def _segment_path(self, pid, number):
+        # The start time keeps a restarted worker that reuses a pid away from its old segments
+        return os.path.join(
+            self.spool_dir, f"audit-spool-{pid}-{self._started}-{number:08d}.ndjson"
+        )
+
+    def _spool_segments(self, pid="*"):
+        return sorted(
+            glob.glob(os.path.join(self.spool_dir, f"audit-spool-{pid}-*.ndjson"))
+        )
+
+    def _open_segment(self):
+        self._segment += 1
+        # Stays open across writes until _seal_segment closes it
+        self._spool_file = open(self._segment_path(os.getpid(), self._segment), "a")  # noqa: SIM115
+
+    def _seal_segment(self):
+        """Closes the active segment and opens a fresh one; must hold self._lock."""
+        if not self._spool_file:
+            return []
+        sealed = self._spool_file.name
+        os.fsync(self._spool_file.fileno())
+        self._spool_file.close()
+        self._open_segment()
+        return [sealed]
+
+    def _remove_unflushed_segments(self):
+        for path in self._unflushed_segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._unflushed_segments = []
+
+    def _recover_spool(self):
+        """
+        Queues events from segments whose worker process is gone (e.g. after a crash).
+        Every starting worker scans the folder, so a segment is first claimed by renaming
+        it to <segment>.claimed-<pid>.<process start>; whoever loses the rename skips it.
+        Segments claimed by a process that has since died are claimed again. The start
+        time tells a reused pid, common after a container restart, from the claimer.
+        """
+        me = os.getpid()
+        token = _process_token(me)
+        claimed_pattern = os.path.join(self.spool_dir, "audit-spool-*.ndjson.claimed-*")
+        for path in self._spool_segments() + sorted(glob.glob(claimed_pattern)):
+            segment, _, claimer = path.partition(".claimed-")
+            if claimer:
+                # A live claimer, this process included, is already writing a claimed segment
+                if _claimer_alive(claimer):
+                    continue
+            else:
+                owner = int(os.path.basename(segment).split("-")[2])
+                if owner != me and _process_alive(owner):
+                    continue
+            claimed = f"{segment}.claimed-{token}"
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue  # Another worker claimed it first
+            self._pending.extend(self._read_segment(claimed, f"{segment}.corrupt"))
+            self._unflushed_segments.append(claimed)
+        if self._pending:
+            logger.info(f"Recovered {len(self._pending)} spooled audit events.")
+
+    @staticmethod
+    def _read_segment(path, quarantine):
+        """
+        Yields a segment's events. Lines that do not parse, such as a last line torn by
+        a crash, are logged and copied to `quarantine` for inspection instead of
+        stopping the app from booting.
+        """
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(
+                        f"Skipping unreadable line {number} of audit spool {path}: {e}"
+                    )
+                    with open(quarantine, "a") as bad:
+                        bad.write(line if line.endswith("\n") else line + "\n")
+                    continue
+                yield row
+
+
+def _process_start(pid):
+    """A process's start time in clock ticks since boot, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, so count fields after its closing parenthesis
+            return int(f.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _process_token(pid):
+    start = _process_start(pid)
+    return str(pid) if start is None else f"{pid}.{start}"
+
+
+def _claimer_alive(token):
+    pid, _, start = token.partition(".")
+    if not _process_alive(int(pid)):
+        return False
+    # The pid is in use; it is still the claimer only if it started at the same time
+    return not start or str(_process_start(int(pid))) == start
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
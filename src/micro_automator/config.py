@@ -7,3 +7,131 @@ class Config:
     """Base configuration settings."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'a-very-secret-key')
     # Add other configurations like database URI etc. here
+
+    # Startup: schema changes go through `flask db upgrade`; set AUTO_CREATE_TABLES=true to create_all on boot
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'false').lower() == 'true'
+    # Gemini, PyMuPDF, Pillow and Tesseract are imported on first use unless LAZY_IMPORTS=false
+    LAZY_IMPORTS = os.environ.get('LAZY_IMPORTS', 'true').lower() == 'true'
+
+    # Database engine: pool sizing is per gunicorn worker; recycle and pre-ping avoid stale connections
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    # Default Postgres statement_timeout for every connection, 0 = none
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    # JSON responses: 'orjson' (falls back to 'default' if orjson is not installed) or 'default'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+    # Responses of these types larger than COMPRESS_MIN_SIZE bytes are sent with brotli or gzip
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', '4'))
+    # Streamed responses are flushed to the client once this many bytes or seconds have built up
+    COMPRESS_STREAM_FLUSH_BYTES = int(os.environ.get('COMPRESS_STREAM_FLUSH_BYTES', '16384'))
+    COMPRESS_STREAM_FLUSH_SECONDS = float(os.environ.get('COMPRESS_STREAM_FLUSH_SECONDS', '0.5'))
+    COMPRESS_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain')
+
+    # Instrumentation: per-route latency and SQL metrics at /metrics (Prometheus text format)
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    # /metrics is only served once one of these is set: it then answers requests carrying
+    # 'Authorization: Bearer <METRICS_TOKEN>' or coming from a comma-separated address/network
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ALLOWED_NETWORKS = tuple(n for n in os.environ.get('METRICS_ALLOWED_NETWORKS', '').split(',') if n)
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'true').lower() == 'true'
+    # Statements slower than this are logged with their SQL text, 0 = off
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', '500'))
+    # Sampling profiler: watches PROFILER_SAMPLE_RATE of requests, writes folded stacks for slow ones
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0.1'))
+    PROFILER_INTERVAL_MS = int(os.environ.get('PROFILER_INTERVAL_MS', '5'))
+    PROFILER_THRESHOLD_MS = int(os.environ.get('PROFILER_THRESHOLD_MS', '1000'))
+    PROFILER_FOLDER = os.environ.get('PROFILER_FOLDER', 'profiles')
+
+    # Uploads are stored under UPLOAD_FOLDER by content hash and served as immutable.
+    # Image thumbnails (WebP and JPEG, one per size) are generated 'background', 'inline' or 'off'.
+    UPLOAD_THUMBNAIL_MODE = os.environ.get('UPLOAD_THUMBNAIL_MODE', 'background')
+    UPLOAD_THUMBNAIL_SIZES = tuple(int(s) for s in os.environ.get('UPLOAD_THUMBNAIL_SIZES', '96,320').split(','))
+    UPLOAD_CACHE_MAX_AGE = int(os.environ.get('UPLOAD_CACHE_MAX_AGE', '31536000'))
+
+    # Document pipeline: extraction (PyMuPDF, OCR) runs on a 'process' (or 'thread') pool, Gemini
+    # analysis and database writes on threads. Each stage accepts DOCUMENT_PIPELINE_QUEUE_SIZE
+    # tasks beyond its workers; uploads wait DOCUMENT_PIPELINE_SUBMIT_TIMEOUT s for room, then get a 503.
+    # DOCUMENT_PIPELINE_MODE='inline' runs every stage in the request thread.
+    DOCUMENT_PIPELINE_MODE = os.environ.get('DOCUMENT_PIPELINE_MODE', 'staged')
+    DOCUMENT_EXTRACT_EXECUTOR = os.environ.get('DOCUMENT_EXTRACT_EXECUTOR', 'process')
+    DOCUMENT_EXTRACT_WORKERS = int(os.environ.get('DOCUMENT_EXTRACT_WORKERS', '0'))  # 0 = one per CPU
+    DOCUMENT_ANALYZE_WORKERS = int(os.environ.get('DOCUMENT_ANALYZE_WORKERS', '8'))
+    DOCUMENT_PERSIST_WORKERS = int(os.environ.get('DOCUMENT_PERSIST_WORKERS', '4'))
+    DOCUMENT_PIPELINE_QUEUE_SIZE = int(os.environ.get('DOCUMENT_PIPELINE_QUEUE_SIZE', '32'))
+    DOCUMENT_PIPELINE_SUBMIT_TIMEOUT = float(os.environ.get('DOCUMENT_PIPELINE_SUBMIT_TIMEOUT', '5.0'))
+    DOCUMENT_BULK_MAX_FILES = int(os.environ.get('DOCUMENT_BULK_MAX_FILES', '20'))
+    # Threads shared by all bulk uploads to move their files through the stages
+    DOCUMENT_BULK_WORKERS = int(os.environ.get('DOCUMENT_BULK_WORKERS', '8'))
+
+    # Chatbot: answers are cached per normalized question for CHATBOT_CACHE_TTL seconds (LRU beyond
+    # CHATBOT_CACHE_SIZE). A miss may reuse the answer to a question with the same words apart from
+    # typos and at least CHATBOT_CACHE_SIMILARITY similar (cosine of local trigram embeddings);
+    # 0, the default, = exact matches only.
+    CHATBOT_MODEL = os.environ.get('CHATBOT_MODEL', 'gemini-2.5-flash')
+    CHATBOT_CACHE_ENABLED = os.environ.get('CHATBOT_CACHE_ENABLED', 'true').lower() == 'true'
+    CHATBOT_CACHE_SIZE = int(os.environ.get('CHATBOT_CACHE_SIZE', '1000'))
+    CHATBOT_CACHE_TTL = int(os.environ.get('CHATBOT_CACHE_TTL', '3600'))
+    CHATBOT_CACHE_SIMILARITY = float(os.environ.get('CHATBOT_CACHE_SIMILARITY', '0.0'))
+
+    # Optional read replica; GET requests to these blueprints read from it
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_BLUEPRINTS = os.environ.get('REPLICA_BLUEPRINTS', 'clients,documents,audits,reconciliation,dashboard').split(',')
+
+    # Live event stream: 'memory' for a single worker, 'postgres' to fan out via LISTEN/NOTIFY
+    EVENT_BACKEND = os.environ.get('EVENT_BACKEND', 'memory')
+    EVENT_HISTORY_SIZE = int(os.environ.get('EVENT_HISTORY_SIZE', '500'))
+    EVENT_SUBSCRIBER_QUEUE_SIZE = int(os.environ.get('EVENT_SUBSCRIBER_QUEUE_SIZE', '100'))
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+    SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', '3000'))
+    # Streams are closed after this long so workers recycle; browsers reconnect with Last-Event-ID
+    SSE_MAX_STREAM_SECONDS = int(os.environ.get('SSE_MAX_STREAM_SECONDS', '300'))
+
+    # Audit log retention: rows older than this are moved to gzip NDJSON files by `flask audits archive`
+    AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', '90'))
+    AUDIT_ARCHIVE_FOLDER = os.environ.get('AUDIT_ARCHIVE_FOLDER', 'archives/audit')
+
+    # Reconciliation analytics: `flask reconciliation export` appends batches older than
+    # ANALYTICS_EXPORT_SETTLE_MINUTES to monthly 'parquet' or 'arrow' files (needs pyarrow)
+    ANALYTICS_EXPORT_FOLDER = os.environ.get('ANALYTICS_EXPORT_FOLDER', 'exports/reconciliation')
+    ANALYTICS_EXPORT_FORMAT = os.environ.get('ANALYTICS_EXPORT_FORMAT', 'parquet')
+    ANALYTICS_EXPORT_CHUNK_SIZE = int(os.environ.get('ANALYTICS_EXPORT_CHUNK_SIZE', '5000'))
+    ANALYTICS_EXPORT_SETTLE_MINUTES = int(os.environ.get('ANALYTICS_EXPORT_SETTLE_MINUTES', '10'))
+
+    # Audit events: 'buffered' batches inserts on a background thread, 'inline' writes via the request session
+    AUDIT_WRITER_MODE = os.environ.get('AUDIT_WRITER_MODE', 'buffered')
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', '500'))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', '2.0'))
+    AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', '10000'))
+    # What to do when the buffer is full: 'block', 'drop' or 'inline'
+    AUDIT_BACKPRESSURE = os.environ.get('AUDIT_BACKPRESSURE', 'block')
+    AUDIT_BLOCK_TIMEOUT = float(os.environ.get('AUDIT_BLOCK_TIMEOUT', '0.5'))
+    # Set to a directory to spool buffered events to disk so they survive a crash
+    AUDIT_SPOOL_FOLDER = os.environ.get('AUDIT_SPOOL_FOLDER')
+
+    # Renewal reminder sweep (`flask automation sweep-renewals`)
+    RENEWAL_WINDOW_DAYS = int(os.environ.get('RENEWAL_WINDOW_DAYS', '30'))
+    RENEWAL_DAYS_BEFORE = int(os.environ.get('RENEWAL_DAYS_BEFORE', '15'))
+
+    # Outbound reminders. REMINDER_DISPATCH_MODE='background' sends from a thread in the web
+    # process; 'off' leaves it to a separate `flask automation dispatch-reminders` worker.
+    REMINDER_DISPATCH_MODE = os.environ.get('REMINDER_DISPATCH_MODE', 'off')
+    REMINDER_TRANSPORT = os.environ.get('REMINDER_TRANSPORT', 'console')  # console, smtp
+    REMINDER_FROM_ADDRESS = os.environ.get('REMINDER_FROM_ADDRESS', 'reminders@insure-agent.local')
+    REMINDER_BATCH_SIZE = int(os.environ.get('REMINDER_BATCH_SIZE', '200'))
+    REMINDER_RATE_LIMIT = float(os.environ.get('REMINDER_RATE_LIMIT', '10'))  # messages per second, 0 = unlimited
+    REMINDER_MAX_ATTEMPTS = int(os.environ.get('REMINDER_MAX_ATTEMPTS', '5'))
+    REMINDER_RETRY_BACKOFF = int(os.environ.get('REMINDER_RETRY_BACKOFF', '60'))
+    REMINDER_POLL_INTERVAL = int(os.environ.get('REMINDER_POLL_INTERVAL', '5'))
+    REMINDER_CLAIM_TIMEOUT = int(os.environ.get('REMINDER_CLAIM_TIMEOUT', '600'))
+    SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.environ.get('SMTP_PORT', '25'))
+    SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+    SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'false').lower() == 'true'
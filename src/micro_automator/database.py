@@ -0,0 +1,174 @@
+import functools
+import logging
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = "replica"
+
+
+def normalize_db_url(url):
+    # Render and Heroku hand out postgres:// URLs, which SQLAlchemy no longer accepts
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def engine_options(config, url):
+    """Builds SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings in Config."""
+    options = {
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+    }
+    if url and not url.startswith("sqlite"):
+        # SQLite uses a single-connection pool that takes none of the sizing options
+        options.update(
+            pool_size=config.get("DB_POOL_SIZE", 5),
+            max_overflow=config.get("DB_MAX_OVERFLOW", 10),
+            pool_timeout=config.get("DB_POOL_TIMEOUT", 30),
+        )
+    timeout = config.get("DB_STATEMENT_TIMEOUT_MS", 0)
+    if timeout and url and url.startswith("postgresql"):
+        # The server-side default for every connection; endpoints can tighten it per request
+        options["connect_args"] = {"options": f"-c statement_timeout={int(timeout)}"}
+    return options
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the read replica when the current request was routed there (see
+    init_database), and everything else (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR
+    UPDATE, work outside a request) to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and _reads_from_replica()
+            and not self._flushing
+            and not _is_write(clause)
+        ):
+            return current_app.extensions["db_replica"]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _reads_from_replica():
+    return has_request_context() and g.get("db_route") == REPLICA_BIND
+
+
+def _is_write(clause):
+    return (
+        isinstance(clause, UpdateBase)
+        or getattr(clause, "_for_update_arg", None) is not None
+    )
+
+
+def use_primary(view):
+    """Keeps a view's reads on the primary, e.g. when it must see its own recent writes."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_route = "primary"
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def statement_timeout(ms):
+    """Caps how long any single statement issued by the decorated view may run (Postgres only)."""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.statement_timeout_ms = ms
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _apply_request_statement_timeout(session, transaction, connection):
+    timeout = g.get("statement_timeout_ms") if has_request_context() else None
+    if timeout and connection.dialect.name == "postgresql":
+        # SET LOCAL ends with the transaction, so the pooled connection keeps its default
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def _route_request():
+    blueprints = current_app.config.get("REPLICA_BLUEPRINTS", ())
+    if request.method in ("GET", "HEAD") and request.blueprint in blueprints:
+        g.db_route = REPLICA_BIND
+
+
+def _watch_pool(name, engine, counters):
+    stats = counters.setdefault(
+        name, {"connects": 0, "checkouts": 0, "invalidations": 0}
+    )
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats["connects"] += 1
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats["checkouts"] += 1
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats["invalidations"] += 1
+        logger.warning(f"Database connection invalidated on '{name}' pool: {exception}")
+
+
+def init_database(app, db):
+    """
+    Creates the read replica engine (if DATABASE_REPLICA_URL is set) and wires request
+    routing and pool usage counters into an app after db.init_app. The replica is kept
+    out of SQLALCHEMY_BINDS so create_all/drop_all and migrations never touch it.
+    """
+    counters = app.extensions["db_pool_counters"] = {}
+    with app.app_context():
+        _watch_pool("primary", db.engine, counters)
+
+    replica_url = normalize_db_url(app.config.get("DATABASE_REPLICA_URL"))
+    if replica_url:
+        replica = create_engine(replica_url, **engine_options(app.config, replica_url))
+        app.extensions["db_replica"] = replica
+        _watch_pool(REPLICA_BIND, replica, counters)
+        app.before_request(_route_request)
+
+
+def all_engines(db):
+    """The primary engine and, if configured, the replica, keyed by name."""
+    engines = {"primary": db.engine}
+    if "db_replica" in current_app.extensions:
+        engines[REPLICA_BIND] = current_app.extensions["db_replica"]
+    return engines
+
+
+def pool_stats(db):
+    """Current pool usage per engine ('primary' and, if configured, 'replica')."""
+    counters = current_app.extensions.get("db_pool_counters", {})
+    stats = {}
+    for name, engine in all_engines(db).items():
+        pool = engine.pool
+        stats[name] = {
+            "pool": type(pool).__name__,
+            # Sizing calls only exist on QueuePool; SQLite's pools report None
+            "size": _call(pool, "size"),
+            "checkedIn": _call(pool, "checkedin"),
+            "checkedOut": _call(pool, "checkedout"),
+            "overflow": _call(pool, "overflow"),
+            **counters.get(name, {}),
+        }
+    return stats
+
+
+def _call(pool, method):
+    fn = getattr(pool, method, None)
+    return fn() if fn else None
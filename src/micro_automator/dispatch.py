@@ -0,0 +1,424 @@
+import logging
+import smtplib
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from email.message import EmailMessage
+
+from jinja2 import Environment
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import selectinload
+
+logger = logging.getLogger(__name__)
+
+# Subject and body templates per reminder kind. Each is compiled once per batch.
+TEMPLATES = {
+    "renewal": (
+        "Your policy {{ policy_id or '' }} is due for renewal",
+        "Dear {{ name }},\n\n{{ message }}\n\nPlease contact your agent to renew and stay covered.\n",
+    ),
+    "adhoc": (
+        "A message from your insurance agent",
+        "Dear {{ name }},\n\n{{ message }}\n",
+    ),
+}
+
+_jinja = Environment(autoescape=False)
+
+
+class TransientSendError(Exception):
+    """The provider may accept the message later (throttling, 4xx, dropped connection)."""
+
+
+class PermanentSendError(Exception):
+    """The message can never be delivered as-is (bad address, 5xx, missing email)."""
+
+
+class RateLimiter:
+    """Token bucket limiting how many messages per second a transport may send."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.rate)
+
+
+class ConsoleTransport:
+    """Logs messages instead of sending them; the default for local development."""
+
+    name = "console"
+
+    def __init__(self, config):
+        self.limiter = RateLimiter(config.get("REMINDER_RATE_LIMIT", 0))
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, message):
+        self.limiter.acquire()
+        logger.info(
+            f"SIMULATING: Sending '{message['Subject']}' to {message['To']} ({message['Idempotency-Key']})"
+        )
+
+
+class SMTPTransport:
+    """Sends through one SMTP connection that is reused for the whole batch."""
+
+    name = "smtp"
+
+    def __init__(self, config):
+        self.host = config.get("SMTP_HOST", "localhost")
+        self.port = config.get("SMTP_PORT", 25)
+        self.username = config.get("SMTP_USERNAME")
+        self.password = config.get("SMTP_PASSWORD")
+        self.use_tls = config.get("SMTP_USE_TLS", False)
+        self.timeout = config.get("SMTP_TIMEOUT", 30)
+        self.limiter = RateLimiter(config.get("REMINDER_RATE_LIMIT", 0))
+        self._conn = None
+
+    def open(self):
+        if self._conn is not None:
+            return
+        try:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                conn.starttls()
+            if self.username:
+                conn.login(self.username, self.password)
+        except (OSError, smtplib.SMTPException) as e:
+            raise TransientSendError(f"Could not connect to SMTP server: {e}") from e
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+            self._conn = None
+
+    def send(self, message):
+        self.limiter.acquire()
+        for attempt in range(2):
+            self.open()
+            try:
+                self._conn.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected as e:
+                # The server dropped our idle connection; reconnect once and retry
+                self._conn = None
+                if attempt:
+                    raise TransientSendError("SMTP server disconnected.") from e
+            except smtplib.SMTPRecipientsRefused as e:
+                raise PermanentSendError(f"Recipient refused: {e.recipients}") from e
+            except smtplib.SMTPResponseException as e:
+                if 400 <= e.smtp_code < 500:
+                    raise TransientSendError(f"{e.smtp_code} {e.smtp_error!r}") from e
+                raise PermanentSendError(f"{e.smtp_code} {e.smtp_error!r}") from e
+            except OSError as e:
+                self._conn = None
+                raise TransientSendError(str(e)) from e
+
+
+TRANSPORTS = {
+    "console": ConsoleTransport,
+    "smtp": SMTPTransport,
+}
+
+
+def idempotency_key(reminder):
+    """Stable per reminder, so a provider can discard a resend after a crash mid-batch."""
+    return f"reminder-{reminder['id']}-{reminder['due_at']:%Y%m%d%H%M}"
+
+
+class ReminderDispatcher:
+    """
+    Picks up due reminders in batches, renders and sends them through the configured
+    transport, and records every status transition with one bulk UPDATE per batch.
+    Runs either as a background thread in the web process or as a separate worker
+    (`flask automation dispatch-reminders`).
+    """
+
+    # Abort a batch after this many transient failures in a row; the provider is likely down
+    max_consecutive_failures = 3
+
+    def __init__(self):
+        self._app = None
+        self._thread = None
+        self._running = False
+        self._wakeup = threading.Event()
+        self.transport = None
+
+    def init_app(self, app):
+        app.extensions["reminder_dispatcher"] = self
+        self._app = app
+        config = app.config
+        self.batch_size = config.get("REMINDER_BATCH_SIZE", 200)
+        self.max_attempts = config.get("REMINDER_MAX_ATTEMPTS", 5)
+        self.retry_backoff = config.get("REMINDER_RETRY_BACKOFF", 60)
+        self.poll_interval = config.get("REMINDER_POLL_INTERVAL", 5)
+        self.claim_timeout = timedelta(
+            seconds=config.get("REMINDER_CLAIM_TIMEOUT", 600)
+        )
+        self.from_address = config.get(
+            "REMINDER_FROM_ADDRESS", "reminders@insure-agent.local"
+        )
+        transport = config.get("REMINDER_TRANSPORT", "console")
+        if transport not in TRANSPORTS:
+            raise ValueError(
+                f"Unknown REMINDER_TRANSPORT '{transport}'. Choose one of: {', '.join(TRANSPORTS)}"
+            )
+        self.transport = TRANSPORTS[transport](config)
+        if config.get("REMINDER_DISPATCH_MODE", "off") == "background":
+            self.start()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="reminder-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+
+    def wake(self):
+        """Asks the background loop to look for due reminders right away."""
+        self._wakeup.set()
+
+    def _run(self):
+        while self._running:
+            try:
+                with self._app.app_context():
+                    report = self.run_once()
+            except Exception:
+                logger.exception("Reminder dispatch failed.")
+                report = {"claimed": 0}
+            # Keep draining while there is a backlog, otherwise wait for the next poll
+            if report["claimed"] < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self, now=None):
+        """Claims, sends and records one batch. Must be called inside an app context."""
+        from .extensions import db
+        from .models.shared import Reminder
+
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        reminders = self._claim_batch(now)
+        report = {"claimed": len(reminders), "sent": 0, "retrying": 0, "failed": 0}
+        if not reminders:
+            return report
+
+        compiled = {}
+        updates = []
+        consecutive_failures = 0
+        try:
+            self.transport.open()
+            for reminder in reminders:
+                update_row = self._deliver(reminder, compiled, now)
+                updates.append(update_row)
+                consecutive_failures = (
+                    consecutive_failures + 1 if update_row["status"] == "pending" else 0
+                )
+                if consecutive_failures >= self.max_consecutive_failures:
+                    raise TransientSendError(update_row["last_error"])
+        except TransientSendError as e:
+            # Put the rest of the batch back for a later run instead of hammering the provider
+            logger.error(f"Reminder transport unavailable: {e}")
+            done = {u["id"] for u in updates}
+            updates += [
+                self._retry_update(r, now, str(e))
+                for r in reminders
+                if r["id"] not in done
+            ]
+        except Exception:
+            # Anything else (a bad template, a bug): hand the unsent rest back right away
+            # instead of leaving it 'sending' until claim_timeout
+            done = {u["id"] for u in updates}
+            updates += [
+                {"id": r["id"], "status": "pending", "claimed_at": None}
+                for r in reminders
+                if r["id"] not in done
+            ]
+            raise
+        finally:
+            self.transport.close()
+            # Record what was sent, even when the batch stopped early
+            db.session.execute(update(Reminder), updates)
+            db.session.commit()
+        for u in updates:
+            report[
+                {"sent": "sent", "pending": "retrying", "failed": "failed"}[u["status"]]
+            ] += 1
+        logger.info(f"Reminder dispatch: {report}")
+        return report
+
+    def _claim_batch(self, now):
+        """Marks a batch of due reminders as 'sending' so no other dispatcher picks them up."""
+        from .extensions import db
+        from .models.shared import Reminder
+
+        stale = now - self.claim_timeout
+        query = (
+            Reminder.query.options(selectinload(Reminder.client))
+            .filter(
+                or_(
+                    # next_attempt_at is set for retries and for reminders pushed forward by bulk-send
+                    and_(
+                        Reminder.status == "pending",
+                        or_(
+                            Reminder.next_attempt_at <= now,
+                            and_(
+                                Reminder.next_attempt_at.is_(None),
+                                Reminder.due_at <= now,
+                            ),
+                        ),
+                    ),
+                    # Claimed by a dispatcher that died before recording the outcome
+                    and_(Reminder.status == "sending", Reminder.claimed_at < stale),
+                )
+            )
+            .order_by(Reminder.due_at.asc())
+            .limit(self.batch_size)
+        )
+        if db.session.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True, of=Reminder)
+
+        # Copy what sending needs, so nothing is lazily reloaded after the claim commits
+        reminders = [
+            {
+                "id": r.id,
+                "kind": r.kind,
+                "message": r.message,
+                "due_at": r.due_at,
+                "attempts": r.attempts or 0,
+                "name": r.client.name,
+                "email": r.client.email,
+                "policy_id": r.client.policy_id,
+            }
+            for r in query.all()
+        ]
+        if reminders:
+            claimed = self._claim([r["id"] for r in reminders], now)
+            reminders = [r for r in reminders if r["id"] in claimed]
+        db.session.commit()
+        return reminders
+
+    def _claim(self, ids, now):
+        """
+        Moves the given reminders to 'sending' if they are still claimable and returns the
+        ids it moved. Without row locks (anything but Postgres) another dispatcher may have
+        claimed or sent some of them since they were read; those are left alone.
+        """
+        from .extensions import db
+        from .models.shared import Reminder
+
+        claimable = or_(
+            Reminder.status == "pending",
+            and_(
+                Reminder.status == "sending",
+                Reminder.claimed_at < now - self.claim_timeout,
+            ),
+        )
+        stmt = (
+            update(Reminder)
+            .where(claimable)
+            .values(status="sending", claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.get_bind().dialect.update_returning:
+            return set(
+                db.session.execute(
+                    stmt.where(Reminder.id.in_(ids)).returning(Reminder.id)
+                ).scalars()
+            )
+        return {
+            i for i in ids if db.session.execute(stmt.where(Reminder.id == i)).rowcount
+        }
+
+    def _render(self, reminder, compiled):
+        kind = reminder["kind"] if reminder["kind"] in TEMPLATES else "adhoc"
+        if kind not in compiled:
+            subject, body = TEMPLATES[kind]
+            compiled[kind] = (_jinja.from_string(subject), _jinja.from_string(body))
+        subject_tpl, body_tpl = compiled[kind]
+        return subject_tpl.render(reminder), body_tpl.render(reminder)
+
+    def _deliver(self, reminder, compiled, now):
+        if not reminder["email"]:
+            return self._failed_update(reminder, "Client has no email address.")
+
+        subject, body = self._render(reminder, compiled)
+        message = EmailMessage()
+        message["From"] = self.from_address
+        message["To"] = reminder["email"]
+        message["Subject"] = subject
+        key = idempotency_key(reminder)
+        message["Message-ID"] = f"<{key}@{self.from_address.split('@')[-1]}>"
+        message["Idempotency-Key"] = key
+        message.set_content(body)
+
+        try:
+            self.transport.send(message)
+        except PermanentSendError as e:
+            return self._failed_update(reminder, str(e))
+        except TransientSendError as e:
+            return self._retry_update(reminder, now, str(e))
+        return {
+            "id": reminder["id"],
+            "status": "sent",
+            "sent_at": now,
+            "attempts": reminder["attempts"] + 1,
+            "last_error": None,
+            "next_attempt_at": None,
+        }
+
+    def _retry_update(self, reminder, now, error):
+        attempts = reminder["attempts"] + 1
+        if attempts >= self.max_attempts:
+            return self._failed_update(reminder, error)
+        return {
+            "id": reminder["id"],
+            "status": "pending",
+            "sent_at": None,
+            "attempts": attempts,
+            "last_error": error,
+            "next_attempt_at": now
+            + timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1)),
+        }
+
+    def _failed_update(self, reminder, error):
+        return {
+            "id": reminder["id"],
+            "status": "failed",
+            "sent_at": None,
+            "attempts": reminder["attempts"] + 1,
+            "last_error": error,
+            "next_attempt_at": None,
+        }
@@ -0,0 +1,238 @@
+import itertools
+import json
+import logging
+import queue
+import select
+import threading
+import time
+import zlib
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Key under which events waiting for a commit are stored in session.info
+_PENDING_KEY = "pending_events"
+
+
+class LocalBackend:
+    """Delivers published events straight to the subscribers of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Seeded with the clock in microseconds, so ids keep growing across a restart
+        self._ids = itertools.count(int(time.time() * 1_000_000))
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def send(self, evt):
+        # Numbering and delivering under one lock keeps every stream in id order
+        with self._lock:
+            evt["id"] = next(self._ids)
+            self._deliver(evt)
+
+
+class PostgresBackend:
+    """
+    Fans events out to every worker through Postgres LISTEN/NOTIFY, so all gunicorn
+    workers (and instances sharing the database) see the same stream.
+
+    Ids come from one Postgres sequence. Senders take a transaction-level advisory lock
+    before drawing the next id, and Postgres delivers notifications in commit order, so
+    every listener receives events in id order and a stream can resume on any worker.
+    """
+
+    channel = "micro_automator_events"
+    sequence = "micro_automator_event_id"
+    lock_key = zlib.crc32(channel.encode())
+
+    def __init__(self, dsn):
+        # psycopg2 expects a plain libpq URL without the SQLAlchemy driver suffix
+        self.dsn = dsn.replace("postgresql+psycopg2://", "postgresql://", 1)
+        self._send_lock = threading.Lock()
+        self._send_conn = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+        listener = threading.Thread(
+            target=self._listen, name="event-listener", daemon=True
+        )
+        listener.start()
+
+    def send(self, evt):
+        import psycopg2
+
+        with self._send_lock:
+            try:
+                if self._send_conn is None or self._send_conn.closed:
+                    self._send_conn = psycopg2.connect(self.dsn)
+                    with self._send_conn.cursor() as cur:
+                        cur.execute(f"CREATE SEQUENCE IF NOT EXISTS {self.sequence}")
+                    self._send_conn.commit()
+                with self._send_conn.cursor() as cur:
+                    # Held until the commit that sends the notification
+                    cur.execute("SELECT pg_advisory_xact_lock(%s)", (self.lock_key,))
+                    cur.execute(f"SELECT nextval('{self.sequence}')")
+                    evt["id"] = cur.fetchone()[0]
+                    cur.execute(
+                        "SELECT pg_notify(%s, %s)",
+                        (self.channel, json.dumps(evt, default=str)),
+                    )
+                self._send_conn.commit()
+            except Exception:
+                logger.exception(
+                    f"Could not publish event {evt['type']} through Postgres."
+                )
+                if self._send_conn is not None:
+                    self._send_conn.close()
+                self._send_conn = None
+
+    def _listen(self):
+        import psycopg2
+
+        backoff = 1
+        while True:
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                backoff = 1
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._deliver(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Event listener lost its Postgres connection.")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+BACKENDS = {
+    "memory": lambda app: LocalBackend(),
+    "postgres": lambda app: PostgresBackend(app.config["SQLALCHEMY_DATABASE_URI"]),
+}
+
+
+class Subscription:
+    """A single stream's view of the broker: the replayed backlog plus a bounded queue."""
+
+    def __init__(self, replay, maxsize, resync=False):
+        self.replay = replay
+        self.resync = resync
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def offer(self, evt):
+        try:
+            self._queue.put_nowait(evt)
+        except queue.Full:
+            # The client is too slow; it will be told to resync and reconnect
+            self.overflowed = True
+
+    def get(self, timeout):
+        return self._queue.get(timeout=timeout)
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe hub for dashboard change events.
+    Recent events are kept in a ring buffer so a reconnecting stream can resume
+    from its Last-Event-ID instead of refetching everything.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=500)
+        self._backend = LocalBackend()
+        self._backend.start(self._deliver)
+        self._backend_name = "memory"
+        self.subscriber_queue_size = 100
+
+    def init_app(self, app):
+        name = app.config.get("EVENT_BACKEND", "memory")
+        if name not in BACKENDS:
+            raise ValueError(
+                f"Unknown EVENT_BACKEND '{name}'. Choose one of: {', '.join(BACKENDS)}"
+            )
+        app.extensions["event_broker"] = self
+        self.subscriber_queue_size = app.config.get("EVENT_SUBSCRIBER_QUEUE_SIZE", 100)
+        with self._lock:
+            self._history = deque(
+                self._history, maxlen=app.config.get("EVENT_HISTORY_SIZE", 500)
+            )
+            if self._backend_name == name:
+                return
+            backend = BACKENDS[name](app)
+            self._backend, self._backend_name = backend, name
+        backend.start(self._deliver)
+
+    def publish(self, event_type, data=None):
+        """Publishes an event immediately to every subscribed stream. The backend assigns its id."""
+        evt = {"type": event_type, "data": data or {}}
+        self._backend.send(evt)
+        return evt
+
+    def publish_after_commit(self, session, event_type, data=None):
+        """Queues an event on the session; it is published only if the transaction commits."""
+        if not session.in_transaction():
+            # Start the transaction now so a rollback before any query still discards the event
+            session.begin()
+        session.info.setdefault(_PENDING_KEY, []).append((event_type, data))
+
+    def _deliver(self, evt):
+        with self._lock:
+            self._history.append(evt)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.offer(evt)
+
+    def subscribe(self, last_event_id=None):
+        with self._lock:
+            replay, resync = [], False
+            if last_event_id is not None:
+                replay = [evt for evt in self._history if evt["id"] > last_event_id]
+                # Anything older than the ring buffer (or from before a restart) is gone,
+                # and an id newer than the buffer was never seen here, so the client has
+                # to refetch the dashboard snapshot
+                known = any(evt["id"] == last_event_id for evt in self._history)
+                resync = not known and (
+                    not self._history
+                    or not self._history[0]["id"]
+                    < last_event_id
+                    < self._history[-1]["id"]
+                )
+            subscription = Subscription(
+                replay, self.subscriber_queue_size, resync=resync
+            )
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session):
+    from .extensions import event_broker
+
+    for event_type, data in session.info.pop(_PENDING_KEY, []):
+        event_broker.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
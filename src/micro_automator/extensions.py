@@ -1,8 +1,37 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from .events import EventBroker
+from .audit_writer import AuditWriter
+from .dispatch import ReminderDispatcher
+from .database import RoutingSession
+from .metrics import MetricsRegistry
+from .storage import UploadStore
+from .answer_cache import AnswerCache
+from .pipeline import DocumentPipeline
 
-# This is the single, shared database object.
-db = SQLAlchemy()
+# This is the single, shared database object. Its sessions route reads to the replica when configured.
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # This is the single, shared migration object.
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+
+# This is the single, shared pub/sub hub behind the live event stream.
+event_broker = EventBroker()
+
+# This is the single, shared background writer for audit events.
+audit_writer = AuditWriter()
+
+# This is the single, shared outbound reminder dispatcher.
+reminder_dispatcher = ReminderDispatcher()
+
+# This is the single, shared registry behind the /metrics endpoint.
+metrics = MetricsRegistry()
+
+# This is the single, shared content-addressed store for uploaded and extracted files.
+upload_store = UploadStore()
+
+# This is the single, shared cache of chatbot answers.
+answer_cache = AnswerCache()
+
+# This is the single, shared set of document pipeline stages and their executors.
+document_pipeline = DocumentPipeline()
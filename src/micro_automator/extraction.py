@@ -0,0 +1,73 @@
+"""
+CPU-bound extraction steps of the document pipeline.
+
+These functions take and return plain bytes, strings and dicts and never touch the
+app, so the pipeline's extract stage can run them in worker processes. PyMuPDF,
+Pillow and Tesseract are imported on first use, in whichever process runs them.
+"""
+
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UnsupportedDocument(ValueError):
+    """The upload is neither a PDF nor an image."""
+
+
+def is_supported(content_type):
+    return content_type == "application/pdf" or (content_type or "").startswith(
+        "image/"
+    )
+
+
+def pdf_text(data):
+    import fitz
+
+    text = ""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for page in doc:
+            text += page.get_text()
+    logger.info(f"Extracted {len(text)} characters from PDF.")
+    return text
+
+
+def largest_pdf_image(data):
+    """The bytes of the largest embedded image in a PDF, or None."""
+    import fitz
+
+    try:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            max_area = 0
+            best_image = None
+            for page in doc:
+                for img in page.get_images(full=True):
+                    base_image = doc.extract_image(img[0])
+                    area = base_image["width"] * base_image["height"]
+                    if area > max_area:
+                        max_area = area
+                        best_image = base_image["image"]
+            return best_image
+    except Exception:
+        logger.exception("Could not extract image from PDF.")
+        return None
+
+
+def image_text(data):
+    import pytesseract
+    from PIL import Image
+
+    text = pytesseract.image_to_string(Image.open(io.BytesIO(data)))
+    logger.info(f"Extracted {len(text)} characters from Image using OCR.")
+    return text
+
+
+def extract_document(data, content_type):
+    """Returns {'text': ..., 'photo': bytes or None} for an uploaded PDF or image."""
+    if content_type == "application/pdf":
+        return {"text": pdf_text(data), "photo": largest_pdf_image(data)}
+    if is_supported(content_type):
+        # If the upload is an image, we can treat the whole thing as the photo
+        return {"text": image_text(data), "photo": data}
+    raise UnsupportedDocument(f"Unsupported file type: {content_type}")
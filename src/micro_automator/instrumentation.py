@@ -0,0 +1,266 @@
+import ipaddress
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from .database import all_engines, pool_stats
+from .extensions import metrics
+
+logger = logging.getLogger(__name__)
+
+REQUESTS = metrics.counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+LATENCY = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response; streamed bodies are not included.",
+    ("method", "route"),
+)
+QUERY_COUNT = metrics.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500),
+)
+QUERY_TIME = metrics.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("route",)
+)
+SLOW_QUERIES = metrics.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.", ("route",)
+)
+PROFILES = metrics.counter(
+    "profiler_reports_total", "Sampling profiles written for slow requests.", ("route",)
+)
+
+
+def _route():
+    if not has_request_context():
+        return "-"
+    # The URL rule, not the path, so /api/clients/1 and /api/clients/2 share one series
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+# --- SQL statement timing ---
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _query_timer(slow_ms):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = g.get("instrumentation") if has_request_context() else None
+        if stats is not None:
+            stats["queries"] += 1
+            stats["db_seconds"] += elapsed
+
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            route = _route()
+            SLOW_QUERIES.inc(route=route)
+            # Parameters are left out on purpose; they can hold client PII
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.0f} ms) on {route}: {' '.join(statement.split())[:2000]}"
+            )
+
+    return after_cursor_execute
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+# --- Sampling profiler ---
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the request threads it is asked to watch, from one background
+    thread, every `interval` seconds. Output is in the folded format read by flamegraph
+    tools (`frame;frame;frame count`).
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._targets[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._targets.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                for thread_id, stacks in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[_fold(frame)] += 1
+
+
+def _fold(frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _write_profile(stacks, method, route, elapsed_ms):
+    folder = current_app.config.get("PROFILER_FOLDER", "profiles")
+    os.makedirs(folder, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(
+        folder,
+        f"{datetime.now(UTC):%Y%m%dT%H%M%S%f}-{method}-{slug}-{elapsed_ms:.0f}ms.folded",
+    )
+    with open(path, "w") as f:
+        f.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+    return path
+
+
+# --- Request hooks ---
+
+
+def _before_request():
+    g.instrumentation = {
+        "started": time.perf_counter(),
+        "queries": 0,
+        "db_seconds": 0.0,
+        "profiled": False,
+    }
+    config = current_app.config
+    if config.get("PROFILER_ENABLED") and random.random() < config.get(
+        "PROFILER_SAMPLE_RATE", 0.1
+    ):
+        current_app.extensions["sampling_profiler"].start(threading.get_ident())
+        g.instrumentation["profiled"] = True
+
+
+def _after_request(response):
+    stats = g.pop("instrumentation", None)
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - stats["started"]
+    route, method = _route(), request.method
+
+    REQUESTS.inc(method=method, route=route, status=str(response.status_code))
+    LATENCY.observe(elapsed, method=method, route=route)
+    QUERY_COUNT.observe(stats["queries"], route=route)
+    QUERY_TIME.observe(stats["db_seconds"], route=route)
+
+    config = current_app.config
+    if stats["profiled"]:
+        stacks = current_app.extensions["sampling_profiler"].stop(threading.get_ident())
+        if stacks and elapsed * 1000 >= config.get("PROFILER_THRESHOLD_MS", 1000):
+            path = _write_profile(stacks, method, route, elapsed * 1000)
+            PROFILES.inc(route=route)
+            logger.info(
+                f"Slow request {method} {route} took {elapsed * 1000:.0f} ms; profile written to {path}"
+            )
+
+    if config.get("SERVER_TIMING_HEADER", True):
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats["db_seconds"] * 1000:.1f};desc="{stats["queries"]} queries", '
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+    return response
+
+
+def _collect_pool_stats(gauge):
+    from .extensions import db
+
+    for name, stats in pool_stats(db).items():
+        for state in ("checkedOut", "checkedIn", "overflow", "size"):
+            if stats[state] is not None:
+                gauge.set(stats[state], engine=name, state=state)
+
+
+POOL_CONNECTIONS = metrics.gauge(
+    "db_pool_connections",
+    "Connection pool usage per engine.",
+    ("engine", "state"),
+    callback=_collect_pool_stats,
+)
+
+
+def _metrics_allowed():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") == f"Bearer {token}":
+        return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or "")
+    except ValueError:
+        return False
+    return any(
+        address in network for network in current_app.extensions["metrics_networks"]
+    )
+
+
+def metrics_view():
+    if not _metrics_allowed():
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    return Response(metrics.render(), content_type=metrics.content_type)
+
+
+def init_instrumentation(app, db):
+    """Hooks request timing, SQL counting, slow-query logging and profiling into an app."""
+    if not app.config.get("INSTRUMENTATION_ENABLED", True):
+        return
+
+    app.extensions["sampling_profiler"] = SamplingProfiler(
+        app.config.get("PROFILER_INTERVAL_MS", 5) / 1000
+    )
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    with app.app_context():
+        for engine in all_engines(db).values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(
+                engine,
+                "after_cursor_execute",
+                _query_timer(app.config.get("SLOW_QUERY_MS", 500)),
+            )
+            event.listen(engine, "handle_error", _handle_error)
+    networks = [
+        ipaddress.ip_network(n.strip(), strict=False)
+        for n in app.config.get("METRICS_ALLOWED_NETWORKS", ())
+    ]
+    if app.config.get("METRICS_TOKEN") or networks:
+        # Without a token or an allowlist the endpoint would be public, so it is not served
+        app.extensions["metrics_networks"] = networks
+        app.add_url_rule("/metrics", "metrics", metrics_view)
+    else:
+        logger.info(
+            "/metrics is not served; set METRICS_TOKEN or METRICS_ALLOWED_NETWORKS to enable it."
+        )
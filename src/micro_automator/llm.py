@@ -0,0 +1,46 @@
+import importlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Modules that are slow to import and only needed by a few endpoints
+HEAVY_MODULES = ("google.generativeai", "fitz", "PIL.Image", "pytesseract")
+
+_lock = threading.Lock()
+_genai = None
+
+
+def genai():
+    """Returns the google.generativeai module, importing and configuring it on first use."""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as module
+
+                api_key = os.getenv("GOOGLE_API_KEY")
+                if api_key:
+                    module.configure(api_key=api_key)
+                else:
+                    logger.error(
+                        "Failed to configure Gemini API: GOOGLE_API_KEY not set."
+                    )
+                _genai = module
+    return _genai
+
+
+def get_model(name, **kwargs):
+    """Returns a Gemini model by name, e.g. get_model('gemini-2.5-flash', system_instruction=...)."""
+    return genai().GenerativeModel(name, **kwargs)
+
+
+def preload():
+    """Imports the heavy modules up front (LAZY_IMPORTS=false) instead of on first request."""
+    genai()
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Could not preload {name}: {e}")
@@ -1,4 +1,6 @@
+from sqlalchemy import inspect
 from ..extensions import db
+from ..storage import thumbnail_url
 import datetime
 
 class Client(db.Model):
@@ -12,7 +14,15 @@ class Client(db.Model):
     premium_amount = db.Column(db.Float, nullable=True)
     expiration_date = db.Column(db.Date, nullable=True)
     last_contact = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    # Photo extracted from the client's documents, served from the upload store
+    photo_url = db.Column(db.String(512), nullable=True)
     
+    # The dashboard counts clients by status within a last_contact or expiration_date range
+    __table_args__ = (
+        db.Index('ix_client_status_last_contact', 'status', 'last_contact'),
+        db.Index('ix_client_status_expiration_date', 'status', 'expiration_date'),
+    )
+
     # Relationships
     follow_ups = db.relationship('FollowUp', backref='client', lazy=True, cascade="all, delete-orphan")
     forms = db.relationship('Form', backref='client', lazy=True, cascade="all, delete-orphan")
@@ -29,11 +39,17 @@ class Client(db.Model):
             'premiumAmount': self.premium_amount,
             'expirationDate': self.expiration_date.isoformat() if self.expiration_date else None,
             'lastContact': self.last_contact.isoformat(),
+            'photoUrl': self.photo_url,
+            'photoThumbnailUrl': thumbnail_url(self.photo_url),
             'nextFollowUp': self.get_next_follow_up_date(),
             'forms_status': self.get_forms_status()
         }
 
     def get_next_follow_up_date(self):
+        # Reuse the follow-ups when the caller eager-loaded them instead of querying per client
+        if 'follow_ups' not in inspect(self).unloaded:
+            pending = [f.due_date for f in self.follow_ups if not f.completed]
+            return min(pending).isoformat() if pending else None
         next_follow_up = FollowUp.query.filter_by(client_id=self.id, completed=False).order_by(FollowUp.due_date.asc()).first()
         return next_follow_up.due_date.isoformat() if next_follow_up else None
 
@@ -56,10 +72,21 @@ class FollowUp(db.Model):
     notes = db.Column(db.Text, nullable=True)
     completed = db.Column(db.Boolean, default=False)
 
+    # Next open follow-up per client, and a partial index for today's open follow-ups
+    __table_args__ = (
+        db.Index('ix_follow_up_client_completed_due_date', 'client_id', 'completed', 'due_date'),
+        db.Index('ix_follow_up_open_due_date', 'due_date',
+                 postgresql_where=db.text('NOT completed'), sqlite_where=db.text('completed = 0')),
+    )
+
 class Form(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
     form_type = db.Column(db.String(100), nullable=False)  # e.g., Aadhaar, PAN, Proposal Form
     status = db.Column(db.String(50), default='Uploaded')
     file_url = db.Column(db.String(512), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_form_client_id', 'client_id'),
+    )
\ No newline at end of file
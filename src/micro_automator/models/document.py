@@ -1,5 +1,19 @@
 from ..extensions import db
 import datetime
+import zlib
+
+
+class CompressedText(db.TypeDecorator):
+    """Text stored zlib-compressed. OCR and PDF text compresses several times over."""
+    impl = db.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return zlib.compress(value.encode('utf-8'), 6) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return zlib.decompress(value).decode('utf-8') if value is not None else None
+
 
 class Document(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -15,6 +29,38 @@ class Document(db.Model):
     ai_sentiment = db.Column(db.String(50), nullable=True)
     ai_action_items = db.Column(db.JSON, nullable=True) # Will store a list of strings
 
+    # The client the document was matched to, if any
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id', ondelete='SET NULL'), nullable=True)
+    client = db.relationship('Client', backref=db.backref('documents', lazy=True))
+
+    # The raw text the document was analyzed from; only the search index reads it, so it is not loaded by default
+    extracted_text = db.deferred(db.Column(CompressedText, nullable=True))
+
+    # The documents list pages newest first, optionally within one or more categories
+    __table_args__ = (
+        db.Index('ix_document_upload_date_id', 'upload_date', 'id'),
+        db.Index('ix_document_category_upload_date_id', 'ai_category', 'upload_date', 'id'),
+        db.Index('ix_document_client_id', 'client_id'),
+    )
+
+    # Columns the list endpoint loads by default; the large JSON ones are opt-in
+    SUMMARY_FIELDS = ('id', 'filename', 'upload_date', 'ai_summary', 'ai_category', 'ai_sentiment', 'client_id')
+    OPTIONAL_FIELDS = ('extracted_data', 'ai_action_items')
+
+    def to_summary(self, include=()):
+        summary = {
+            'id': self.id,
+            'filename': self.filename,
+            'upload_date': self.upload_date.isoformat(),
+            'ai_summary': self.ai_summary,
+            'ai_category': self.ai_category,
+            'ai_sentiment': self.ai_sentiment,
+            'client_id': self.client_id,
+        }
+        for field in include:
+            summary[field] = getattr(self, field)
+        return summary
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -25,4 +71,5 @@ class Document(db.Model):
             'ai_category': self.ai_category,
             'ai_sentiment': self.ai_sentiment,
             'ai_action_items': self.ai_action_items,
+            'client_id': self.client_id,
         }
\ No newline at end of file
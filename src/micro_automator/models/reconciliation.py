@@ -18,6 +18,11 @@ class Transaction(db.Model):
     status = db.Column(db.String(50), default='unmatched') # unmatched, matched, reconciled
     match_id = db.Column(db.Integer, nullable=True) # To link matched pairs
 
+    # Batch details read a batch's unmatched transactions by source and count the matched ones
+    __table_args__ = (
+        db.Index('ix_transaction_batch_status_source', 'batch_id', 'status', 'source'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
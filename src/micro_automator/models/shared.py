@@ -6,10 +6,26 @@ class Reminder(db.Model):
     client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
     message = db.Column(db.Text, nullable=False)
     due_at = db.Column(db.DateTime, nullable=False)
-    status = db.Column(db.String(50), default='pending') # pending, sent, failed
+    status = db.Column(db.String(50), default='pending') # pending, sending, sent, failed
+    kind = db.Column(db.String(50), nullable=False, default='renewal', server_default='renewal') # renewal, adhoc
+    # Delivery bookkeeping maintained by the reminder dispatcher
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
     
     client = db.relationship('Client', backref=db.backref('reminders', lazy=True, cascade="all, delete-orphan"))
 
+    # One reminder per client, due date and kind; the sweeper relies on this instead of message text
+    __table_args__ = (
+        db.UniqueConstraint('client_id', 'due_at', 'kind', name='uq_reminder_client_due_kind'),
+        # The dispatcher polls for due reminders by status
+        db.Index('ix_reminder_status_due_at', 'status', 'due_at'),
+        # The renewal sweep looks up existing reminders by kind and due date
+        db.Index('ix_reminder_kind_due_at', 'kind', 'due_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -17,10 +33,33 @@ class Reminder(db.Model):
             'message': self.message,
             'dueAt': self.due_at.isoformat(),
             'status': self.status,
+            'kind': self.kind,
+            'attempts': self.attempts,
+            'sentAt': self.sent_at.isoformat() if self.sent_at else None,
+            'lastError': self.last_error,
         }
 
 class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     event_type = db.Column(db.String(100), nullable=False)
     details = db.Column(db.JSON, nullable=True)
-    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
\ No newline at end of file
+    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    # Keyset pagination walks (timestamp, id); the event_type index serves filtered pages
+    __table_args__ = (
+        db.Index('ix_audit_log_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_log_event_type_timestamp', 'event_type', 'timestamp', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'eventType': self.event_type,
+            'details': self.details,
+            'timestamp': self.timestamp.isoformat(),
+        }
+class DataVersion(db.Model):
+    """A counter per cached view, bumped in the same transaction as every change it depends on."""
+    __tablename__ = 'data_version'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
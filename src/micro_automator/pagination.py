@@ -0,0 +1,97 @@
+import base64
+from datetime import UTC, datetime
+
+from flask import jsonify, request
+from sqlalchemy import tuple_
+
+
+def parse_limit(raw, default=50, maximum=500):
+    """Parses a ?limit= value, clamping it to [1, maximum]."""
+    if raw in (None, ""):
+        return default
+    try:
+        return max(1, min(int(raw), maximum))
+    except ValueError as e:
+        raise ValueError("'limit' must be an integer.") from e
+
+
+def parse_offset(raw, maximum=1000):
+    """Parses an ?offset= value for endpoints that cannot use a cursor, such as ranked search."""
+    if raw in (None, ""):
+        return 0
+    try:
+        offset = int(raw)
+    except ValueError as e:
+        raise ValueError("'offset' must be an integer.") from e
+    if not 0 <= offset <= maximum:
+        raise ValueError(f"'offset' must be between 0 and {maximum}.")
+    return offset
+
+
+def parse_datetime(raw, name):
+    """
+    Parses an ISO-8601 query parameter, returning None when it is absent. Values with
+    an offset, such as a Z suffix, are converted to naive UTC like the stored timestamps.
+    """
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError as e:
+        raise ValueError(f"'{name}' must be an ISO-8601 date or datetime.") from e
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(sort_value, row_id):
+    """Builds an opaque cursor pointing just past the given row."""
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        sort_value, row_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        )
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("'cursor' is invalid.") from e
+
+
+def keyset_page(query, sort_column, id_column, cursor=None, limit=50):
+    """
+    Returns one page of rows ordered newest first by (sort_column, id_column), plus
+    the cursor for the next page. Seeking past the cursor instead of using OFFSET
+    keeps every page an index range scan, however deep the client pages.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(sort_column, id_column) < tuple_(sort_value, row_id)
+        )
+
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return rows, next_cursor
+
+
+def page_response(items, next_cursor):
+    """
+    Wraps a page as {"items": [...], "nextCursor": ...} when the client pages with
+    ?cursor= or ?limit=. Otherwise the first page is a bare array, as these endpoints
+    returned before they were paged, and the next page's cursor is in X-Next-Cursor.
+    """
+    if "cursor" in request.args or "limit" in request.args:
+        return jsonify({"items": items, "nextCursor": next_cursor})
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
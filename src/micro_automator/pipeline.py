@@ -0,0 +1,272 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import has_app_context
+
+logger = logging.getLogger(__name__)
+
+
+class StageMetrics:
+    """Per-stage throughput, latency, rejections and queue depth in a MetricsRegistry."""
+
+    def __init__(self, registry, stages):
+        # Registering an existing name returns the metric already there, so apps share these series
+        self.tasks = registry.counter(
+            "pipeline_stage_tasks_total",
+            "Tasks finished per pipeline stage.",
+            ("stage", "outcome"),
+        )
+        self.seconds = registry.histogram(
+            "pipeline_stage_seconds",
+            "Time from submitting a task to a pipeline stage to its result, queueing included.",
+            ("stage",),
+        )
+        self.rejected = registry.counter(
+            "pipeline_stage_rejected_total",
+            "Tasks turned away because a pipeline stage queue was full.",
+            ("stage",),
+        )
+        self.depth = registry.gauge(
+            "pipeline_stage_tasks",
+            "Tasks running in and queued for each pipeline stage.",
+            ("stage", "state"),
+        )
+        self.depth.callback = lambda gauge: self._collect_depth(gauge, stages)
+
+    @staticmethod
+    def _collect_depth(gauge, stages):
+        for stage in stages().values():
+            in_flight = stage.in_flight
+            gauge.set(min(in_flight, stage.workers), stage=stage.name, state="running")
+            gauge.set(
+                max(in_flight - stage.workers, 0), stage=stage.name, state="queued"
+            )
+
+
+class PipelineFull(Exception):
+    """A stage's queue stayed full for DOCUMENT_PIPELINE_SUBMIT_TIMEOUT seconds."""
+
+
+def _in_app_context(app, func, *args, **kwargs):
+    with app.app_context():
+        return func(*args, **kwargs)
+
+
+class Stage:
+    """
+    One step of the pipeline with its own executor and a bounded queue.
+
+    'process' stages run on a process pool (CPU-bound work, which would otherwise hold
+    the GIL), 'thread' stages on a thread pool (waiting on Gemini or the database), and
+    'inline' stages in the caller's thread. At most `workers + queue_size` tasks are
+    accepted at once; submit() waits up to `submit_timeout` seconds for a free slot and
+    then raises PipelineFull, which callers turn into a 503. Stages given an app run
+    their tasks inside an app context of their own.
+
+    A process pool is broken for good once one of its children dies (out of memory, a
+    crash in a native library on a bad PDF). The tasks it was running fail with
+    BrokenProcessPool, and the stage replaces the pool so later tasks still run.
+    """
+
+    def __init__(
+        self,
+        name,
+        executor="thread",
+        workers=4,
+        queue_size=32,
+        submit_timeout=5.0,
+        app=None,
+        metrics=None,
+    ):
+        self.name = name
+        self.metrics = metrics
+        self.kind = executor
+        self.workers = workers
+        self.submit_timeout = submit_timeout
+        self._app = app
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self.in_flight = 0
+
+    def _get_executor(self):
+        # Created on first use, so stages an app never uses start no workers or processes
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        # spawn, not fork: forking a threaded web worker can copy held locks
+                        self._executor = ProcessPoolExecutor(
+                            self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            self.workers, thread_name_prefix=f"pipeline-{self.name}"
+                        )
+                    atexit.register(self._executor.shutdown, wait=False)
+        return self._executor
+
+    def _replace_broken(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                logger.error(
+                    f"A worker process of pipeline stage '{self.name}' died; starting a new pool."
+                )
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_to_executor(self, func, *args, **kwargs):
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            # Broken by a task whose failure has not been handled yet
+            self._replace_broken(executor)
+            executor = self._get_executor()
+            future = executor.submit(func, *args, **kwargs)
+        if self.kind == "process":
+
+            def replace_if_broken(f):
+                if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                    self._replace_broken(executor)
+
+            future.add_done_callback(replace_if_broken)
+        return future
+
+    def submit(self, func, *args, **kwargs):
+        """Queues func(*args, **kwargs) on this stage and returns its Future."""
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            if self.metrics:
+                self.metrics.rejected.inc(stage=self.name)
+            logger.warning(
+                f"Pipeline stage '{self.name}' stayed full for {self.submit_timeout} s; rejecting a task."
+            )
+            raise PipelineFull(
+                f"The document pipeline's {self.name} stage is busy; try again shortly."
+            )
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+
+        if self._app is not None and (self.kind == "thread" or not has_app_context()):
+            func, args = _in_app_context, (self._app, func) + args
+        try:
+            if self.kind == "inline":
+                future = Future()
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except Exception as e:  # noqa: BLE001 - re-raised by future.result()
+                    future.set_exception(e)
+            else:
+                future = self._submit_to_executor(func, *args, **kwargs)
+        except BaseException:
+            self._finished(started, "error")
+            raise
+        future.add_done_callback(
+            lambda f: self._finished(
+                started, "error" if f.cancelled() or f.exception() else "ok"
+            )
+        )
+        return future
+
+    def run(self, func, *args, **kwargs):
+        """Runs func on this stage and waits for its result."""
+        return self.submit(func, *args, **kwargs).result()
+
+    def _finished(self, started, outcome):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+        if self.metrics:
+            self.metrics.tasks.inc(stage=self.name, outcome=outcome)
+            self.metrics.seconds.observe(time.perf_counter() - started, stage=self.name)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class DocumentPipeline:
+    """
+    The stages shared by every document entry point (single and bulk uploads,
+    reconciliation statements):
+
+    - extract: PDF text, embedded photos and OCR; CPU-bound, on a process pool
+    - analyze: Gemini calls and parsing their JSON; I/O-bound, on threads
+    - persist: the upload store and database writes; I/O-bound, on threads
+    - bulk: threads that hand each file of a bulk upload from stage to stage. They only
+      wait, but sharing one bounded pool caps the threads a burst of bulk requests starts
+
+    Entry points chain the stages themselves, so while one upload waits on Gemini the
+    next one's PDF is already being parsed. DOCUMENT_PIPELINE_MODE='inline' runs every
+    stage in the caller's thread instead (tests, single-threaded debugging).
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.inline = True
+
+    def init_app(self, app):
+        app.extensions["document_pipeline"] = self
+        for stage in self.stages.values():
+            stage.shutdown()
+
+        self.inline = app.config.get("DOCUMENT_PIPELINE_MODE", "staged") == "inline"
+        queue_size = app.config.get("DOCUMENT_PIPELINE_QUEUE_SIZE", 32)
+        submit_timeout = app.config.get("DOCUMENT_PIPELINE_SUBMIT_TIMEOUT", 5.0)
+        from .extensions import metrics  # extensions imports this module
+
+        stage_metrics = StageMetrics(metrics, lambda: self.stages)
+
+        def stage(name, executor, workers, **kwargs):
+            return Stage(
+                name,
+                "inline" if self.inline else executor,
+                workers,
+                queue_size,
+                submit_timeout,
+                metrics=stage_metrics,
+                **kwargs,
+            )
+
+        self.stages = {
+            "extract": stage(
+                "extract",
+                app.config.get("DOCUMENT_EXTRACT_EXECUTOR", "process"),
+                app.config.get("DOCUMENT_EXTRACT_WORKERS") or os.cpu_count() or 2,
+            ),
+            "analyze": stage(
+                "analyze", "thread", app.config.get("DOCUMENT_ANALYZE_WORKERS", 8)
+            ),
+            "persist": stage(
+                "persist",
+                "thread",
+                app.config.get("DOCUMENT_PERSIST_WORKERS", 4),
+                app=app,
+            ),
+            "bulk": stage("bulk", "thread", app.config.get("DOCUMENT_BULK_WORKERS", 8)),
+        }
+
+    @property
+    def extract(self):
+        return self.stages["extract"]
+
+    @property
+    def analyze(self):
+        return self.stages["analyze"]
+
+    @property
+    def persist(self):
+        return self.stages["persist"]
+
+    @property
+    def bulk(self):
+        return self.stages["bulk"]
@@ -0,0 +1,299 @@
+"""
+Columnar export of reconciliation history for offline analytics.
+
+`flask reconciliation export` streams transactions of batches not yet exported into
+Parquet (or Arrow IPC) files partitioned by the month the batch ran,
+month=YYYY-MM/part-<first batch id>.<ext>, and records the last exported batch in
+_manifest.json so every run only appends new batches. monthly_summary() aggregates
+those files with Arrow's vectorized kernels and never touches the database.
+
+pyarrow is optional and imported on first use, so it does not slow every worker's
+boot; without it exports and summaries raise AnalyticsUnavailable.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from .models.reconciliation import ReconciliationBatch, Transaction
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "_manifest.json"
+MONTH = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+# Export format -> (pyarrow.dataset format name, file extension)
+FORMATS = {
+    "parquet": ("parquet", "parquet"),
+    "arrow": ("ipc", "arrow"),
+}
+
+# Exported columns, in select order. Descriptions are left out: free text is not
+# needed for aggregates and can name clients.
+_COLUMNS = (
+    ReconciliationBatch.timestamp,
+    Transaction.batch_id,
+    Transaction.id,
+    Transaction.source,
+    Transaction.transaction_date,
+    Transaction.amount,
+    Transaction.reference_id,
+    Transaction.status,
+    Transaction.match_id,
+)
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """Raised when pyarrow is not installed."""
+
+
+def _require_pyarrow():
+    """Returns the pyarrow modules (pyarrow, compute, dataset, parquet), importing them on first use."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise AnalyticsUnavailable(
+            "Reconciliation analytics need pyarrow (pip install pyarrow)."
+        ) from None
+    return pyarrow, pyarrow.compute, pyarrow.dataset, pyarrow.parquet
+
+
+def _schema():
+    pa = _require_pyarrow()[0]
+    return pa.schema(
+        [
+            ("batch_timestamp", pa.timestamp("us")),
+            ("batch_id", pa.int64()),
+            ("transaction_id", pa.int64()),
+            ("source", pa.string()),
+            ("transaction_date", pa.date32()),
+            ("amount", pa.float64()),
+            ("reference_id", pa.string()),
+            ("status", pa.string()),
+            ("match_id", pa.int64()),
+        ]
+    )
+
+
+def _read_manifest(export_dir):
+    try:
+        with open(os.path.join(export_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"lastBatchId": 0, "format": None, "files": []}
+
+
+def _write_manifest(export_dir, manifest):
+    path = os.path.join(export_dir, MANIFEST)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _open_writer(path, export_format):
+    pa, _, _, pq = _require_pyarrow()
+    if export_format == "parquet":
+        return pq.ParquetWriter(path, _schema(), compression="zstd")
+    return pa.ipc.new_file(path, _schema())
+
+
+def export_transactions(
+    session,
+    export_dir,
+    export_format="parquet",
+    chunk_size=5000,
+    settle_minutes=10,
+    now=None,
+):
+    """
+    Appends the transactions of every batch newer than the manifest's lastBatchId and
+    older than `settle_minutes` (a run keeps updating its batch while matching).
+
+    Rows are read `chunk_size` at a time and written to one open writer per month, so
+    memory stays flat however large the backlog. Files are written under a dot-prefixed
+    name that dataset discovery ignores and renamed into place before the manifest is
+    updated, so an interrupted export is simply redone by the next run: its files keep
+    the same names and are overwritten.
+    """
+    pa = _require_pyarrow()[0]
+    if export_format not in FORMATS:
+        raise ValueError(
+            f"Unknown export format {export_format!r}; use one of {', '.join(FORMATS)}."
+        )
+    manifest = _read_manifest(export_dir)
+    if manifest["format"] not in (None, export_format):
+        raise ValueError(
+            f"{export_dir} already holds {manifest['format']} files; export to another folder."
+        )
+
+    cutoff = (now or datetime.now(UTC).replace(tzinfo=None)) - timedelta(
+        minutes=settle_minutes
+    )
+    first_batch = manifest["lastBatchId"] + 1
+    last_batch = session.execute(
+        select(func.max(ReconciliationBatch.id)).where(
+            ReconciliationBatch.id >= first_batch,
+            ReconciliationBatch.timestamp < cutoff,
+        )
+    ).scalar()
+    if last_batch is None:
+        return {"transactions": 0, "files": [], "lastBatchId": manifest["lastBatchId"]}
+
+    rows = session.execute(
+        select(*_COLUMNS)
+        .join(ReconciliationBatch, Transaction.batch_id == ReconciliationBatch.id)
+        .where(Transaction.batch_id.between(first_batch, last_batch))
+        .order_by(Transaction.batch_id, Transaction.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    extension = FORMATS[export_format][1]
+    schema = _schema()
+    writers, exported = {}, 0
+    try:
+        for chunk in rows.partitions():
+            by_month = {}
+            for row in chunk:
+                by_month.setdefault(row[0].strftime("%Y-%m"), []).append(row)
+            for month, month_rows in by_month.items():
+                if month not in writers:
+                    directory = os.path.join(export_dir, f"month={month}")
+                    os.makedirs(directory, exist_ok=True)
+                    name = f"month={month}/part-{first_batch:010d}.{extension}"
+                    tmp = os.path.join(
+                        directory, f".part-{first_batch:010d}.{extension}.tmp"
+                    )
+                    writers[month] = (name, tmp, _open_writer(tmp, export_format))
+                columns = zip(*month_rows, strict=True)
+                writers[month][2].write_table(
+                    pa.Table.from_arrays(
+                        [
+                            pa.array(column, type=field.type)
+                            for column, field in zip(columns, schema, strict=True)
+                        ],
+                        schema=schema,
+                    )
+                )
+            exported += len(chunk)
+    except BaseException:
+        for _, tmp, writer in writers.values():
+            writer.close()
+            os.remove(tmp)
+        raise
+
+    files = []
+    for name, tmp, writer in writers.values():
+        writer.close()
+        os.replace(tmp, os.path.join(export_dir, *name.split("/")))
+        files.append(name)
+
+    manifest.update(
+        lastBatchId=last_batch,
+        format=export_format,
+        files=sorted(set(manifest["files"]) | set(files)),
+        exportedAt=datetime.now(UTC).replace(tzinfo=None).isoformat(),
+    )
+    _write_manifest(export_dir, manifest)
+    logger.info(
+        f"Exported {exported} transactions of batches {first_batch}-{last_batch} to {len(files)} file(s)."
+    )
+    return {"transactions": exported, "files": files, "lastBatchId": last_batch}
+
+
+def _dataset(export_dir):
+    pa, _, ds, _ = _require_pyarrow()
+    manifest = _read_manifest(export_dir)
+    if not manifest["files"]:
+        return None, manifest
+    # The manifest, not a directory listing, says which files are complete
+    paths = [os.path.join(export_dir, *name.split("/")) for name in manifest["files"]]
+    partitioning = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+    return ds.dataset(
+        paths,
+        format=FORMATS[manifest["format"]][0],
+        partitioning=partitioning,
+        partition_base_dir=export_dir,
+    ), manifest
+
+
+def monthly_summary(export_dir, since=None, until=None):
+    """
+    Month-over-month match rate, unmatched totals and amounts by source, from the
+    exported files only. `since` and `until` are inclusive YYYY-MM months; they prune
+    whole partitions before any file is read.
+    """
+    pa, pc, ds, _ = _require_pyarrow()
+    dataset, manifest = _dataset(export_dir)
+    if dataset is None:
+        return {"months": [], "lastBatchId": manifest["lastBatchId"]}
+
+    expression = None
+    for condition in (
+        (ds.field("month") >= since) if since else None,
+        (ds.field("month") <= until) if until else None,
+    ):
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+    table = dataset.to_table(
+        columns=["month", "source", "amount", "status"], filter=expression
+    )
+
+    # Matched and reconciled rows both count as matched
+    matched = pc.fill_null(pc.not_equal(table["status"], "unmatched"), False)
+    table = table.append_column("matched", pc.cast(matched, pa.int64()))
+    table = table.append_column(
+        "unmatched_amount", pc.if_else(matched, 0.0, table["amount"])
+    )
+    grouped = table.group_by(["month", "source"]).aggregate(
+        [
+            ("amount", "count"),
+            ("amount", "sum"),
+            ("matched", "sum"),
+            ("unmatched_amount", "sum"),
+        ]
+    )
+
+    months = {}
+    for row in grouped.to_pylist():
+        month = months.setdefault(
+            row["month"],
+            {
+                "month": row["month"],
+                "transactions": 0,
+                "matched": 0,
+                "amount": 0.0,
+                "unmatchedAmount": 0.0,
+                "bySource": {},
+            },
+        )
+        month["transactions"] += row["amount_count"]
+        month["matched"] += row["matched_sum"]
+        month["amount"] += row["amount_sum"] or 0.0
+        month["unmatchedAmount"] += row["unmatched_amount_sum"] or 0.0
+        month["bySource"][row["source"]] = {
+            "transactions": row["amount_count"],
+            "amount": round(row["amount_sum"] or 0.0, 2),
+            "unmatchedAmount": round(row["unmatched_amount_sum"] or 0.0, 2),
+        }
+
+    summary = []
+    for key in sorted(months):
+        month = months[key]
+        month["matchRate"] = (
+            round(month["matched"] / month["transactions"], 4)
+            if month["transactions"]
+            else None
+        )
+        month["amount"] = round(month["amount"], 2)
+        month["unmatchedAmount"] = round(month["unmatchedAmount"], 2)
+        summary.append(month)
+    return {"months": summary, "lastBatchId": manifest["lastBatchId"]}
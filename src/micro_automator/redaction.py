@@ -0,0 +1,156 @@
+import re
+from typing import NamedTuple
+
+
+class PIIPattern(NamedTuple):
+    name: str
+    regex: str
+    # Upper bound on a match's length; streaming holds back this many characters
+    max_length: int
+    # Cheap test that holds wherever `regex` can start matching, e.g. a character class
+    # of possible first characters. Defaults to the regex itself.
+    prefilter: str = None
+
+
+class Span(NamedTuple):
+    """Where a placeholder sits in the redacted output, and what it replaced."""
+
+    kind: str
+    start: int
+    end: int
+    original: str
+
+
+# Order matters: at a given position the first alternative that matches wins, so the
+# specific formats come before the generic digit runs. Patterns may look back at most
+# one character (\b or a one-character lookbehind).
+DEFAULT_PATTERNS = (
+    # Local parts are capped far above RFC 5321's 64 characters: a match must start at
+    # the address's first character, so anything longer than the cap is not redacted
+    PIIPattern(
+        "EMAIL",
+        r"[a-zA-Z0-9._%+-]{1,256}@[a-zA-Z0-9.-]{1,253}\.[a-zA-Z]{2,24}",
+        535,
+        prefilter=r"(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]{1,256}@",
+    ),
+    PIIPattern("AADHAAR", r"\b\d{4}\s\d{4}\s\d{4}\b", 14, prefilter=r"[0-9]"),
+    PIIPattern("PAN", r"\b[A-Z]{5}[0-9]{4}[A-Z]\b", 10, prefilter=r"[A-Z]"),
+    PIIPattern("IFSC", r"\b[A-Z]{4}0[A-Z0-9]{6}\b", 11, prefilter=r"[A-Z]"),
+    PIIPattern("PHONE", r"(?<!\w)(?:\+91[\s-]?)?[6-9]\d{9}\b", 14, prefilter=r"[+6-9]"),
+    PIIPattern("ACCOUNT", r"\b\d{9,18}\b", 18, prefilter=r"[0-9]"),
+)
+
+_CHAR_CLASS = re.compile(r"\[(?:[^\]\\]|\\.)+\]")
+
+
+def _combined_prefilter(patterns):
+    """
+    Joins the prefilters into one lookahead. Single character classes are merged into
+    one class, which re can test far faster than an alternation.
+    """
+    classes, others = [], []
+    for p in patterns:
+        prefilter = p.prefilter or p.regex
+        if _CHAR_CLASS.fullmatch(prefilter):
+            if prefilter[1:-1] not in classes:
+                classes.append(prefilter[1:-1])
+        elif prefilter not in others:
+            others.append(prefilter)
+    if classes:
+        others.append(f"[{''.join(classes)}]")
+    return f"(?=(?:{'|'.join(others)}))"
+
+
+class Redactor:
+    """
+    Redacts every configured PII pattern in a single scan of the text, using one
+    combined regex instead of a re.sub pass per pattern. The combined alternation is
+    guarded by the patterns' prefilters so most positions are rejected after one check.
+    """
+
+    def __init__(self, patterns=DEFAULT_PATTERNS):
+        self.patterns = tuple(patterns)
+        alternation = "|".join(f"(?P<{p.name}>{p.regex})" for p in self.patterns)
+        self._regex = re.compile(
+            f"{_combined_prefilter(self.patterns)}(?:{alternation})"
+        )
+        self._placeholders = {p.name: f"[REDACTED_{p.name}]" for p in self.patterns}
+        self.max_match_length = max(p.max_length for p in self.patterns)
+
+    def redact(self, text, with_spans=False):
+        """Returns the redacted text, or (text, spans) when with_spans is set."""
+        spans = [] if with_spans else None
+        redacted, _ = self._redact_range(text, 0, len(text), True, spans, 0)
+        return (redacted, spans) if with_spans else redacted
+
+    def redact_stream(self, chunks, spans=None):
+        """
+        Redacts an iterable of text chunks, yielding redacted pieces as soon as they
+        are final. The last max_match_length characters are held back until the next
+        chunk arrives, so PII split across a chunk boundary is still caught. Pass a
+        list as `spans` to collect span offsets (relative to the joined output).
+        """
+        buffer, start, emitted = "", 0, 0
+        for chunk in chunks:
+            buffer += chunk
+            limit = len(buffer) - self.max_match_length
+            if limit <= start:
+                continue
+            piece, consumed = self._redact_range(
+                buffer, start, limit, False, spans, emitted
+            )
+            emitted += len(piece)
+            yield piece
+            # Keep one character before the new start as context for \b and lookbehinds
+            keep_from = max(consumed - 1, 0)
+            buffer, start = buffer[keep_from:], consumed - keep_from
+
+        piece, _ = self._redact_range(buffer, start, len(buffer), True, spans, emitted)
+        if piece:
+            yield piece
+
+    def _redact_range(self, text, start, limit, final, spans, out_offset):
+        """
+        Redacts matches starting in text[start:limit]. Unless `final`, a match can only
+        be committed if it starts before `limit`; since no match is longer than
+        max_match_length, more input cannot change those. Returns the redacted piece
+        and the position in `text` it covers up to.
+        """
+        out = []
+        pos = start
+        for match in self._regex.finditer(text, start):
+            if not final and match.start() >= limit:
+                break
+            out.append(text[pos : match.start()])
+            placeholder = self._placeholders[match.lastgroup]
+            if spans is not None:
+                out_offset += match.start() - pos
+                spans.append(
+                    Span(
+                        match.lastgroup,
+                        out_offset,
+                        out_offset + len(placeholder),
+                        match.group(),
+                    )
+                )
+                out_offset += len(placeholder)
+            out.append(placeholder)
+            pos = match.end()
+
+        consumed = len(text) if final else max(pos, limit)
+        out.append(text[pos:consumed])
+        return "".join(out), consumed
+
+
+def restore(redacted, spans):
+    """Puts the original values back into redacted text using spans from the same call."""
+    parts, pos = [], 0
+    for span in sorted(spans, key=lambda s: s.start):
+        parts.append(redacted[pos : span.start])
+        parts.append(span.original)
+        pos = span.end
+    parts.append(redacted[pos:])
+    return "".join(parts)
+
+
+default_redactor = Redactor()
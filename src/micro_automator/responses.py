@@ -0,0 +1,264 @@
+import gzip
+import json
+import logging
+import time
+import zlib
+from collections.abc import Callable, Iterable
+from datetime import date
+from typing import NamedTuple
+
+from flask import Response, current_app, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, gzip is used instead
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def _iso_default(o):
+    # Flask's default writes dates as HTTP dates; orjson writes ISO 8601
+    if isinstance(o, date):
+        return o.isoformat()
+    return _default(o)
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """
+    Flask's provider with the same output as OrjsonProvider: dates and datetimes as
+    ISO 8601 and keys in insertion order, so responses do not depend on orjson.
+    """
+
+    sort_keys = False
+    default = staticmethod(_iso_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Serializes with orjson, which encodes datetimes, dates, UUIDs and dataclasses
+    natively (datetimes as ISO 8601) and is several times faster than the json module.
+    Keys are not sorted, unlike Flask's default provider.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=_default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Skips the bytes -> str -> bytes round trip of the default provider
+        body = orjson.dumps(
+            obj,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    "orjson": OrjsonProvider,
+    "default": IsoJSONProvider,
+}
+
+
+def init_json(app):
+    """Installs the JSON_PROVIDER from config, falling back to Flask's if orjson is missing."""
+    name = app.config.get("JSON_PROVIDER", "orjson")
+    if name not in JSON_PROVIDERS:
+        raise ValueError(
+            f"Unknown JSON_PROVIDER '{name}'. Choose one of: {', '.join(JSON_PROVIDERS)}"
+        )
+    if name == "orjson" and orjson is None:
+        logger.warning(
+            "JSON_PROVIDER is 'orjson' but orjson is not installed; using the default provider."
+        )
+        name = "default"
+    app.json_provider_class = JSON_PROVIDERS[name]
+    app.json = app.json_provider_class(app)
+
+
+def dumps_bytes(obj):
+    """Encodes obj to UTF-8 JSON bytes with the fastest encoder available."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_iso_default, separators=(",", ":")).encode()
+
+
+def _array_chunks(items, to_dict, batch_size):
+    # Items are serialized in batches so each chunk written to the socket is reasonably large
+    yield b"["
+    batch, first = [], True
+    for item in items:
+        batch.append(dumps_bytes(to_dict(item) if to_dict else item))
+        if len(batch) >= batch_size:
+            yield (b"" if first else b",") + b",".join(batch)
+            batch, first = [], False
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]"
+
+
+def stream_json_array(items, to_dict=None, batch_size=500):
+    """
+    Streams a JSON array without building the whole list or document in memory.
+    Pass a query's yield_per() as `items` to keep the database side bounded too.
+    """
+
+    def generate():
+        yield from _array_chunks(items, to_dict, batch_size)
+        yield b"\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+class StreamedArray(NamedTuple):
+    """A value of stream_json_object() that is written as a JSON array while it is iterated."""
+
+    items: Iterable
+    to_dict: Callable = None
+
+
+def _object_chunks(obj, batch_size):
+    yield b"{"
+    for i, (key, value) in enumerate(obj.items()):
+        yield (b"," if i else b"") + dumps_bytes(str(key)) + b":"
+        if isinstance(value, StreamedArray):
+            yield from _array_chunks(value.items, value.to_dict, batch_size)
+        elif isinstance(value, dict):
+            yield from _object_chunks(value, batch_size)
+        else:
+            yield dumps_bytes(value)
+    yield b"}"
+
+
+def stream_json_object(obj, batch_size=500):
+    """
+    Streams a JSON object whose StreamedArray values (at any depth) are only iterated,
+    and so queried, while the response is written. Keys keep their order.
+    """
+
+    def generate():
+        yield from _object_chunks(obj, batch_size)
+        yield b"\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+# --- Response compression ---
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    candidates = [("br", accepted["br"])] if brotli is not None else []
+    candidates.append(("gzip", accepted["gzip"]))
+    encoding, quality = max(candidates, key=lambda c: c[1])
+    return encoding if quality > 0 else None
+
+
+class _StreamCompressor:
+    def __init__(self, encoding, config):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(
+                quality=config.get("COMPRESS_BROTLI_QUALITY", 4)
+            )
+            self.compress, self._flush, self._finish = (
+                self._compressor.process,
+                self._compressor.flush,
+                self._compressor.finish,
+            )
+        else:
+            # wbits=31 writes a gzip header and trailer around the deflate stream
+            self._compressor = zlib.compressobj(
+                config.get("COMPRESS_LEVEL", 6), zlib.DEFLATED, 31
+            )
+            self.compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+        self.flush_bytes = config.get("COMPRESS_STREAM_FLUSH_BYTES", 16384)
+        self.flush_seconds = config.get("COMPRESS_STREAM_FLUSH_SECONDS", 0.5)
+
+    def stream(self, chunks):
+        # Each flush ends a deflate block and costs ratio, so it waits for enough input
+        # or time that clients still see a slow stream's data as it is produced
+        pending, flushed_at = 0, time.monotonic()
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = self.compress(chunk)
+            pending += len(chunk)
+            if (
+                pending >= self.flush_bytes
+                or time.monotonic() - flushed_at >= self.flush_seconds
+            ):
+                data += self._flush()
+                pending, flushed_at = 0, time.monotonic()
+            if data:
+                yield data
+        yield self._finish()
+
+
+def _compress_response(response):
+    config = current_app.config
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in config.get("COMPRESS_MIMETYPES", ())
+    ):
+        return response
+
+    if (
+        not response.is_streamed
+        and response.content_length is not None
+        and response.content_length < config.get("COMPRESS_MIN_SIZE", 1024)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _StreamCompressor(encoding, config).stream(
+            response.response
+        )
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if encoding == "br":
+            body = brotli.compress(
+                body, quality=config.get("COMPRESS_BROTLI_QUALITY", 4)
+            )
+        else:
+            body = gzip.compress(
+                body, compresslevel=config.get("COMPRESS_LEVEL", 6), mtime=0
+            )
+        response.set_data(body)
+
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes differ from the identity representation the ETag was computed for
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compresses eligible responses with brotli or gzip, as negotiated via Accept-Encoding."""
+    if app.config.get("COMPRESS_ENABLED", True):
+        app.after_request(_compress_response)
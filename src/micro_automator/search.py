@@ -0,0 +1,280 @@
+"""
+Full-text search over documents.
+
+PostgreSQL keeps a weighted tsvector in document.search_vector behind a GIN index;
+SQLite (local runs and tests) keeps an FTS5 table keyed by document id. Either way
+the index is updated from mapper events as documents are inserted, updated or
+deleted, so it never needs a full rebuild except after bulk loads (`flask documents
+reindex`).
+"""
+
+import re
+
+from sqlalchemy import event, inspect, select, text
+
+from .models.document import Document
+
+# Dropped from SQLite queries so natural phrasing ("the policy with ...") still matches;
+# PostgreSQL's english configuration does the same
+STOPWORDS = frozenset(
+    [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "has",
+        "in",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "this",
+        "to",
+        "was",
+        "with",
+    ]
+)
+SNIPPET_CHARS = 160
+
+# What goes into the index, in _searchable_fields() order
+_INDEXED_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.extracted_data,
+    Document.ai_summary,
+    Document.ai_category,
+    Document.extracted_text,
+)
+
+
+def _searchable_fields(
+    document_id, filename, extracted_data, ai_summary, ai_category, extracted_text
+):
+    """Splits a document into the identifier, summary and body fields that are weighted separately."""
+    data = extracted_data or {}
+    title = " ".join(
+        str(v) for v in (filename, data.get("policyId"), data.get("name")) if v
+    )
+    summary = " ".join(v for v in (ai_summary, ai_category) if v)
+    return {
+        "id": document_id,
+        "title": title,
+        "summary": summary,
+        "body": extracted_text or "",
+    }
+
+
+class PostgresSearch:
+    """tsvector column with weights A (identifiers), B (summary) and C (body text), GIN-indexed."""
+
+    def create(self, connection):
+        connection.execute(
+            text("ALTER TABLE document ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        )
+        connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_document_search_vector ON document USING gin (search_vector)"
+            )
+        )
+
+    def drop(self, connection):
+        pass  # The column and index go with the table
+
+    def index(self, connection, fields):
+        # 'simple' keeps policy numbers and names unstemmed; prose goes through 'english'.
+        # Identifiers are stemmed too, so an 'english' query term (Reddy -> reddi) finds them.
+        connection.execute(
+            text(
+                "UPDATE document SET search_vector = "
+                "setweight(to_tsvector('simple', :title) || to_tsvector('english', :title), 'A') || "
+                "setweight(to_tsvector('english', :summary), 'B') || "
+                "setweight(to_tsvector('english', :body), 'C') "
+                "WHERE id = :id"
+            ),
+            fields,
+        )
+
+    def remove(self, connection, document_id):
+        pass  # Deleting the row deletes its vector
+
+    def search(self, session, query, limit, offset):
+        return session.execute(
+            text(
+                "SELECT d.id, ts_rank_cd(d.search_vector, q) AS score "
+                "FROM document d, "
+                "(SELECT websearch_to_tsquery('simple', :query) || websearch_to_tsquery('english', :query) AS q) t "
+                "WHERE d.search_vector @@ q "
+                "ORDER BY score DESC, d.id DESC LIMIT :limit OFFSET :offset"
+            ),
+            {"query": query, "limit": limit, "offset": offset},
+        ).all()
+
+
+class SQLiteSearch:
+    """FTS5 table whose rowid is the document id, ranked by bm25 with the same field weights."""
+
+    def create(self, connection):
+        connection.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS document_fts "
+                "USING fts5(title, summary, body, tokenize='porter unicode61')"
+            )
+        )
+
+    def drop(self, connection):
+        connection.execute(text("DROP TABLE IF EXISTS document_fts"))
+
+    def index(self, connection, fields):
+        self.remove(connection, fields["id"])
+        connection.execute(
+            text(
+                "INSERT INTO document_fts (rowid, title, summary, body) VALUES (:id, :title, :summary, :body)"
+            ),
+            fields,
+        )
+
+    def remove(self, connection, document_id):
+        connection.execute(
+            text("DELETE FROM document_fts WHERE rowid = :id"), {"id": document_id}
+        )
+
+    def search(self, session, query, limit, offset):
+        match = fts5_query(query)
+        if not match:
+            return []
+        # bm25() is lower-is-better, so it is negated into a score like ts_rank_cd's
+        return session.execute(
+            text(
+                "SELECT rowid AS id, -bm25(document_fts, 10.0, 4.0, 1.0) AS score "
+                "FROM document_fts WHERE document_fts MATCH :match "
+                "ORDER BY score DESC, rowid DESC LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "limit": limit, "offset": offset},
+        ).all()
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearch,
+    "sqlite": SQLiteSearch,
+}
+
+
+def get_backend(dialect_name):
+    backend = SEARCH_BACKENDS.get(dialect_name)
+    return backend() if backend else None
+
+
+def fts5_query(query):
+    """
+    Turns free text into an FTS5 expression: every word must match, and a word with
+    punctuation (TRTL-LIFE-6969) becomes a phrase of its parts, quoted so user input
+    can never be read as FTS5 syntax.
+    """
+    phrases = []
+    for word in query.split():
+        tokens = [t for t in re.findall(r"\w+", word.lower()) if t not in STOPWORDS]
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"')
+    return " ".join(phrases)
+
+
+def make_snippet(content, query):
+    """A short window of `content` around the first query word it contains."""
+    if not content:
+        return None
+    words = [w for w in re.findall(r"\w+", query.lower()) if w not in STOPWORDS]
+    lowered = content.lower()
+    hits = [i for i in (lowered.find(w) for w in words) if i >= 0]
+    start = max(0, min(hits) - SNIPPET_CHARS // 4) if hits else 0
+    snippet = " ".join(content[start : start + SNIPPET_CHARS].split())
+    return (
+        ("…" if start else "")
+        + snippet
+        + ("…" if start + SNIPPET_CHARS < len(content) else "")
+    )
+
+
+def search_documents(session, query, limit=20, offset=0):
+    """Returns (document id, score) pairs for `query`, best match first."""
+    backend = get_backend(session.get_bind().dialect.name)
+    if backend is None:
+        raise NotImplementedError(
+            f"Full-text search is not available on {session.get_bind().dialect.name}."
+        )
+    return backend.search(session, query, limit, offset)
+
+
+def reindex_documents(session, batch_size=500):
+    """Rebuilds the index for every document, e.g. after rows were bulk-loaded. Returns the count."""
+    connection = session.connection()
+    backend = get_backend(connection.dialect.name)
+    if backend is None:
+        return 0
+    backend.create(connection)
+    count = 0
+    for row in session.execute(
+        select(*_INDEXED_COLUMNS).execution_options(yield_per=batch_size)
+    ):
+        backend.index(connection, _searchable_fields(*row))
+        count += 1
+    session.commit()
+    return count
+
+
+# --- Index maintenance ---
+
+
+@event.listens_for(Document.__table__, "after_create")
+def _create_index(table, connection, **kwargs):
+    backend = get_backend(connection.dialect.name)
+    if backend:
+        backend.create(connection)
+
+
+@event.listens_for(Document.__table__, "after_drop")
+def _drop_index(table, connection, **kwargs):
+    backend = get_backend(connection.dialect.name)
+    if backend:
+        backend.drop(connection)
+
+
+@event.listens_for(Document, "after_insert")
+def _index_new_document(mapper, connection, target):
+    backend = get_backend(connection.dialect.name)
+    if backend:
+        # Read what was just inserted straight from the instance; unset columns are None
+        backend.index(
+            connection,
+            _searchable_fields(*(target.__dict__.get(c.key) for c in _INDEXED_COLUMNS)),
+        )
+
+
+@event.listens_for(Document, "after_update")
+def _reindex_document(mapper, connection, target):
+    backend = get_backend(connection.dialect.name)
+    state = inspect(target)
+    if backend is None or not any(
+        state.attrs[c.key].history.has_changes() for c in _INDEXED_COLUMNS
+    ):
+        return
+    # The row may have been loaded without the large columns; read them back instead of lazy-loading mid-flush
+    row = connection.execute(
+        select(*_INDEXED_COLUMNS).where(Document.id == target.id)
+    ).one()
+    backend.index(connection, _searchable_fields(*row))
+
+
+@event.listens_for(Document, "after_delete")
+def _unindex_document(mapper, connection, target):
+    backend = get_backend(connection.dialect.name)
+    if backend:
+        backend.remove(connection, target.id)
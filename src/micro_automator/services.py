@@ -1,25 +1,38 @@
-import re
-from datetime import datetime, timedelta
-from .extensions import db
-from .models import AuditLog, Reminder
-
-RE_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-RE_AADHAAR = re.compile(r"\b\d{4}\s\d{4}\s\d{4}\b")
-RE_PAN = re.compile(r"\b[A-Z]{5}[0-9]{4}[A-Z]{1}\b")
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy.dialects import postgresql, sqlite
+from .extensions import db, event_broker, audit_writer
+from .models import AuditLog, Client, Reminder
+from .redaction import default_redactor
 
 def redact_pii(text: str) -> str:
-    """Finds and redacts common PII from a block of text."""
-    text = RE_EMAIL.sub("[REDACTED_EMAIL]", text)
-    text = RE_AADHAAR.sub("[REDACTED_AADHAAR]", text)
-    text = RE_PAN.sub("[REDACTED_PAN]", text)
-    return text
+    """Finds and redacts common PII (see redaction.DEFAULT_PATTERNS) in a single pass."""
+    return default_redactor.redact(text)
+
+def publish_event(event_type: str, data: dict | None = None):
+    """Queues a live-stream event that is pushed to subscribers once the session commits."""
+    event_broker.publish_after_commit(db.session(), event_type, data)
+    # Like log_audit_event, the calling function is responsible for the db.session.commit()
 
 def log_audit_event(event_type: str, details: dict = None):
-    """Creates a new audit log entry."""
+    """
+    Records an audit event. Normally it is handed to the buffered audit writer, which
+    inserts it in a batch outside the caller's transaction, so it survives a rollback.
+    """
+    if audit_writer.write(event_type, details):
+        return
+    # Inline mode (or a full buffer with the 'inline' policy): write through the caller's session
     audit_log = AuditLog(event_type=event_type, details=details)
     db.session.add(audit_log)
+    publish_event("audit.logged", {"eventType": event_type, "details": details})
     # The calling function is responsible for the db.session.commit()
 
+def _renewal_due_at(expiration_date, days_before):
+    return datetime.combine(expiration_date, datetime.min.time()) - timedelta(days=days_before)
+
+def _renewal_message(name, policy_id, expiration_date):
+    return f"Policy {policy_id or 'N/A'} for {name} is due for renewal on {expiration_date.strftime('%Y-%m-%d')}."
+
 def schedule_renewal_reminder(client, days_before=15):
     """
     Creates a policy renewal reminder for a client.
@@ -29,20 +42,85 @@ def schedule_renewal_reminder(client, days_before=15):
         return None
     
     # client.expiration_date is now a proper date object, so datetime.combine works perfectly.
-    due_at = datetime.combine(client.expiration_date, datetime.min.time()) - timedelta(days=days_before)
+    due_at = _renewal_due_at(client.expiration_date, days_before)
     
-    reminder_message = f"Policy {client.policy_id or 'N/A'} for {client.name} is due for renewal on {client.expiration_date.strftime('%Y-%m-%d')}."
+    reminder_message = _renewal_message(client.name, client.policy_id, client.expiration_date)
     
-    # Check if a similar reminder already exists to avoid duplicates
-    existing_reminder = Reminder.query.filter_by(client_id=client.id, message=reminder_message).first()
+    # Check if a reminder for this client, due date and kind already exists to avoid duplicates
+    existing_reminder = Reminder.query.filter_by(client_id=client.id, due_at=due_at, kind='renewal').first()
     if existing_reminder:
         return None # Don't create a duplicate reminder
 
     reminder = Reminder(
         client_id=client.id,
         message=reminder_message,
-        due_at=due_at
+        due_at=due_at,
+        kind='renewal'
     )
     db.session.add(reminder)
     log_audit_event("renewal_reminder_scheduled", {"client_id": client.id, "due_at": due_at.isoformat()})
-    return reminder
\ No newline at end of file
+    return reminder
+
+def _insert_ignoring_duplicates(model, rows, key):
+    """
+    Bulk-inserts rows, letting the unique key silently absorb a concurrent sweeper's inserts.
+    Returns how many rows were actually inserted.
+    """
+    dialect = db.session.get_bind().dialect
+    if dialect.name == 'postgresql':
+        stmt = postgresql.insert(model).on_conflict_do_nothing(index_elements=key)
+    elif dialect.name == 'sqlite':
+        stmt = sqlite.insert(model).on_conflict_do_nothing(index_elements=key)
+    else:
+        stmt = db.insert(model)
+    if dialect.insert_executemany_returning:
+        # Skipped rows return nothing, and executemany rowcounts are not reliable across drivers
+        return len(db.session.execute(stmt.returning(model.id), rows).all())
+    return db.session.execute(stmt, rows).rowcount
+
+def sweep_renewal_reminders(window_days=30, days_before=15, today=None):
+    """
+    Creates every missing renewal reminder for clients whose policy expires within the
+    next `window_days`, using one query for the clients, one for the reminders that
+    already exist and a single bulk insert, instead of three queries per client.
+    Returns a small report with the runtime and the number of rows created.
+    """
+    started = time.perf_counter()
+    today = today or date.today()
+    window_end = today + timedelta(days=window_days)
+
+    clients = db.session.query(Client.id, Client.name, Client.policy_id, Client.expiration_date).filter(
+        Client.expiration_date >= today,
+        Client.expiration_date <= window_end
+    ).all()
+
+    existing = set(db.session.query(Reminder.client_id, Reminder.due_at).filter(
+        Reminder.kind == 'renewal',
+        Reminder.due_at >= _renewal_due_at(today, days_before),
+        Reminder.due_at <= _renewal_due_at(window_end, days_before)
+    ).all())
+
+    rows = []
+    for client in clients:
+        due_at = _renewal_due_at(client.expiration_date, days_before)
+        if (client.id, due_at) in existing:
+            continue
+        rows.append({
+            'client_id': client.id,
+            'message': _renewal_message(client.name, client.policy_id, client.expiration_date),
+            'due_at': due_at,
+            'status': 'pending',
+            'kind': 'renewal',
+        })
+
+    created = _insert_ignoring_duplicates(Reminder, rows, ['client_id', 'due_at', 'kind']) if rows else 0
+
+    report = {
+        "clientsInWindow": len(clients),
+        "created": created,
+        "alreadyScheduled": len(clients) - created,
+        "runtimeMs": round((time.perf_counter() - started) * 1000, 1),
+    }
+    log_audit_event("renewal_reminders_swept", report)
+    db.session.commit()
+    return report
\ No newline at end of file
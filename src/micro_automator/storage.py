@@ -0,0 +1,171 @@
+import atexit
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes that identify the image formats documents contain
+SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+# <2 hex>/<2 hex>/<sha256>.<ext> for originals, <sha256>_<size>.<ext> for thumbnails
+CONTENT_NAME = re.compile(
+    r"^([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}(?:_\d+)?\.[a-z0-9]+$"
+)
+THUMBNAIL_NAME = re.compile(r"^(?P<stem>[0-9a-f/]+)_(?P<size>\d+)\.(?P<ext>webp|jpg)$")
+
+
+def sniff_extension(data):
+    for signature, extension in SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "bin"
+
+
+def is_content_addressed(name):
+    """True for names UploadStore generated, whose bytes can never change."""
+    return CONTENT_NAME.match(name) is not None
+
+
+def thumbnail_name(name, size, extension="webp"):
+    """The name of a stored file's thumbnail, e.g. ab/cd/abcd….jpg -> ab/cd/abcd…_96.webp."""
+    return f"{os.path.splitext(name)[0]}_{size}.{extension}"
+
+
+def thumbnail_url(url, extension="webp"):
+    """The URL of the smallest thumbnail of a stored image, or None for files outside the store."""
+    prefix, _, name = (url or "").rpartition("/uploads/")
+    sizes = current_app.extensions["upload_store"].sizes
+    if not prefix or not sizes or not is_content_addressed(name):
+        return None
+    return f"{prefix}/uploads/{thumbnail_name(name, min(sizes), extension)}"
+
+
+def make_thumbnails(path, sizes):
+    """Writes a WebP and a JPEG thumbnail next to `path` for every size that is missing."""
+    from PIL import Image
+
+    stem = os.path.splitext(path)[0]
+    with Image.open(path) as original:
+        original.load()
+        image = original.convert("RGB")
+    for size in sizes:
+        for extension, image_format in THUMBNAIL_FORMATS.items():
+            target = f"{stem}_{size}.{extension}"
+            if os.path.exists(target):
+                continue
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size))
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format=image_format, quality=80)
+            _write_atomic(target, buffer.getvalue())
+
+
+def _write_atomic(path, data):
+    # Concurrent writers of the same content race harmlessly: the rename is atomic and the bytes are equal
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class UploadStore:
+    """
+    Content-addressed file storage under UPLOAD_FOLDER. Files are named by the SHA-256
+    of their bytes and sharded into two directory levels, so identical uploads are
+    stored once and a name always refers to the same bytes. Image thumbnails are
+    generated after ingest, on a background executor unless UPLOAD_THUMBNAIL_MODE is
+    'inline' (or 'off').
+    """
+
+    def __init__(self):
+        self._executor = None
+        self.mode = "inline"
+        self.sizes = ()
+
+    def init_app(self, app):
+        app.extensions["upload_store"] = self
+        self.mode = app.config.get("UPLOAD_THUMBNAIL_MODE", "background")
+        self.sizes = tuple(app.config.get("UPLOAD_THUMBNAIL_SIZES", (96, 320)))
+        if self.mode == "background" and self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="thumbnails"
+            )
+            atexit.register(self._executor.shutdown, wait=False)
+
+    @property
+    def root(self):
+        return current_app.config["UPLOAD_FOLDER"]
+
+    def path(self, name):
+        return os.path.join(self.root, *name.split("/"))
+
+    def put(self, data):
+        """Stores `data` unless identical bytes already are. Returns the stored name."""
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{digest[:2]}/{digest[2:4]}/{digest}.{sniff_extension(data)}"
+        path = self.path(name)
+        if os.path.exists(path):
+            logger.info(f"Upload {name} already stored; reusing it")
+            return name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, data)
+        if name.endswith((".jpg", ".png", ".gif", ".webp")):
+            self._schedule_thumbnails(path)
+        return name
+
+    def _schedule_thumbnails(self, path):
+        if self.mode == "off" or not self.sizes:
+            return
+        if self._executor is not None and self.mode == "background":
+            self._executor.submit(self._thumbnails_quietly, path, self.sizes)
+        else:
+            self._thumbnails_quietly(path, self.sizes)
+
+    @staticmethod
+    def _thumbnails_quietly(path, sizes):
+        try:
+            make_thumbnails(path, sizes)
+        except Exception:
+            logger.exception(f"Could not generate thumbnails for {path}.")
+
+    def ensure_thumbnail(self, name):
+        """
+        Makes sure a requested thumbnail exists, generating it now if the background step
+        has not got to it yet. Returns False if `name` is not a thumbnail of a stored image.
+        """
+        match = THUMBNAIL_NAME.match(name)
+        if not match or int(match["size"]) not in self.sizes:
+            return False
+        path = self.path(name)
+        if os.path.exists(path):
+            return True
+        stem = self.path(match["stem"])
+        originals = [
+            f"{stem}.{ext}"
+            for ext in ("jpg", "png", "gif", "webp")
+            if os.path.exists(f"{stem}.{ext}")
+        ]
+        if not originals:
+            return False
+        self._thumbnails_quietly(originals[0], self.sizes)
+        return os.path.exists(path)
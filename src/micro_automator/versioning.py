@@ -0,0 +1,82 @@
+"""
+Data versions for cached views such as the dashboard snapshot's ETag.
+
+Flushes that insert, change or delete a row a view depends on mark the view as
+changed; once the transaction commits, the view's counter in data_version is bumped
+in a short transaction of its own, so concurrent writers only contend for the
+counter row for one statement rather than for their whole transaction. Reading the
+version is a primary-key lookup. A reader between the two commits sees new data
+under the old version, which only costs it one extra refetch later. Core bulk
+statements bypass the ORM and do not bump it.
+"""
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from .models.client import Client, FollowUp, Form
+from .models.shared import DataVersion
+
+# View name -> models whose rows it is built from
+TRACKED = {
+    "dashboard": (Client, FollowUp, Form),
+}
+
+
+def current_version(session, name):
+    return (
+        session.execute(
+            select(DataVersion.version).where(DataVersion.name == name)
+        ).scalar()
+        or 0
+    )
+
+
+def _changed_views(session):
+    changed = set()
+    for obj in (
+        list(session.new)
+        + list(session.deleted)
+        + [
+            o
+            for o in session.dirty
+            if session.is_modified(o, include_collections=False)
+        ]
+    ):
+        for name, models in TRACKED.items():
+            if isinstance(obj, models):
+                changed.add(name)
+    return changed
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changes(session, flush_context, instances):
+    # After the flush, session.dirty no longer says whether anything really changed
+    session.info.setdefault("changed_views", set()).update(_changed_views(session))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("changed_views", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    # The migration and create_all seed a row per tracked view, so this never inserts
+    changed = sorted(session.info.pop("changed_views", ()))
+    if not changed:
+        return
+    statement = (
+        update(DataVersion)
+        .where(DataVersion.name.in_(changed))
+        .values(version=DataVersion.version + 1)
+    )
+    with session.get_bind(clause=statement).begin() as connection:
+        connection.execute(statement)
+
+
+@event.listens_for(DataVersion.__table__, "after_create")
+def _seed_versions(table, connection, **kwargs):
+    connection.execute(
+        insert(DataVersion), [{"name": name, "version": 0} for name in TRACKED]
+    )
@@ -1,27 +1,102 @@
-from flask import Blueprint, jsonify
-from ..extensions import db
+import click
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
+from ..database import statement_timeout
 from ..models.shared import AuditLog
+from ..audit_archive import archive_audit_logs, iter_archived_logs
+from ..responses import dumps_bytes
+from ..pagination import keyset_page, page_response, parse_datetime, parse_limit
 
 audits_bp = Blueprint('audits', __name__)
 
+
+def _parse_filters():
+    """Reads the shared eventType/since/until filters from the query string."""
+    event_types = [t for t in request.args.get('eventType', '').split(',') if t]
+    since = parse_datetime(request.args.get('since'), 'since')
+    until = parse_datetime(request.args.get('until'), 'until')
+    return event_types, since, until
+
+
+def _filtered_query(event_types, since, until):
+    query = AuditLog.query
+    if event_types:
+        query = query.filter(AuditLog.event_type.in_(event_types))
+    if since:
+        query = query.filter(AuditLog.timestamp >= since)
+    if until:
+        query = query.filter(AuditLog.timestamp < until)
+    return query
+
+
+def _ndjson_response(rows, filename):
+    return Response(rows, mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename={filename}'
+    })
+
+
 @audits_bp.route('/', methods=['GET'])
+@statement_timeout(10000)
 def get_all_audit_logs():
-    """Fetches all audit log events from the database, most recent first."""
+    """
+    Fetches a page of audit log events, most recent first.
+    Supports ?limit=, ?cursor= (from the previous page's nextCursor), ?eventType=a,b
+    and an ISO ?since=/?until= time range. Without ?limit= or ?cursor= the first page
+    is returned as a bare array (see page_response).
+    """
     try:
-        logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
-        
-        # Manually serialize the data to send back as JSON
-        logs_list = [
-            {
-                "id": log.id,
-                "eventType": log.event_type,
-                "details": log.details,
-                "timestamp": log.timestamp.isoformat()
-            } for log in logs
-        ]
-        
-        return jsonify(logs_list)
+        event_types, since, until = _parse_filters()
+        limit = parse_limit(request.args.get('limit'), default=100, maximum=1000)
+        logs, next_cursor = keyset_page(
+            _filtered_query(event_types, since, until),
+            AuditLog.timestamp, AuditLog.id,
+            cursor=request.args.get('cursor'), limit=limit
+        )
+        return page_response([log.to_dict() for log in logs], next_cursor)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         # It's good practice to log the error on the server
         current_app.logger.error(f"Error fetching audit logs: {e}", exc_info=True)
-        return jsonify({"status": "error", "message": "Could not retrieve audit logs."}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": "Could not retrieve audit logs."}), 500
+
+
+@audits_bp.route('/export', methods=['GET'])
+def export_audit_logs():
+    """Streams every matching audit event as NDJSON without loading the table into memory."""
+    try:
+        event_types, since, until = _parse_filters()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    query = _filtered_query(event_types, since, until).order_by(AuditLog.timestamp.asc(), AuditLog.id.asc())
+
+    def generate():
+        for log in query.yield_per(1000):
+            yield dumps_bytes(log.to_dict()) + b'\n'
+
+    return _ndjson_response(stream_with_context(generate()), 'audit_log.ndjson')
+
+
+@audits_bp.route('/archive', methods=['GET'])
+def export_archived_audit_logs():
+    """Streams archived (retention-expired) audit events as NDJSON, with the same filters."""
+    try:
+        event_types, since, until = _parse_filters()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    rows = iter_archived_logs(current_app.config['AUDIT_ARCHIVE_FOLDER'], event_types, since, until)
+    return _ndjson_response((dumps_bytes(row) + b'\n' for row in rows), 'audit_log_archive.ndjson')
+
+
+@audits_bp.cli.command('archive')
+@click.option('--days', type=int, default=None, help='Archive rows older than this many days.')
+@click.option('--batch-size', type=int, default=5000, show_default=True)
+def archive_command(days, batch_size):
+    """Moves expired audit rows into compressed monthly archive files."""
+    report = archive_audit_logs(
+        current_app.config['AUDIT_ARCHIVE_FOLDER'],
+        older_than_days=days if days is not None else current_app.config['AUDIT_RETENTION_DAYS'],
+        batch_size=batch_size
+    )
+    click.echo(f"Archived {report['archived']} audit log rows older than {report['cutoff']}.")
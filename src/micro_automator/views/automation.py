@@ -1,4 +1,12 @@
-from flask import Blueprint, request, jsonify
+import time
+import click
+from datetime import UTC, datetime
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import update
+
+from ..extensions import db, reminder_dispatcher
+from ..models import Client, Reminder
+from ..services import log_audit_event, sweep_renewal_reminders
 
 automation_bp = Blueprint('automation', __name__)
 
@@ -21,3 +29,88 @@ def send_reminder():
         "status": "success",
         "message": f"Reminder successfully queued for sending to {data['email']}."
     })
+
+def _id_list(data, key):
+    """Reads an optional list of integer ids from the request body."""
+    ids = data.get(key) or []
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValueError(f"'{key}' must be a list of integer ids.")
+    return ids
+
+@automation_bp.route('/reminders/bulk-send', methods=['POST'])
+def bulk_send_reminders():
+    """
+    Queues reminders for the dispatcher and returns straight away, so the web worker
+    never waits on the mail provider.
+    Accepts {"reminderIds": [...]} to send existing pending/failed reminders now, or
+    {"clientIds": [...], "message": "..."} to send an ad-hoc message to many clients.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Send a JSON object."}), 400
+    try:
+        reminder_ids = _id_list(data, 'reminderIds')
+        client_ids = _id_list(data, 'clientIds')
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if not reminder_ids and not client_ids:
+        return jsonify({"status": "error", "message": "Provide 'reminderIds' or 'clientIds'."}), 400
+    if client_ids and not (isinstance(data.get('message'), str) and data['message'].strip()):
+        return jsonify({"status": "error", "message": "A 'message' is required when sending to 'clientIds'."}), 400
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    queued = 0
+    if reminder_ids:
+        result = db.session.execute(
+            update(Reminder)
+            .where(Reminder.id.in_(reminder_ids), Reminder.status.in_(['pending', 'failed']))
+            .values(status='pending', next_attempt_at=now, last_error=None)
+        )
+        queued += result.rowcount
+    if client_ids:
+        existing_ids = [row.id for row in db.session.query(Client.id).filter(Client.id.in_(client_ids))]
+        if existing_ids:
+            db.session.execute(db.insert(Reminder), [
+                {'client_id': client_id, 'message': data['message'], 'due_at': now, 'status': 'pending', 'kind': 'adhoc'}
+                for client_id in existing_ids
+            ])
+        queued += len(existing_ids)
+
+    log_audit_event("bulk_reminders_queued", {"queued": queued})
+    db.session.commit()
+    reminder_dispatcher.wake()
+    return jsonify({"status": "accepted", "queued": queued}), 202
+
+@automation_bp.cli.command('dispatch-reminders')
+@click.option('--once', is_flag=True, help='Send a single batch and exit.')
+def dispatch_reminders_command(once):
+    """Runs the reminder dispatcher as a standalone worker process."""
+    while True:
+        report = reminder_dispatcher.run_once()
+        if report['claimed']:
+            click.echo(
+                f"Dispatched batch: {report['sent']} sent, {report['retrying']} retrying, {report['failed']} failed."
+            )
+        if once:
+            break
+        if report['claimed'] < reminder_dispatcher.batch_size:
+            time.sleep(reminder_dispatcher.poll_interval)
+
+@automation_bp.cli.command('sweep-renewals')
+@click.option('--window-days', type=int, default=None, help='Look for policies expiring within this many days.')
+@click.option('--days-before', type=int, default=None, help='Schedule each reminder this many days before expiry.')
+@click.option('--interval', type=int, default=0, show_default=True,
+              help='Repeat every N seconds; 0 runs a single sweep.')
+def sweep_renewals_command(window_days, days_before, interval):
+    """Creates missing renewal reminders for the whole book in one set-based pass."""
+    window_days = window_days if window_days is not None else current_app.config['RENEWAL_WINDOW_DAYS']
+    days_before = days_before if days_before is not None else current_app.config['RENEWAL_DAYS_BEFORE']
+    while True:
+        report = sweep_renewal_reminders(window_days=window_days, days_before=days_before)
+        click.echo(
+            f"Renewal sweep: {report['created']} reminders created, {report['alreadyScheduled']} already scheduled, "
+            f"{report['clientsInWindow']} clients in window, {report['runtimeMs']} ms."
+        )
+        if not interval:
+            break
+        time.sleep(interval)
@@ -1,44 +1,121 @@
-import os
+import json
 import logging
-import google.generativeai as genai
-from flask import Blueprint, request, jsonify
+import time
+from flask import Blueprint, Response, current_app, request, jsonify
+
+from ..extensions import answer_cache, metrics
+from ..llm import get_model
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# This will use the API key already configured in your app.py
 chatbot_bp = Blueprint('chatbot', __name__)
 
+CACHE_LOOKUPS = metrics.counter('chatbot_cache_requests_total', 'Chatbot questions by answer cache result.', ('result',))
+TTFB = metrics.histogram(
+    'chatbot_ttfb_seconds', 'Time from receiving a question to sending the first bytes of its answer.', ('cache', 'mode')
+)
+
+# This is a system prompt that gives the AI context about its role. It is built once and
+# sent as the model's system instruction, so only the question changes between calls.
+SYSTEM_PROMPT = """You are "Insure-Agent AI Assistant," a friendly and helpful chatbot integrated into an insurance agent's dashboard. Your purpose is to guide the user on how to use the application. Be concise and helpful.
+
+Here are the app's main features:
+- Dashboard: Shows an overview with stats and follow-ups.
+- Clients: A CRM to manage Active, Engaged, and Prospective clients. New clients can be added manually or through document uploads.
+- Documents: An AI-powered tool to upload PDFs/images (like Aadhaar/PAN cards) to automatically extract data and pre-fill an onboarding form.
+- Reconciliation: A tool to upload bank and policy PDFs to automatically match financial transactions."""
+
+ERROR_MESSAGE = "Sorry, I couldn't process that request right now."
+
+
+def _model():
+    return get_model(current_app.config.get('CHATBOT_MODEL', 'gemini-2.5-flash'), system_instruction=SYSTEM_PROMPT)
+
+
+def _stream_mode():
+    """'sse', 'chunked' or None, from ?stream= or an Accept: text/event-stream header."""
+    mode = request.args.get('stream')
+    if mode in ('sse', 'chunked'):
+        return mode
+    if request.accept_mimetypes.best == 'text/event-stream':
+        return 'sse'
+    return None
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_answer(question, mode, cached, started):
+    """Yields the answer as it is generated, caching it once the model has finished."""
+    result = 'miss' if cached is None else 'hit'
+    # Resolved here: the generator runs after the request context is gone
+    model = _model() if cached is None else None
+
+    def generate():
+        parts = []
+        try:
+            if cached is not None:
+                pieces = [cached]
+            else:
+                pieces = (chunk.text for chunk in model.generate_content(question, stream=True))
+            for piece in pieces:
+                if not piece:
+                    continue
+                if not parts:
+                    TTFB.observe(time.perf_counter() - started, cache=result, mode=mode)
+                parts.append(piece)
+                yield _sse('token', {'text': piece}) if mode == 'sse' else piece
+        except Exception:
+            logger.exception("Chatbot API error.")
+            if mode == 'sse':
+                yield _sse('error', {'error': ERROR_MESSAGE})
+            return
+        answer = ''.join(parts)
+        if cached is None and answer:
+            answer_cache.put(question, answer)
+        if mode == 'sse':
+            yield _sse('done', {'answer': answer, 'cached': cached is not None})
+
+    if mode == 'sse':
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+    return Response(generate(), mimetype='text/plain', headers={'X-Accel-Buffering': 'no'})
+
+
 @chatbot_bp.route('/ask', methods=['POST'])
 def ask_chatbot():
+    started = time.perf_counter()
     data = request.get_json()
     if not data or not data.get('question'):
         return jsonify({"error": "A 'question' is required."}), 400
 
     user_question = data['question']
-    
+    cached, result = answer_cache.get(user_question)
+    CACHE_LOOKUPS.inc(result=result)
+
+    mode = _stream_mode()
+    if mode:
+        return _stream_answer(user_question, mode, cached, started)
+
+    if cached is not None:
+        TTFB.observe(time.perf_counter() - started, cache='hit', mode='json')
+        return jsonify({"answer": cached, "cached": True})
+
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        # This is a system prompt that gives the AI context about its role.
-        prompt = f"""
-        You are "Insure-Agent AI Assistant," a friendly and helpful chatbot integrated into an insurance agent's dashboard. Your purpose is to guide the user on how to use the application. Be concise and helpful.
-
-        Here are the app's main features:
-        - Dashboard: Shows an overview with stats and follow-ups.
-        - Clients: A CRM to manage Active, Engaged, and Prospective clients. New clients can be added manually or through document uploads.
-        - Documents: An AI-powered tool to upload PDFs/images (like Aadhaar/PAN cards) to automatically extract data and pre-fill an onboarding form.
-        - Reconciliation: A tool to upload bank and policy PDFs to automatically match financial transactions.
-
-        User's question: "{user_question}"
-
-        Your answer:
-        """
-        
-        response = model.generate_content(prompt)
-        
-        return jsonify({"answer": response.text})
+        response = _model().generate_content(user_question)
+        answer_cache.put(user_question, response.text)
+        TTFB.observe(time.perf_counter() - started, cache='miss', mode='json')
+        return jsonify({"answer": response.text, "cached": False})
 
     except Exception as e:
         logger.error(f"Chatbot API error: {e}", exc_info=True)
-        return jsonify({"error": "Sorry, I couldn't process that request right now."}), 500
\ No newline at end of file
+        return jsonify({"error": ERROR_MESSAGE}), 500
+
+
+@chatbot_bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify(answer_cache.stats())
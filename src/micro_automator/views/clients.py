@@ -1,12 +1,15 @@
 from flask import Blueprint, jsonify, request
 from ..extensions import db
+from ..database import statement_timeout
 from ..models.client import Client, FollowUp
+from ..services import publish_event
 from sqlalchemy import or_
 from datetime import datetime
 
 clients_bp = Blueprint('clients', __name__)
 
 @clients_bp.route('/', methods=['GET'])
+@statement_timeout(10000)
 def get_clients():
     """Fetches clients with optional filtering by status and searching by name."""
     try:
@@ -44,6 +47,8 @@ def add_client():
         status=data.get('status', 'Prospective')
     )
     db.session.add(new_client)
+    db.session.flush()
+    publish_event("client.created", {"clientId": new_client.id, "name": new_client.name, "status": new_client.status})
     db.session.commit()
     return jsonify(new_client.to_dict()), 201
 
@@ -52,6 +57,7 @@ def delete_client(client_id):
     """Deletes a client from the database."""
     client = Client.query.get_or_404(client_id)
     db.session.delete(client)
+    publish_event("client.deleted", {"clientId": client_id})
     db.session.commit()
     return jsonify({'message': 'Client deleted successfully'})
 
@@ -70,6 +76,16 @@ def schedule_follow_up(client_id):
         notes=data.get('notes')
     )
     db.session.add(new_follow_up)
+    previous_status = client.status
     client.status = 'Engaged'  # Automatically update client status
+    db.session.flush()
+    publish_event("follow_up.created", {
+        "id": new_follow_up.id,
+        "clientId": client.id,
+        "type": new_follow_up.type,
+        "dueDate": new_follow_up.due_date.isoformat()
+    })
+    if previous_status != client.status:
+        publish_event("client.status_changed", {"clientId": client.id, "from": previous_status, "to": client.status})
     db.session.commit()
     return jsonify({'message': 'Follow-up scheduled successfully'}), 201
\ No newline at end of file
@@ -1,10 +1,97 @@
-from flask import Blueprint, jsonify
+import hashlib
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy.orm import joinedload, selectinload
 from ..extensions import db
 from ..models.client import Client, FollowUp
-from datetime import datetime, timedelta, timezone
+from ..versioning import current_version
+from datetime import UTC, datetime, timedelta, timezone
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+
+def _compute_stats(now):
+    """Calculates the dashboard card counts for the given moment."""
+    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    # 1. Conversions: Count of clients who became 'Active' this month.
+    conversions = db.session.query(Client).filter(
+        Client.status == 'Active',
+        Client.last_contact >= start_of_month
+    ).count()
+
+    # 2. Today's Follow-ups: Count of follow-ups scheduled for today.
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start + timedelta(days=1)
+    follow_ups_today_count = db.session.query(FollowUp).filter(
+        FollowUp.due_date >= today_start,
+        FollowUp.due_date < today_end,
+        FollowUp.completed == False
+    ).count()
+
+    # 3. Renewals Due: Count of active clients whose policies expire in the next 30 days.
+    renewal_window_end = now.date() + timedelta(days=30)
+    renewals_due_count = db.session.query(Client).filter(
+        Client.status == 'Active',
+        Client.expiration_date != None,
+        Client.expiration_date <= renewal_window_end
+    ).count()
+
+    # 4. Claims Need Docs: A functional proxy for this is counting 'Engaged' clients
+    # who don't have a "Proposal Form" or "KYC Document" associated yet.
+    # For simplicity and performance, we'll count 'Engaged' clients.
+    claims_need_docs_count = db.session.query(Client).filter(Client.status == 'Engaged').count()
+
+    return {
+        "conversions": conversions,
+        "monthlyTarget": 50,  # This can be a configurable value later
+        "followUpsTodayCount": follow_ups_today_count,
+        "renewalsDueCount": renewals_due_count,
+        "claimsNeedDocsCount": claims_need_docs_count
+    }
+
+
+def _todays_follow_ups(now):
+    """Lists today's open follow-ups, loading each client in the same query."""
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start + timedelta(days=1)
+
+    follow_ups = db.session.query(FollowUp).options(joinedload(FollowUp.client)).filter(
+        FollowUp.due_date >= today_start,
+        FollowUp.due_date < today_end,
+        FollowUp.completed == False
+    ).order_by(FollowUp.due_date.asc()).all()
+
+    # Serialize the data into a clean format for the frontend
+    return [
+        {
+            "id": f.id,
+            "clientName": f.client.name, # Include the client's name
+            "type": f.type,
+            "dueDate": f.due_date.isoformat(),
+            "notes": f.notes
+        } for f in follow_ups
+    ]
+
+
+def _recent_clients(limit=5):
+    """Returns the most recently created clients with their follow-ups and forms preloaded."""
+    recent_clients = Client.query.options(
+        selectinload(Client.follow_ups),
+        selectinload(Client.forms)
+    ).order_by(Client.id.desc()).limit(limit).all()
+    return [client.to_dict() for client in recent_clients]
+
+
+def _snapshot_version(now):
+    """
+    Builds the snapshot's ETag from the dashboard data version, which every insert,
+    edit or delete of a client, follow-up or form bumps (see versioning.py). The date
+    is included so the "today" sections roll over at midnight.
+    """
+    raw = f"{now.date().isoformat()}|{current_version(db.session, 'dashboard')}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
 @dashboard_bp.route('/stats', methods=['GET'])
 def get_dashboard_stats():
     """
@@ -13,44 +100,7 @@ def get_dashboard_stats():
     """
     try:
         # Use timezone-aware datetime for accurate monthly filtering
-        now = datetime.now(timezone.utc)
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        # 1. Conversions: Count of clients who became 'Active' this month.
-        conversions = db.session.query(Client).filter(
-            Client.status == 'Active',
-            Client.last_contact >= start_of_month
-        ).count()
-
-        # 2. Today's Follow-ups: Count of follow-ups scheduled for today.
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-        follow_ups_today_count = db.session.query(FollowUp).filter(
-            FollowUp.due_date >= today_start,
-            FollowUp.due_date < today_end,
-            FollowUp.completed == False
-        ).count()
-
-        # 3. Renewals Due: Count of active clients whose policies expire in the next 30 days.
-        renewal_window_end = now.date() + timedelta(days=30)
-        renewals_due_count = db.session.query(Client).filter(
-            Client.status == 'Active',
-            Client.expiration_date != None,
-            Client.expiration_date <= renewal_window_end
-        ).count()
-
-        # 4. Claims Need Docs: A functional proxy for this is counting 'Engaged' clients
-        # who don't have a "Proposal Form" or "KYC Document" associated yet.
-        # For simplicity and performance, we'll count 'Engaged' clients.
-        claims_need_docs_count = db.session.query(Client).filter(Client.status == 'Engaged').count()
-
-        return jsonify({
-            "conversions": conversions,
-            "monthlyTarget": 50,  # This can be a configurable value later
-            "followUpsTodayCount": follow_ups_today_count,
-            "renewalsDueCount": renewals_due_count,
-            "claimsNeedDocsCount": claims_need_docs_count
-        })
+        return jsonify(_compute_stats(datetime.now(timezone.utc)))
     except Exception as e:
         # Log the full error for debugging on Render
         current_app.logger.error(f"Error in get_dashboard_stats: {e}", exc_info=True)
@@ -64,27 +114,7 @@ def get_todays_follow_ups():
     in the whiteboard notes.
     """
     try:
-        now = datetime.now(timezone.utc)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-        
-        follow_ups = db.session.query(FollowUp).filter(
-            FollowUp.due_date >= today_start,
-            FollowUp.due_date < today_end,
-            FollowUp.completed == False
-        ).order_by(FollowUp.due_date.asc()).all()
-
-        # Serialize the data into a clean format for the frontend
-        follow_ups_list = [
-            {
-                "id": f.id,
-                "clientName": f.client.name, # Include the client's name
-                "type": f.type,
-                "dueDate": f.due_date.isoformat(),
-                "notes": f.notes
-            } for f in follow_ups
-        ]
-        return jsonify(follow_ups_list)
+        return jsonify(_todays_follow_ups(datetime.now(timezone.utc)))
     except Exception as e:
         current_app.logger.error(f"Error in get_todays_follow_ups: {e}", exc_info=True)
         return jsonify({"status": "error", "message": "Could not retrieve today's follow-ups."}), 500
@@ -94,8 +124,35 @@ def get_todays_follow_ups():
 def get_recent_clients():
     """Provides the 5 most recently created clients for the dashboard's table."""
     try:
-        recent_clients = Client.query.order_by(Client.id.desc()).limit(5).all()
-        return jsonify([client.to_dict() for client in recent_clients])
+        return jsonify(_recent_clients())
     except Exception as e:
         current_app.logger.error(f"Error in get_recent_clients: {e}", exc_info=True)
-        return jsonify({"status": "error", "message": "Could not retrieve recent clients."}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": "Could not retrieve recent clients."}), 500
+
+
+@dashboard_bp.route('/snapshot', methods=['GET'])
+def get_dashboard_snapshot():
+    """
+    Returns the stats, today's follow-ups and recent clients in one response.
+    The response carries an ETag derived from the data version, so a polling client
+    that sends If-None-Match gets a 304 without the snapshot being rebuilt.
+    """
+    try:
+        now = datetime.now(UTC)
+        version = _snapshot_version(now)
+        # Weak match: compressed responses carry a weak ETag (W/"...")
+        if request.if_none_match.contains_weak(version):
+            response = current_app.response_class(status=304)
+        else:
+            response = jsonify({
+                "version": version,
+                "stats": _compute_stats(now),
+                "todaysFollowUps": _todays_follow_ups(now),
+                "recentClients": _recent_clients()
+            })
+        response.set_etag(version)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception:
+        current_app.logger.exception("Error in get_dashboard_snapshot.")
+        return jsonify({"status": "error", "message": "Could not build the dashboard snapshot."}), 500
@@ -1,85 +1,124 @@
-import os
 import json
-import io
 import logging
-import google.generativeai as genai
-from flask import Blueprint, request, jsonify, current_app
-from werkzeug.utils import secure_filename
-from PIL import Image
-import pytesseract
-import fitz  # PyMuPDF
-
-from ..extensions import db
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import click
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy.orm import joinedload, load_only
+
+from ..extensions import db, document_pipeline, upload_store
+from ..database import statement_timeout
+from ..extraction import extract_document, is_supported
+from ..llm import get_model
+from ..pagination import keyset_page, page_response, parse_datetime, parse_limit, parse_offset
+from ..search import make_snippet, reindex_documents, search_documents
 from ..models.document import Document
 from ..models.client import Client
+from ..pipeline import PipelineFull
+from ..services import publish_event
 
 # --- Setup Logging ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# --- Configure API ---
-try:
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not set.")
-    genai.configure(api_key=api_key)
-except Exception as e:
-    logger.error(f"Failed to configure Gemini API: {e}")
-
 # --- Blueprint ---
 documents_bp = Blueprint('documents', __name__)
 
-# --- Helper Functions for Text Extraction ---
-def extract_and_save_image_from_pdf(pdf_stream, original_filename):
-    """Finds the largest image in a PDF, saves it, and returns its public URL."""
-    try:
-        doc = fitz.open(stream=pdf_stream, filetype="pdf")
-        max_area = 0
-        best_image = None
-        for page in doc:
-            for img in page.get_images(full=True):
-                xref = img[0]
-                base_image = doc.extract_image(xref)
-                image_bytes = base_image["image"]
-                image = Image.open(io.BytesIO(image_bytes))
-                area = image.width * image.height
-                if area > max_area:
-                    max_area = area
-                    best_image = image_bytes
-
-        if best_image:
-            filename = f"photo_{secure_filename(original_filename)}.png"
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            with open(filepath, "wb") as f:
-                f.write(best_image)
-            
-            # This assumes your app is hosted at the root. Adjust if needed.
-            photo_url = f"{request.host_url}uploads/{filename}"
-            logger.info(f"Extracted and saved photo to {photo_url}")
-            return photo_url
-    except Exception as e:
-        logger.error(f"Could not extract image from PDF: {e}")
-    return None
-
-def extract_text_from_pdf(pdf_stream):
-    text = ""
-    with fitz.open(stream=pdf_stream, filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text()
-    logger.info(f"Extracted {len(text)} characters from PDF.")
-    return text
-
-def extract_text_from_image(image_stream):
-    image = Image.open(image_stream)
-    text = pytesseract.image_to_string(image)
-    logger.info(f"Extracted {len(text)} characters from Image using OCR.")
-    return text
+def _parse_include():
+    """Reads ?include=extracted_data,ai_action_items, the large columns left out by default."""
+    include = [f for f in request.args.get('include', '').split(',') if f]
+    unknown = [f for f in include if f not in Document.OPTIONAL_FIELDS]
+    if unknown:
+        raise ValueError(f"'include' accepts only: {', '.join(Document.OPTIONAL_FIELDS)}.")
+    return include
 
 # --- API Endpoints ---
 @documents_bp.route('/', methods=['GET'])
+@statement_timeout(10000)
 def get_all_documents():
-    documents = Document.query.order_by(Document.upload_date.desc()).all()
-    return jsonify([doc.to_dict() for doc in documents])
+    """
+    Fetches a page of document summaries, most recent first.
+    Supports ?limit=, ?cursor= (from the previous page's nextCursor), ?category=a,b,
+    an ISO ?since=/?until= upload range and ?include= for the large JSON columns.
+    Without ?limit= or ?cursor= the first page is returned as a bare array.
+    """
+    try:
+        include = _parse_include()
+        categories = [c for c in request.args.get('category', '').split(',') if c]
+        since = parse_datetime(request.args.get('since'), 'since')
+        until = parse_datetime(request.args.get('until'), 'until')
+        limit = parse_limit(request.args.get('limit'), default=50, maximum=200)
+
+        # Only the summary columns (and any requested extras) are selected
+        columns = [getattr(Document, f) for f in Document.SUMMARY_FIELDS + tuple(include)]
+        query = Document.query.options(load_only(*columns))
+        if categories:
+            query = query.filter(Document.ai_category.in_(categories))
+        if since:
+            query = query.filter(Document.upload_date >= since)
+        if until:
+            query = query.filter(Document.upload_date < until)
+
+        documents, next_cursor = keyset_page(
+            query, Document.upload_date, Document.id, cursor=request.args.get('cursor'), limit=limit
+        )
+        return page_response([d.to_summary(include) for d in documents], next_cursor)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception:
+        logger.exception("Error fetching documents.")
+        return jsonify({"status": "error", "message": "Could not retrieve documents."}), 500
+
+@documents_bp.route('/search', methods=['GET'])
+@statement_timeout(5000)
+def search_all_documents():
+    """
+    Ranked full-text search over document text, policy numbers, names and AI summaries.
+    Supports ?q=, ?limit= and ?offset= (from the previous page's nextOffset). Each hit
+    links to the client it was matched to.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"status": "error", "message": "'q' is required."}), 400
+    try:
+        limit = parse_limit(request.args.get('limit'), default=20, maximum=100)
+        offset = parse_offset(request.args.get('offset'))
+        hits = search_documents(db.session, query, limit=limit + 1, offset=offset)
+        next_offset = offset + limit if len(hits) > limit else None
+        hits = hits[:limit]
+
+        columns = [getattr(Document, f) for f in Document.SUMMARY_FIELDS] + [Document.extracted_text]
+        documents = {d.id: d for d in Document.query.options(
+            load_only(*columns),
+            joinedload(Document.client).load_only(Client.id, Client.name)
+        ).filter(Document.id.in_([hit.id for hit in hits]))}
+
+        items = []
+        for hit in hits:
+            document = documents.get(hit.id)
+            if document is None:
+                continue  # Deleted since it was indexed
+            item = document.to_summary()
+            item['score'] = round(hit.score, 4)
+            item['snippet'] = make_snippet(document.extracted_text, query) or document.ai_summary
+            item['client'] = {'id': document.client.id, 'name': document.client.name} if document.client else None
+            items.append(item)
+        return jsonify({"items": items, "nextOffset": next_offset})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except NotImplementedError as e:
+        return jsonify({"status": "error", "message": str(e)}), 501
+    except Exception:
+        logger.exception("Error searching documents.")
+        return jsonify({"status": "error", "message": "Could not search documents."}), 500
+
+@documents_bp.route('/<int:doc_id>', methods=['GET'])
+def get_document(doc_id):
+    """Returns one document with its full extraction and AI analysis."""
+    document = db.session.get(Document, doc_id)
+    if not document:
+        return jsonify({"status": "error", "message": "Document not found."}), 404
+    return jsonify(document.to_dict())
 
 @documents_bp.route('/<int:doc_id>', methods=['DELETE'])
 def delete_document(doc_id):
@@ -88,110 +127,89 @@ def delete_document(doc_id):
     db.session.commit()
     return jsonify({'message': 'Document deleted successfully'})
 
-@documents_bp.route('/process', methods=['POST'])
-def process_document():
-    if 'document' not in request.files:
-        return jsonify({"status": "error", "message": "No document file part"}), 400
-    file = request.files['document']
+# --- Document pipeline steps ---
+def analyze_document_text(extracted_text):
+    """Asks Gemini for the structured extraction and analysis of a document's text. Runs on the analyze stage."""
+    model = get_model('gemini-2.5-pro') # Using the powerful model as you specified
+    prompt = f"""
+    Act as an expert data extraction AI for an insurance agent. Your task is to analyze the text from a customer's insurance document (like a Welcome Kit, Policy Schedule, or Proposal Form) and convert it into a perfectly structured JSON object.
+
+    **Instructions:**
+    1.  **Analyze the Text:** Carefully read the entire provided document text. The text is from a PDF and may contain formatting artifacts.
+    2.  **Comprehensive Extraction:** Identify and extract the values for all fields listed in the JSON schema below. Pay close attention to labels like "Policy ID / Number", "Date of Birth (DOB)", etc.
+    3.  **Strict JSON Output:** Your entire response MUST be a single, valid JSON object and nothing else. Do not include any explanatory text, greetings, or markdown formatting like ```json.
+    4.  **Handle Missing Data:** If a value for any field is not found in the document, you MUST use the JSON value `null`. Do not make up or infer data.
+    5.  **Data Formatting:**
+        -   Dates must be in `YYYY-MM-DD` format.
+        -   `premiumAmount` must be a number (float or integer), without any currency symbols or commas.
+        -   `aadhaarNumber` and `panNumber` should be extracted as strings.
+
+    **JSON Schema to Follow:**
+    {{
+      "extraction": {{
+        "name": "Full Name of the primary person",
+        "dob": "Date of Birth in YYYY-MM-DD format",
+        "aadhaarNumber": "The 12-digit Aadhaar number",
+        "panNumber": "The 10-character PAN number",
+        "policyId": "The Policy Number or Proposal Number (e.g., TRTL-LIFE-6969)",
+        "policyType": "The name or type of the insurance policy (e.g., SecureLife Term Plan)",
+        "premiumAmount": 22222.00,
+        "premiumFrequency": "The frequency of payment (e.g., 'Yearly', 'Monthly')",
+        "expirationDate": "The policy expiry or end date in YYYY-MM-DD format"
+      }},
+      "analysis": {{
+        "summary": "A single, informative sentence describing the document.",
+        "category": "Classify as: 'New Policy Document', 'Policy Renewal', 'KYC Document', or 'Other'."
+      }}
+    }}
+
+    **Document Text for Analysis:**
+    ---
+    {extracted_text[:15000]}
+    ---
+    """
     
-    file.seek(0)
-    file_bytes = file.read()
-    file_stream = io.BytesIO(file_bytes)
+    response = model.generate_content(prompt)
     
+    # --- THIS IS THE DEFINITIVE FIX for the JSONDecodeError ---
+    cleaned_text = response.text.strip()
+    ai_data = None
     try:
-        # --- Stage 1: Parallel Extraction ---
-        extracted_text = ""
-        photo_url = None
-        
-        if file.content_type == 'application/pdf':
-            extracted_text = extract_text_from_pdf(io.BytesIO(file_bytes))
-            photo_url = extract_and_save_image_from_pdf(io.BytesIO(file_bytes), file.filename)
-        elif file.content_type.startswith('image/'):
-            extracted_text = extract_text_from_image(io.BytesIO(file_bytes))
-            # If the upload is an image, we can treat the whole thing as the photo
-            filename = f"photo_{secure_filename(file.filename)}.png"
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            with open(filepath, "wb") as f:
-                f.write(file_bytes)
-            photo_url = f"{request.host_url}uploads/{filename}"
+        # First, try to load the text directly.
+        ai_data = json.loads(cleaned_text)
+    except json.JSONDecodeError as direct_error:
+        logger.warning("Initial JSON parsing failed. Searching for a markdown JSON block.")
+        # If it fails, it's likely wrapped in ```json ... ```. We'll find it.
+        start_index = cleaned_text.find('{')
+        end_index = cleaned_text.rfind('}') + 1
+        if start_index != -1 and end_index != -1:
+            json_str = cleaned_text[start_index:end_index]
+            try:
+                ai_data = json.loads(json_str)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse extracted JSON block: {json_str}. Error: {e}")
+                raise ValueError("Could not find or parse a valid JSON object in the AI response.") from e
         else:
-            return jsonify({"status": "error", "message": "Unsupported file type"}), 415
-        
-        if not extracted_text.strip():
-            return jsonify({"status": "error", "message": "Could not extract text."}), 400
-
-        # --- Stage 2: The Ultimate Gemini Prompt ---
-                # --- Stage 2: The Final, Definitive Gemini Prompt ---
-        model = genai.GenerativeModel('gemini-2.5-pro') # Using the powerful model as you specified
-        prompt = f"""
-        Act as an expert data extraction AI for an insurance agent. Your task is to analyze the text from a customer's insurance document (like a Welcome Kit, Policy Schedule, or Proposal Form) and convert it into a perfectly structured JSON object.
-
-        **Instructions:**
-        1.  **Analyze the Text:** Carefully read the entire provided document text. The text is from a PDF and may contain formatting artifacts.
-        2.  **Comprehensive Extraction:** Identify and extract the values for all fields listed in the JSON schema below. Pay close attention to labels like "Policy ID / Number", "Date of Birth (DOB)", etc.
-        3.  **Strict JSON Output:** Your entire response MUST be a single, valid JSON object and nothing else. Do not include any explanatory text, greetings, or markdown formatting like ```json.
-        4.  **Handle Missing Data:** If a value for any field is not found in the document, you MUST use the JSON value `null`. Do not make up or infer data.
-        5.  **Data Formatting:**
-            -   Dates must be in `YYYY-MM-DD` format.
-            -   `premiumAmount` must be a number (float or integer), without any currency symbols or commas.
-            -   `aadhaarNumber` and `panNumber` should be extracted as strings.
-
-        **JSON Schema to Follow:**
-        {{
-          "extraction": {{
-            "name": "Full Name of the primary person",
-            "dob": "Date of Birth in YYYY-MM-DD format",
-            "aadhaarNumber": "The 12-digit Aadhaar number",
-            "panNumber": "The 10-character PAN number",
-            "policyId": "The Policy Number or Proposal Number (e.g., TRTL-LIFE-6969)",
-            "policyType": "The name or type of the insurance policy (e.g., SecureLife Term Plan)",
-            "premiumAmount": 22222.00,
-            "premiumFrequency": "The frequency of payment (e.g., 'Yearly', 'Monthly')",
-            "expirationDate": "The policy expiry or end date in YYYY-MM-DD format"
-          }},
-          "analysis": {{
-            "summary": "A single, informative sentence describing the document.",
-            "category": "Classify as: 'New Policy Document', 'Policy Renewal', 'KYC Document', or 'Other'."
-          }}
-        }}
-
-        **Document Text for Analysis:**
-        ---
-        {extracted_text[:15000]}
-        ---
-        """
-        
-        response = model.generate_content(prompt)
-        
-        # --- THIS IS THE DEFINITIVE FIX for the JSONDecodeError ---
-        cleaned_text = response.text.strip()
-        ai_data = None
-        try:
-            # First, try to load the text directly.
-            ai_data = json.loads(cleaned_text)
-        except json.JSONDecodeError:
-            logger.warning("Initial JSON parsing failed. Searching for a markdown JSON block.")
-            # If it fails, it's likely wrapped in ```json ... ```. We'll find it.
-            start_index = cleaned_text.find('{')
-            end_index = cleaned_text.rfind('}') + 1
-            if start_index != -1 and end_index != -1:
-                json_str = cleaned_text[start_index:end_index]
-                try:
-                    ai_data = json.loads(json_str)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse extracted JSON block: {json_str}. Error: {e}")
-                    raise ValueError("Could not find or parse a valid JSON object in the AI response.")
-            else:
-                raise ValueError(f"No JSON object found in the AI response: {cleaned_text}")
-        
-        logger.info("Successfully received and parsed advanced analysis from Gemini.")
+            raise ValueError(f"No JSON object found in the AI response: {cleaned_text}") from direct_error
+    
+    logger.info("Successfully received and parsed advanced analysis from Gemini.")
+    return ai_data
+
+def save_processed_document(filename, extracted_text, photo, ai_data, host_url):
+    """Stores the photo, records the document and upserts its client. Runs on the persist stage."""
+    try:
+        photo_url = None
+        if photo:
+            # This assumes your app is hosted at the root. Adjust if needed.
+            photo_url = f"{host_url}uploads/{upload_store.put(photo)}"
+            logger.info(f"Extracted and saved photo to {photo_url}")
 
-        # --- Stage 3: Save to Database ---
         extraction_data = ai_data.get("extraction", {})
         analysis_data = ai_data.get("analysis", {})
 
         new_document = Document(
-            filename=file.filename,
+            filename=filename,
+            extracted_text=extracted_text,
             extracted_data=extraction_data,
             ai_summary=analysis_data.get("summary"),
             ai_category=analysis_data.get("category"),
@@ -203,6 +221,7 @@ def process_document():
             client = Client.query.filter_by(name=customer_name).first()
             if not client:
                 client = Client(name=customer_name)
+            previous_status = client.status
             
             # Update client with all new details from the document
             client.dob = extraction_data.get("dob")
@@ -213,11 +232,86 @@ def process_document():
             client.photo_url = photo_url
             client.status = "Active"  # Mark as Active since we have their ID
             db.session.add(client)
+            db.session.flush()
+            if previous_status != client.status:
+                publish_event("client.status_changed", {"clientId": client.id, "from": previous_status, "to": client.status})
+            new_document.client = client
+
+        db.session.flush()
+        publish_event("document.processed", {"documentId": new_document.id, "category": new_document.ai_category})
 
         db.session.commit()
-        return jsonify({"status": "success", "data": new_document.to_dict()})
+        return new_document.to_dict()
+    except Exception:
+        db.session.rollback()
+        raise
 
+def _process_upload(filename, content_type, data, host_url):
+    """Runs one upload through the extract, analyze and persist stages. Returns (JSON body, status code)."""
+    if not is_supported(content_type):
+        return {"status": "error", "message": "Unsupported file type"}, 415
+    try:
+        extracted = document_pipeline.extract.run(extract_document, data, content_type)
+        if not extracted['text'].strip():
+            return {"status": "error", "message": "Could not extract text."}, 400
+        ai_data = document_pipeline.analyze.run(analyze_document_text, extracted['text'])
+        document = document_pipeline.persist.run(
+            save_processed_document, filename, extracted['text'], extracted['photo'], ai_data, host_url
+        )
+        return {"status": "success", "data": document}, 200
+    except PipelineFull as e:
+        return {"status": "error", "message": str(e)}, 503
+    except BrokenProcessPool:
+        # The extract process died on this file (e.g. a PDF that crashes the parser); the stage recovers
+        logger.error(f"Text extraction crashed on '{filename}'.")
+        return {"status": "error", "message": "Could not extract text."}, 400
     except Exception as e:
-        db.session.rollback()
         logger.error(f"An error occurred during document processing: {e}", exc_info=True)
-        return jsonify({"status": "error", "message": "An unexpected server error occurred."}), 500
\ No newline at end of file
+        return {"status": "error", "message": "An unexpected server error occurred."}, 500
+
+def _submit_bulk(upload):
+    """Queues one file of a bulk upload on the shared bulk stage and returns its Future."""
+    try:
+        return document_pipeline.bulk.submit(_process_upload, *upload)
+    except PipelineFull as e:
+        rejected = Future()
+        rejected.set_result(({"status": "error", "message": str(e)}, 503))
+        return rejected
+
+@documents_bp.route('/process', methods=['POST'])
+def process_document():
+    if 'document' not in request.files:
+        return jsonify({"status": "error", "message": "No document file part"}), 400
+    file = request.files['document']
+
+    file.seek(0)
+    body, status = _process_upload(file.filename, file.content_type, file.read(), request.host_url)
+    return jsonify(body), status, ({'Retry-After': '5'} if status == 503 else {})
+
+@documents_bp.route('/process-bulk', methods=['POST'])
+def process_documents_bulk():
+    """
+    Processes several uploads ('documents' parts) in one request. They go through the
+    same stages as /process concurrently, so one file's OCR overlaps another's Gemini
+    call. Returns one result per file, in upload order.
+    """
+    files = request.files.getlist('documents')
+    if not files:
+        return jsonify({"status": "error", "message": "No 'documents' file parts"}), 400
+    max_files = current_app.config.get('DOCUMENT_BULK_MAX_FILES', 20)
+    if len(files) > max_files:
+        return jsonify({"status": "error", "message": f"At most {max_files} documents per request."}), 400
+
+    uploads = [(f.filename, f.content_type, f.read(), request.host_url) for f in files]
+    # Every file is queued before any result is awaited, so the files run concurrently
+    results = [future.result() for future in [_submit_bulk(upload) for upload in uploads]]
+
+    items = [dict(body, filename=upload[0]) for upload, (body, _) in zip(uploads, results, strict=True)]
+    return jsonify({"items": items, "processed": sum(1 for item in items if item['status'] == 'success')})
+
+
+@documents_bp.cli.command('reindex')
+def reindex_command():
+    """Rebuilds the full-text search index, e.g. after bulk-loading documents."""
+    count = reindex_documents(db.session)
+    click.echo(f"Indexed {count} documents.")
@@ -0,0 +1,68 @@
+import json
+import queue
+import time
+
+from flask import Blueprint, Response, current_app, request
+
+from ..extensions import event_broker
+
+events_bp = Blueprint("events", __name__)
+
+
+def _format_event(evt):
+    return f"id: {evt['id']}\nevent: {evt['type']}\ndata: {json.dumps(evt['data'], default=str)}\n\n"
+
+
+def _parse_last_event_id():
+    raw = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+@events_bp.route("/stream", methods=["GET"])
+def stream_events():
+    """
+    Server-Sent Events stream of dashboard changes (client status, follow-ups,
+    audit events, reconciliation batches). Reconnecting browsers resume from their
+    Last-Event-ID; a 'resync' event means the backlog is gone and the snapshot
+    should be refetched.
+    """
+    heartbeat = current_app.config.get("SSE_HEARTBEAT_SECONDS", 15)
+    retry_ms = current_app.config.get("SSE_RETRY_MS", 3000)
+    deadline = time.monotonic() + current_app.config.get("SSE_MAX_STREAM_SECONDS", 300)
+    last_event_id = _parse_last_event_id()
+
+    def generate():
+        # Subscribing here, not in the view, means a response that is never iterated
+        # never registers a subscription it cannot release
+        subscription = event_broker.subscribe(last_event_id)
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            if subscription.resync:
+                yield "event: resync\ndata: {}\n\n"
+            for evt in subscription.replay:
+                yield _format_event(evt)
+            while time.monotonic() < deadline:
+                if subscription.overflowed:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                try:
+                    evt = subscription.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comment lines keep proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                yield _format_event(evt)
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,42 +1,50 @@
-import os
 import json
-import io
 import logging
 from datetime import datetime
-import google.generativeai as genai
-from flask import Blueprint, request, jsonify
-import fitz  # PyMuPDF for PDF parsing
+import click
+from flask import Blueprint, current_app, request, jsonify
 
-from ..extensions import db
+from ..database import use_primary
+from ..extensions import db, document_pipeline, event_broker
+from ..extraction import pdf_text
+from ..llm import get_model
 from ..models.reconciliation import ReconciliationBatch, Transaction
+from ..pipeline import PipelineFull
+from ..reconciliation_export import MONTH, AnalyticsUnavailable, export_transactions, monthly_summary
+from ..responses import StreamedArray, stream_json_object
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 reconciliation_bp = Blueprint('reconciliation', __name__)
 
-def parse_pdf_statement(file_stream, source_name):
+def parse_pdf_statements(statements):
     """
-    Extracts transaction data from a PDF using PyMuPDF for text extraction and Gemini AI for data structuring.
+    Extracts transaction data from PDFs using PyMuPDF for text extraction and Gemini AI for data structuring.
     This is a more robust method that does not rely on perfect table structures in the PDF.
+    `statements` maps a source name to the PDF's bytes; both steps run on the shared document
+    pipeline stages, all statements at once. Returns {source name: transactions}.
     """
-    try:
-        # Read the entire file stream into bytes to make it reusable
-        file_bytes = file_stream.read()
-        
-        # Step 1: Extract all raw text from the PDF using PyMuPDF
-        raw_text = ""
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            for page in doc:
-                raw_text += page.get_text()
-
+    # Step 1: Extract all raw text from the PDFs using PyMuPDF, on the extract stage
+    texts = {source: document_pipeline.extract.submit(pdf_text, data) for source, data in statements.items()}
+    analyses = {}
+    for source_name, future in texts.items():
+        try:
+            raw_text = future.result()
+        except Exception:
+            logger.exception(f"Could not extract text from the {source_name} PDF.")
+            continue
         if not raw_text.strip():
             logger.warning(f"No text could be extracted from the {source_name} PDF.")
-            return []
+            continue
+        analyses[source_name] = document_pipeline.analyze.submit(structure_transactions, raw_text, source_name)
+    return {source: analyses[source].result() if source in analyses else [] for source in statements}
 
+def structure_transactions(raw_text, source_name):
+    """Asks Gemini to turn a statement's raw text into validated transactions. Runs on the analyze stage."""
+    try:
         # Step 2: Send the raw text to Gemini AI for intelligent data extraction
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = get_model('gemini-2.5-flash')
         prompt = f"""
         Act as an expert data entry clerk specializing in financial documents.
         Analyze the following raw text extracted from a '{source_name}' and identify all financial transaction entries.
@@ -91,7 +99,7 @@ def parse_pdf_statement(file_stream, source_name):
         return validated_transactions
 
     except Exception as e:
-        logger.error(f"A critical error occurred in parse_pdf_statement for {source_name}: {e}", exc_info=True)
+        logger.error(f"A critical error occurred in structure_transactions for {source_name}: {e}", exc_info=True)
         return []
 
 # The rest of your routes (@reconciliation_bp.route('/run'), etc.) remain unchanged as their logic
@@ -107,8 +115,8 @@ def run_reconciliation():
 
     try:
         # Parse PDF files using the updated AI-powered function
-        bank_trans = parse_pdf_statement(bank_file.stream, 'bank_statement')
-        policy_trans = parse_pdf_statement(policy_file.stream, 'policy_log')
+        parsed = parse_pdf_statements({'bank_statement': bank_file.read(), 'policy_log': policy_file.read()})
+        bank_trans, policy_trans = parsed['bank_statement'], parsed['policy_log']
 
         if not bank_trans or not policy_trans:
             return jsonify({"message": "Could not extract any valid transaction data from one or both PDFs."}), 400
@@ -152,7 +160,7 @@ def run_reconciliation():
         # 3. AI Fuzzy Matching with Gemini
         if unmatched_bank and unmatched_policy:
             logger.info("Running AI fuzzy matching on remaining transactions...")
-            model = genai.GenerativeModel('gemini-2.5-flash')
+            model = get_model('gemini-2.5-flash')
             prompt = f"""
             Act as an expert financial analyst. Your task is to reconcile two lists of unmatched transactions: one from a bank statement and one from an internal policy log.
             
@@ -174,7 +182,7 @@ def run_reconciliation():
               ]
             }}
             """
-            response = model.generate_content(prompt)
+            response = document_pipeline.analyze.run(model.generate_content, prompt)
             cleaned_response_text = response.text.strip().replace('```json', '').replace('```', '').strip()
             ai_results = json.loads(cleaned_response_text)
             
@@ -189,33 +197,84 @@ def run_reconciliation():
             db.session.commit()
             logger.info(f"AI matched an additional {len(ai_results.get('matched_pairs', []))} pairs.")
 
+        matched_count = Transaction.query.filter_by(batch_id=batch.id, status='matched').count() // 2
+        event_broker.publish("reconciliation.completed", {"batchId": batch.id, "matchedCount": matched_count})
         return jsonify({"message": "Reconciliation process completed.", "batchId": batch.id}), 200
 
+    except PipelineFull as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 503, {'Retry-After': '5'}
     except Exception as e:
         db.session.rollback()
         logger.error(f"Reconciliation failed: {e}", exc_info=True)
         return jsonify({"message": "An unexpected error occurred."}), 500
 
 @reconciliation_bp.route('/batches/<int:batch_id>', methods=['GET'])
+@use_primary
 def get_batch_details(batch_id):
-    """Returns all transactions for a specific batch, separating exceptions."""
+    """
+    Returns a batch's unmatched transactions by source, streamed as they are read.
+    Clients fetch it right after POST /run returns the batch id, before a lagging
+    replica may have the batch, so it reads from the primary.
+    """
     batch = db.session.get(ReconciliationBatch, batch_id)
     if not batch:
         return jsonify({"message": "Batch not found."}), 404
         
-    transactions = batch.transactions
-    
-    unmatched_bank = [t.to_dict() for t in transactions if t.source == 'bank_statement' and t.status == 'unmatched']
-    unmatched_policy = [t.to_dict() for t in transactions if t.source == 'policy_log' and t.status == 'unmatched']
-    matched_count = sum(1 for t in transactions if t.status == 'matched') // 2
-    
-    return jsonify({
+    def unmatched(source):
+        # A generator, so each query runs in chunks while the response is written
+        yield from db.session.execute(
+            db.select(Transaction)
+            .filter_by(batch_id=batch_id, status='unmatched', source=source)
+            .order_by(Transaction.id)
+            .execution_options(yield_per=500)
+        ).scalars()
+
+    matched_count = db.session.execute(
+        db.select(db.func.count(Transaction.id)).filter_by(batch_id=batch.id, status='matched')
+    ).scalar() // 2
+
+    return stream_json_object({
         "batchId": batch.id,
         "timestamp": batch.timestamp.isoformat(),
         "status": batch.status,
         "matchedCount": matched_count,
         "exceptions": {
-            "bank": unmatched_bank,
-            "policy": unmatched_policy
+            "bank": StreamedArray(unmatched('bank_statement'), Transaction.to_dict),
+            "policy": StreamedArray(unmatched('policy_log'), Transaction.to_dict)
         }
-    })
\ No newline at end of file
+    })
+
+
+@reconciliation_bp.route('/analytics/monthly', methods=['GET'])
+def get_monthly_analytics():
+    """Match rates, unmatched totals and amounts by source per month, from the columnar export."""
+    since, until = request.args.get('since'), request.args.get('until')
+    for value in (since, until):
+        if value and not MONTH.match(value):
+            return jsonify({"message": f"Invalid month '{value}'; use YYYY-MM."}), 400
+    try:
+        summary = monthly_summary(current_app.config['ANALYTICS_EXPORT_FOLDER'], since, until)
+    except AnalyticsUnavailable as e:
+        return jsonify({"message": str(e)}), 501
+    return jsonify(summary)
+
+
+@reconciliation_bp.cli.command('export')
+@click.option('--format', 'export_format', type=click.Choice(['parquet', 'arrow']), default=None,
+              help='Defaults to ANALYTICS_EXPORT_FORMAT.')
+@click.option('--chunk-size', type=int, default=None, help='Rows read per round trip.')
+def export_command(export_format, chunk_size):
+    """Appends transactions of newly completed batches to the columnar analytics export."""
+    config = current_app.config
+    try:
+        report = export_transactions(
+            db.session, config['ANALYTICS_EXPORT_FOLDER'],
+            export_format=export_format or config['ANALYTICS_EXPORT_FORMAT'],
+            chunk_size=chunk_size or config['ANALYTICS_EXPORT_CHUNK_SIZE'],
+            settle_minutes=config['ANALYTICS_EXPORT_SETTLE_MINUTES'],
+        )
+    except (AnalyticsUnavailable, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Exported {report['transactions']} transactions to {len(report['files'])} file(s); "
+               f"batches through {report['lastBatchId']} are exported.")
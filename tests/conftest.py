@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("AUDIT_WRITER_MODE", "inline")
+os.environ.setdefault("UPLOAD_THUMBNAIL_MODE", "inline")
+os.environ.setdefault("DOCUMENT_PIPELINE_MODE", "inline")
+
+from src.micro_automator.app import create_app
+from src.micro_automator.config import Config
+from src.micro_automator.extensions import db
+
+
+class TestConfig(Config):
+    TESTING = True
+
+
+@pytest.fixture
+def app(tmp_path):
+    TestConfig.UPLOAD_FOLDER = str(tmp_path / "uploads")
+    TestConfig.AUDIT_ARCHIVE_FOLDER = str(tmp_path / "archives" / "audit")
+    TestConfig.ANALYTICS_EXPORT_FOLDER = str(tmp_path / "exports" / "reconciliation")
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+
+from src.micro_automator.audit_writer import AuditWriter, _process_token
+from src.micro_automator.models.shared import AuditLog
+
+
+@pytest.fixture
+def buffered_app(app, tmp_path):
+    app.config.update(
+        AUDIT_WRITER_MODE="buffered",
+        AUDIT_FLUSH_INTERVAL=3600,
+        AUDIT_BUFFER_SIZE=3,
+        AUDIT_BACKPRESSURE="drop",
+        AUDIT_SPOOL_FOLDER=str(tmp_path / "spool"),
+    )
+    return app
+
+
+def test_events_are_spooled_then_written_in_one_flush(buffered_app):
+    writer = AuditWriter()
+    writer.init_app(buffered_app)
+    try:
+        for i in range(3):
+            assert writer.write("client_updated", {"n": i})
+        spooled = os.listdir(writer.spool_dir)
+        assert len(spooled) == 1
+        assert AuditLog.query.count() == 0
+
+        assert writer.flush() == 3
+        assert sorted(log.details["n"] for log in AuditLog.query.all()) == [0, 1, 2]
+        assert all(
+            os.path.getsize(os.path.join(writer.spool_dir, f)) == 0
+            for f in os.listdir(writer.spool_dir)
+        )
+    finally:
+        writer.close()
+    assert os.listdir(writer.spool_dir) == []
+
+
+def test_full_buffer_drops_with_drop_policy(buffered_app):
+    writer = AuditWriter()
+    writer.init_app(buffered_app)
+    try:
+        for i in range(4):
+            writer.write("client_updated", {"n": i})
+        assert writer.dropped == 1
+    finally:
+        writer.close()
+    assert AuditLog.query.count() == 3
+
+
+def test_segments_from_a_dead_worker_are_recovered(buffered_app, tmp_path):
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    row = {
+        "event_type": "renewal_reminder_scheduled",
+        "details": {"client_id": 1},
+        "timestamp": "2026-01-01T00:00:00",
+    }
+    (spool / "audit-spool-999999999-1-00000001.ndjson").write_text(
+        json.dumps(row) + "\n"
+    )
+
+    writer = AuditWriter()
+    writer.init_app(buffered_app)
+    try:
+        assert writer.flush() == 1
+    finally:
+        writer.close()
+    assert AuditLog.query.one().event_type == "renewal_reminder_scheduled"
+    assert os.listdir(spool) == []
+
+
+def test_a_segment_is_recovered_by_only_one_worker(buffered_app, tmp_path):
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    row = {
+        "event_type": "renewal_reminder_scheduled",
+        "details": {"client_id": 1},
+        "timestamp": "2026-01-01T00:00:00",
+    }
+    segment = spool / "audit-spool-999999999-1-00000001.ndjson"
+    segment.write_text(json.dumps(row) + "\n")
+
+    first, second = AuditWriter(), AuditWriter()
+    first.spool_dir = second.spool_dir = str(spool)
+    # The second worker listed the folder before the first one claimed the segment
+    listed = first._spool_segments()
+    second._spool_segments = lambda pid="*": listed
+    first._recover_spool()
+    second._recover_spool()
+
+    assert len(first._pending) == 1
+    assert second._pending == []
+    assert os.listdir(spool) == [
+        f"{segment.name}.claimed-{_process_token(os.getpid())}"
+    ]
+
+
+def test_a_torn_line_is_skipped_and_quarantined(buffered_app, tmp_path):
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    row = {
+        "event_type": "renewal_reminder_scheduled",
+        "details": {"client_id": 1},
+        "timestamp": "2026-01-01T00:00:00",
+    }
+    torn = json.dumps(row)[:20]
+    (spool / "audit-spool-999999999-1-00000001.ndjson").write_text(
+        json.dumps(row) + "\n" + torn
+    )
+
+    writer = AuditWriter()
+    writer.init_app(buffered_app)
+    try:
+        assert writer.flush() == 1
+    finally:
+        writer.close()
+    assert os.listdir(spool) == ["audit-spool-999999999-1-00000001.ndjson.corrupt"]
+    assert (
+        spool / "audit-spool-999999999-1-00000001.ndjson.corrupt"
+    ).read_text() == torn + "\n"
+
+
+def test_a_claim_by_a_reused_pid_is_recovered(buffered_app, tmp_path):
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    row = {
+        "event_type": "renewal_reminder_scheduled",
+        "details": {"client_id": 1},
+        "timestamp": "2026-01-01T00:00:00",
+    }
+    # Claimed by an earlier process that had this worker's pid, e.g. before a container restart
+    (
+        spool / f"audit-spool-999999999-1-00000001.ndjson.claimed-{os.getpid()}.1"
+    ).write_text(json.dumps(row) + "\n")
+
+    writer = AuditWriter()
+    writer.init_app(buffered_app)
+    try:
+        assert writer.flush() == 1
+    finally:
+        writer.close()
+    assert os.listdir(spool) == []
@@ -0,0 +1,91 @@
+from datetime import UTC, datetime, timedelta
+
+from src.micro_automator.audit_archive import archive_audit_logs
+from src.micro_automator.extensions import db
+from src.micro_automator.models.shared import AuditLog
+
+
+def _seed(count, start=datetime(2026, 1, 1)):
+    for i in range(count):
+        event_type = "renewal_reminder_scheduled" if i % 2 else "client_updated"
+        db.session.add(
+            AuditLog(
+                event_type=event_type,
+                details={"n": i},
+                timestamp=start + timedelta(hours=i),
+            )
+        )
+    db.session.commit()
+
+
+def test_keyset_pages_cover_every_row_once(client):
+    _seed(25)
+    seen, cursor = [], None
+    while True:
+        url = "/api/audits?limit=10" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).get_json()
+        seen.extend(item["details"]["n"] for item in body["items"])
+        cursor = body["nextCursor"]
+        if not cursor:
+            break
+    assert seen == list(range(24, -1, -1))
+
+
+def test_filters_by_event_type_and_time_range(client):
+    _seed(10)
+    body = client.get(
+        "/api/audits?eventType=client_updated&since=2026-01-01T02:00:00&until=2026-01-01T08:00:00&limit=10"
+    ).get_json()
+    assert [item["details"]["n"] for item in body["items"]] == [6, 4, 2]
+
+
+def test_time_range_with_an_offset_is_read_as_utc(client):
+    _seed(10)
+    body = client.get(
+        "/api/audits?since=2026-01-01T07:30:00%2B05:30&until=2026-01-01T04:00:00Z&limit=10"
+    ).get_json()
+    assert [item["details"]["n"] for item in body["items"]] == [3, 2]
+
+
+def test_unpaged_request_returns_a_bare_array(client):
+    _seed(3)
+    response = client.get("/api/audits")
+    assert [item["details"]["n"] for item in response.get_json()] == [2, 1, 0]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/audits?cursor=not-a-cursor").status_code == 400
+
+
+def test_export_streams_ndjson(client):
+    _seed(3)
+    response = client.get("/api/audits/export")
+    assert response.mimetype == "application/x-ndjson"
+    assert len(response.get_data(as_text=True).splitlines()) == 3
+
+
+def test_archive_moves_old_rows_and_keeps_them_queryable(app, client):
+    _seed(6, start=datetime(2025, 1, 31, 20))
+    db.session.add(
+        AuditLog(
+            event_type="client_updated",
+            timestamp=datetime.now(UTC).replace(tzinfo=None),
+        )
+    )
+    db.session.commit()
+
+    report = archive_audit_logs(
+        app.config["AUDIT_ARCHIVE_FOLDER"], older_than_days=30, batch_size=4
+    )
+    assert report["archived"] == 6
+    assert AuditLog.query.count() == 1
+
+    archived = client.get(
+        "/api/audits/archive?eventType=renewal_reminder_scheduled"
+    ).get_data(as_text=True)
+    assert len(archived.splitlines()) == 3
+    since = client.get("/api/audits/archive?since=2025-02-01T00:00:00Z").get_data(
+        as_text=True
+    )
+    assert len(since.splitlines()) == 2
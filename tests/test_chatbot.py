@@ -0,0 +1,102 @@
+import types
+from typing import ClassVar
+
+import pytest
+
+from src.micro_automator import llm
+from src.micro_automator.answer_cache import AnswerCache, normalize_question
+from src.micro_automator.extensions import answer_cache
+
+
+class FakeModel:
+    calls: ClassVar[list] = []
+
+    def __init__(self, name, **kwargs):
+        self.system_instruction = kwargs.get("system_instruction")
+
+    def generate_content(self, prompt, stream=False):
+        FakeModel.calls.append(prompt)
+        chunks = ["You can add ", "clients from ", "the Clients page."]
+        if stream:
+            return (types.SimpleNamespace(text=chunk) for chunk in chunks)
+        return types.SimpleNamespace(text="".join(chunks))
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    FakeModel.calls = []
+    monkeypatch.setattr(llm, "_genai", types.SimpleNamespace(GenerativeModel=FakeModel))
+    return FakeModel
+
+
+def test_normalize_question():
+    assert normalize_question("How do I upload a PAN card?") == "how upload pan card"
+    assert normalize_question("  how do i UPLOAD pan card ") == "how upload pan card"
+    assert (
+        normalize_question("Why can't I upload a PAN card?")
+        == "why not upload pan card"
+    )
+
+
+def test_answer_cache_evicts_and_matches_similar_questions():
+    cache = AnswerCache()
+    cache.max_entries, cache.similarity = 2, 0.85
+    cache.put("How do I add a new client?", "add")
+    cache.put("How do I upload a PAN card?", "pan")
+    assert cache.get("how do i add a new client") == ("add", "exact")
+    assert cache.get("How can I add new clients?") == ("add", "similar")
+    assert cache.get("How do I upload an Aadhaar card?") == (None, "miss")
+
+    cache.put(
+        "Where do I see follow-ups?", "follow-ups"
+    )  # Evicts the least recently used: PAN
+    assert cache.get("How do I upload a PAN card?") == (None, "miss")
+    assert cache.stats()["entries"] == 2
+
+
+def test_similar_lookup_never_changes_the_question():
+    cache = AnswerCache()
+    cache.similarity = 0.85
+    cache.put("How do I upload a PAN card?", "pan")
+    cache.put("What is an active client?", "active")
+    cache.put("How do I add a new client?", "add")
+    assert cache.get("Why can't I upload a PAN card?") == (None, "miss")
+    assert cache.get("What is an inactive client?") == (None, "miss")
+    assert cache.get("How do I not add a new client?") == (None, "miss")
+    assert cache.get("How do I upload PAN cards?") == ("pan", "similar")
+
+
+def test_repeated_question_is_answered_from_cache(client, fake_gemini):
+    first = client.post(
+        "/api/chatbot/ask", json={"question": "How do I add a new client?"}
+    )
+    second = client.post(
+        "/api/chatbot/ask", json={"question": "how do I add a new client"}
+    )
+
+    assert first.get_json() == {
+        "answer": "You can add clients from the Clients page.",
+        "cached": False,
+    }
+    assert second.get_json()["cached"] is True
+    # The system prompt goes in once as the instruction; only the question is sent per call
+    assert fake_gemini.calls == ["How do I add a new client?"]
+    assert answer_cache.stats()["hits"] == 1
+
+
+def test_answer_streams_as_server_sent_events(client, fake_gemini):
+    response = client.post(
+        "/api/chatbot/ask?stream=sse", json={"question": "How do I add a new client?"}
+    )
+    body = response.get_data(as_text=True)
+
+    assert response.mimetype == "text/event-stream"
+    assert body.count("event: token") == 3
+    assert body.index("event: token") < body.index("event: done")
+    # Once streamed, the whole answer is cached
+    cached = client.post(
+        "/api/chatbot/ask?stream=chunked",
+        json={"question": "how do i add a new client"},
+    )
+    assert cached.get_data(as_text=True) == "You can add clients from the Clients page."
+    assert len(fake_gemini.calls) == 1
@@ -0,0 +1,79 @@
+from datetime import UTC, datetime, timedelta
+
+from src.micro_automator.extensions import db
+from src.micro_automator.models.client import Client, FollowUp
+from src.micro_automator.versioning import current_version
+
+
+def _seed():
+    now = datetime.now(UTC).replace(tzinfo=None)
+    client = Client(name="Priya Sharma", status="Engaged")
+    db.session.add(client)
+    db.session.flush()
+    db.session.add(
+        FollowUp(
+            client_id=client.id, due_date=now.replace(hour=23, minute=0), type="Call"
+        )
+    )
+    db.session.add(
+        FollowUp(client_id=client.id, due_date=now + timedelta(days=3), type="Text")
+    )
+    db.session.commit()
+    return client
+
+
+def test_snapshot_combines_all_sections(client):
+    _seed()
+    response = client.get("/api/dashboard/snapshot")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["stats"]["claimsNeedDocsCount"] == 1
+    assert [f["clientName"] for f in body["todaysFollowUps"]] == ["Priya Sharma"]
+    assert body["recentClients"][0]["nextFollowUp"] is not None
+    assert response.headers["ETag"].strip('"') == body["version"]
+
+
+def test_snapshot_returns_304_until_data_changes(client):
+    seeded = _seed()
+    etag = client.get("/api/dashboard/snapshot").headers["ETag"]
+
+    cached = client.get("/api/dashboard/snapshot", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    db.session.add(
+        FollowUp(client_id=seeded.id, due_date=datetime(2030, 1, 1), type="Call")
+    )
+    db.session.commit()
+    changed = client.get("/api/dashboard/snapshot", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_snapshot_changes_when_an_existing_follow_up_is_edited(client):
+    seeded = _seed()
+    etag = client.get("/api/dashboard/snapshot").headers["ETag"]
+
+    later = FollowUp.query.filter_by(client_id=seeded.id, type="Text").one()
+    later.due_date = datetime.now(UTC).replace(tzinfo=None, hour=22, minute=0)
+    later.notes = "Moved to today"
+    db.session.commit()
+
+    changed = client.get("/api/dashboard/snapshot", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.get_json()["todaysFollowUps"]) == 2
+
+
+def test_version_is_bumped_on_commit_only(app):
+    _seed()
+    version = current_version(db.session, "dashboard")
+
+    db.session.add(Client(name="Rolled Back", status="Engaged"))
+    db.session.flush()
+    db.session.rollback()
+    assert current_version(db.session, "dashboard") == version
+
+    db.session.add(Client(name="Committed", status="Engaged"))
+    db.session.commit()
+    assert current_version(db.session, "dashboard") == version + 1
@@ -0,0 +1,69 @@
+from conftest import TestConfig
+
+from src.micro_automator.app import create_app
+from src.micro_automator.database import engine_options
+from src.micro_automator.extensions import db
+from src.micro_automator.models.client import Client
+from src.micro_automator.models.reconciliation import ReconciliationBatch
+
+
+def test_engine_options_come_from_config():
+    options = engine_options(
+        {"DB_POOL_SIZE": 7, "DB_STATEMENT_TIMEOUT_MS": 5000}, "postgresql://db/app"
+    )
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert "pool_size" not in engine_options({}, "sqlite://")
+
+
+def test_get_requests_read_from_replica_and_writes_stay_on_primary(tmp_path):
+    class ReplicaConfig(TestConfig):
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+        DATABASE_REPLICA_URL = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        replica = app.extensions["db_replica"]
+        db.metadata.create_all(replica)
+        with replica.begin() as conn:
+            conn.execute(
+                Client.__table__.insert(),
+                {"name": "Only On Replica", "status": "Active"},
+            )
+
+        http = app.test_client()
+        assert [c["name"] for c in http.get("/api/clients/").get_json()] == [
+            "Only On Replica"
+        ]
+        assert (
+            http.post("/api/clients/", json={"name": "New Client"}).status_code == 201
+        )
+        assert Client.query.count() == 1
+        assert set(http.get("/api/db-pool-stats").get_json()) == {"primary", "replica"}
+        db.session.remove()
+        db.drop_all()
+
+
+def test_batch_details_read_their_own_write_from_the_primary(tmp_path):
+    class ReplicaConfig(TestConfig):
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+        DATABASE_REPLICA_URL = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(app.extensions["db_replica"])
+        batch = ReconciliationBatch()
+        db.session.add(batch)
+        db.session.commit()
+        batch_id = batch.id
+        db.session.remove()
+
+        # The replica has not caught up with the batch yet
+        response = app.test_client().get(f"/api/reconciliation/batches/{batch_id}")
+        assert response.status_code == 200
+        assert response.get_json()["batchId"] == batch_id
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,203 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.micro_automator.dispatch import ReminderDispatcher
+from src.micro_automator.extensions import db
+from src.micro_automator.models import Client, Reminder
+
+
+class _SMTPStub(socketserver.ThreadingTCPServer):
+    """Just enough of an SMTP server to accept, refuse and record messages."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+        self.connections = 0
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stub ready")
+        while True:
+            line = self.rfile.readline().decode()
+            if not line:
+                return
+            command = line.strip().upper()
+            if command.startswith("RCPT") and "BOUNCE" in command:
+                self.reply("550 no such user")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = []
+                while (chunk := self.rfile.readline().decode()) != ".\r\n":
+                    data.append(chunk)
+                self.server.messages.append("".join(data))
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtp_server():
+    server = _SMTPStub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _dispatcher(app, **config):
+    app.config.update(REMINDER_RATE_LIMIT=0, **config)
+    dispatcher = ReminderDispatcher()
+    dispatcher.init_app(app)
+    return dispatcher
+
+
+def _seed(emails, due_at=datetime(2026, 1, 1)):
+    for i, email in enumerate(emails):
+        client = Client(name=f"Client {i}", email=email, policy_id=f"POL-{i}")
+        db.session.add(client)
+        db.session.flush()
+        db.session.add(
+            Reminder(
+                client_id=client.id, message=f"Renew policy POL-{i}.", due_at=due_at
+            )
+        )
+    db.session.commit()
+
+
+def test_batch_is_sent_over_one_smtp_connection(app, smtp_server):
+    _seed(["a@example.com", "b@example.com", "bounce@example.com", None])
+    dispatcher = _dispatcher(
+        app,
+        REMINDER_TRANSPORT="smtp",
+        SMTP_HOST="127.0.0.1",
+        SMTP_PORT=smtp_server.server_address[1],
+    )
+
+    report = dispatcher.run_once(now=datetime(2026, 1, 2))
+
+    assert report == {"claimed": 4, "sent": 2, "retrying": 0, "failed": 2}
+    assert smtp_server.connections == 1
+    assert all(
+        "Idempotency-Key: reminder-" in message for message in smtp_server.messages
+    )
+    statuses = {r.client.email: r.status for r in Reminder.query.all()}
+    assert statuses == {
+        "a@example.com": "sent",
+        "b@example.com": "sent",
+        "bounce@example.com": "failed",
+        None: "failed",
+    }
+    # Nothing is left to claim
+    assert dispatcher.run_once(now=datetime(2026, 1, 2))["claimed"] == 0
+
+
+def test_unreachable_provider_schedules_retries(app):
+    _seed(["a@example.com", "b@example.com"])
+    dispatcher = _dispatcher(
+        app,
+        REMINDER_TRANSPORT="smtp",
+        SMTP_HOST="127.0.0.1",
+        SMTP_PORT=1,
+        REMINDER_RETRY_BACKOFF=60,
+    )
+    now = datetime(2026, 1, 2)
+
+    report = dispatcher.run_once(now=now)
+
+    assert report["retrying"] == 2
+    for reminder in Reminder.query.all():
+        assert reminder.status == "pending"
+        assert reminder.attempts == 1
+        assert reminder.next_attempt_at == now + timedelta(seconds=60)
+    assert dispatcher.run_once(now=now + timedelta(seconds=30))["claimed"] == 0
+
+
+def test_bulk_send_queues_adhoc_reminders(app, client, monkeypatch):
+    _seed(["a@example.com", "b@example.com"], due_at=datetime(2099, 1, 1))
+    client_ids = [c.id for c in Client.query.all()]
+
+    response = client.post(
+        "/api/automation/reminders/bulk-send",
+        json={"clientIds": client_ids + [999], "message": "Office closed Friday."},
+    )
+    assert response.status_code == 202
+    assert response.get_json()["queued"] == 2
+
+    dispatcher = _dispatcher(app, REMINDER_TRANSPORT="console")
+    sent = []
+    monkeypatch.setattr(dispatcher.transport, "send", sent.append)
+    report = dispatcher.run_once()
+    assert report["sent"] == 2
+    assert {m["Subject"] for m in sent} == {"A message from your insurance agent"}
+    # The future renewal reminders are untouched until they fall due or are pushed forward
+    assert Reminder.query.filter_by(kind="renewal", status="pending").count() == 2
+
+    renewal_ids = [r.id for r in Reminder.query.filter_by(kind="renewal")]
+    client.post(
+        "/api/automation/reminders/bulk-send", json={"reminderIds": renewal_ids}
+    )
+    assert dispatcher.run_once()["sent"] == 2
+
+
+def test_claim_skips_reminders_another_dispatcher_took(app):
+    _seed(["a@example.com", "b@example.com", "c@example.com"])
+    first, taken, sent = [r.id for r in Reminder.query.order_by(Reminder.id)]
+    now = datetime(2026, 1, 2)
+    Reminder.query.filter_by(id=taken).update({"status": "sending", "claimed_at": now})
+    Reminder.query.filter_by(id=sent).update({"status": "sent"})
+    db.session.commit()
+
+    dispatcher = _dispatcher(app, REMINDER_TRANSPORT="console")
+    assert dispatcher._claim([first, taken, sent], now) == {first}
+
+
+def test_unexpected_error_releases_the_unsent_rest(app, monkeypatch):
+    _seed(["a@example.com", "b@example.com"])
+    dispatcher = _dispatcher(app, REMINDER_TRANSPORT="console")
+    sends = []
+
+    def send(message):
+        if sends:
+            raise RuntimeError("template bug")
+        sends.append(message)
+
+    monkeypatch.setattr(dispatcher.transport, "send", send)
+
+    with pytest.raises(RuntimeError):
+        dispatcher.run_once(now=datetime(2026, 1, 2))
+    db.session.expire_all()
+    assert sorted((r.status, r.claimed_at is None) for r in Reminder.query) == [
+        ("pending", True),
+        ("sent", False),
+    ]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"reminderIds": "1,2"},
+        {"reminderIds": {"id": 1}},
+        {"reminderIds": [1, "2"]},
+        {"clientIds": [1, True], "message": "Hi"},
+        {"clientIds": [1], "message": ["Hi"]},
+        ["not", "an", "object"],
+    ],
+)
+def test_bulk_send_rejects_malformed_ids(client, body):
+    assert (
+        client.post("/api/automation/reminders/bulk-send", json=body).status_code == 400
+    )
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from src.micro_automator.extensions import db
+from src.micro_automator.models.document import Document
+
+
+def _add_documents(count, start=datetime(2026, 1, 1)):
+    for i in range(count):
+        db.session.add(
+            Document(
+                filename=f"policy-{i}.pdf",
+                # Pairs share an upload time so the id tiebreaker is exercised
+                upload_date=start + timedelta(hours=i // 2),
+                ai_category="Policy Renewal" if i % 3 == 0 else "New Policy Document",
+                extracted_data={"policyId": f"P-{i:04d}"},
+                ai_action_items=["Call client"],
+            )
+        )
+    db.session.commit()
+
+
+def test_cursor_pages_cover_every_document_once(client):
+    _add_documents(25)
+    seen, cursor = [], None
+    while True:
+        page = client.get(
+            "/api/documents/",
+            query_string={"limit": 10, **({"cursor": cursor} if cursor else {})},
+        ).get_json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    assert len(seen) == 25 and len(set(seen)) == 25
+    assert seen == [
+        d.id
+        for d in Document.query.order_by(
+            Document.upload_date.desc(), Document.id.desc()
+        )
+    ]
+
+
+def test_list_leaves_out_large_columns_unless_included_and_filters_by_category(client):
+    _add_documents(9)
+    summary = client.get("/api/documents/?category=Policy Renewal").get_json()
+    assert len(summary) == 3
+    assert "extracted_data" not in summary[0] and "ai_action_items" not in summary[0]
+
+    full = client.get(
+        "/api/documents/?category=Policy Renewal&include=extracted_data&limit=5"
+    ).get_json()["items"]
+    assert full[0]["extracted_data"]["policyId"].startswith("P-")
+    assert client.get("/api/documents/?include=filename").status_code == 400
+
+
+def test_detail_returns_the_full_document(client):
+    _add_documents(1)
+    document = client.get("/api/documents/1").get_json()
+    assert document["extracted_data"] == {"policyId": "P-0000"}
+    assert document["ai_action_items"] == ["Call client"]
+    assert client.get("/api/documents/99").status_code == 404
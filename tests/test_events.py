@@ -0,0 +1,79 @@
+from src.micro_automator.events import EventBroker
+from src.micro_automator.extensions import db, event_broker
+from src.micro_automator.views.events import stream_events
+
+
+def test_reconnect_replays_events_after_last_event_id():
+    broker = EventBroker()
+    first = broker.publish("client.created", {"clientId": 1})
+    second = broker.publish("follow_up.created", {"id": 7})
+
+    subscription = broker.subscribe(last_event_id=first["id"])
+    assert [evt["id"] for evt in subscription.replay] == [second["id"]]
+    assert not subscription.resync
+
+    broker.publish("client.deleted", {"clientId": 1})
+    assert subscription.get(timeout=1)["type"] == "client.deleted"
+
+
+def test_unknown_last_event_id_asks_for_resync():
+    broker = EventBroker()
+    evt = broker.publish("client.created", {"clientId": 1})
+    assert broker.subscribe(last_event_id=1).resync
+    # An id this broker never issued, e.g. from another deployment's sequence
+    assert broker.subscribe(last_event_id=evt["id"] + 10).resync
+
+
+def test_slow_subscriber_is_flagged_instead_of_blocking():
+    broker = EventBroker()
+    broker.subscriber_queue_size = 1
+    subscription = broker.subscribe()
+    broker.publish("a")
+    broker.publish("b")
+    assert subscription.overflowed
+
+
+def test_events_are_published_only_after_commit(app):
+    subscription = event_broker.subscribe()
+    try:
+        event_broker.publish_after_commit(
+            db.session(), "client.created", {"clientId": 1}
+        )
+        db.session.rollback()
+        event_broker.publish_after_commit(
+            db.session(), "client.created", {"clientId": 2}
+        )
+        db.session.commit()
+        evt = subscription.get(timeout=1)
+        assert evt["data"] == {"clientId": 2}
+        assert subscription._queue.empty()
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+def test_stream_replays_backlog_in_sse_format(app, client):
+    app.config["SSE_MAX_STREAM_SECONDS"] = 0
+    first = event_broker.publish("client.created", {"clientId": 1})
+    second = event_broker.publish(
+        "client.status_changed", {"clientId": 1, "to": "Active"}
+    )
+
+    response = client.get(
+        "/api/events/stream", headers={"Last-Event-ID": str(first["id"])}
+    )
+    body = response.get_data(as_text=True)
+    assert response.mimetype == "text/event-stream"
+    assert body.startswith("retry: ")
+    assert f"id: {second['id']}\nevent: client.status_changed\n" in body
+    assert f"id: {first['id']}\n" not in body
+
+
+def test_stream_subscribes_only_once_iterated(app):
+    subscribers = event_broker.subscriber_count
+    with app.test_request_context("/api/events/stream"):
+        response = stream_events()
+    assert event_broker.subscriber_count == subscribers
+    next(response.response)
+    assert event_broker.subscriber_count == subscribers + 1
+    response.close()
+    assert event_broker.subscriber_count == subscribers
@@ -0,0 +1,85 @@
+import os
+import time
+
+from conftest import TestConfig
+
+from src.micro_automator.app import create_app
+from src.micro_automator.extensions import db
+from src.micro_automator.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1)
+    )
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/a"} 2' in text
+
+
+def _metrics_app(tmp_path, **settings):
+    class MetricsConfig(TestConfig):
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+
+    for name, value in settings.items():
+        setattr(MetricsConfig, name, value)
+    app = create_app(MetricsConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_requests_are_timed_and_their_queries_counted(tmp_path):
+    client = _metrics_app(tmp_path, METRICS_TOKEN="scrape").test_client()
+    response = client.get("/api/clients/")
+    assert "queries" in response.headers["Server-Timing"]
+
+    assert client.get("/metrics").status_code == 401
+    text = client.get("/metrics", headers={"Authorization": "Bearer scrape"}).get_data(
+        as_text=True
+    )
+    assert (
+        'http_requests_total{method="GET",route="/api/clients/",status="200"}' in text
+    )
+    assert 'http_request_db_queries_count{route="/api/clients/"}' in text
+    assert "db_pool_connections" in text
+
+
+def test_metrics_are_not_served_without_a_token_or_allowlist(client, tmp_path):
+    assert client.get("/metrics").status_code == 404
+
+    allowed = _metrics_app(
+        tmp_path, METRICS_ALLOWED_NETWORKS=("10.0.0.0/8",)
+    ).test_client()
+    assert (
+        allowed.get("/metrics", environ_base={"REMOTE_ADDR": "10.1.2.3"}).status_code
+        == 200
+    )
+    assert (
+        allowed.get("/metrics", environ_base={"REMOTE_ADDR": "192.0.2.1"}).status_code
+        == 401
+    )
+
+
+def test_slow_requests_write_a_sampled_profile(tmp_path):
+    class ProfiledConfig(TestConfig):
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+        PROFILER_ENABLED = True
+        PROFILER_SAMPLE_RATE = 1.0
+        PROFILER_THRESHOLD_MS = 10
+        PROFILER_FOLDER = str(tmp_path / "profiles")
+
+    app = create_app(ProfiledConfig)
+    app.add_url_rule("/slow", "slow", lambda: time.sleep(0.1) or "done")
+    assert app.test_client().get("/slow").status_code == 200
+
+    [profile] = os.listdir(tmp_path / "profiles")
+    assert "slow" in profile and profile.endswith(".folded")
+    assert (
+        "<lambda> (test_instrumentation.py"
+        in (tmp_path / "profiles" / profile).read_text()
+    )
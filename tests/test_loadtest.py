@@ -0,0 +1,48 @@
+import json
+
+from benchmarks.loadtest.runner import compare, percentile
+from benchmarks.loadtest.stubs import Latency, StubModel, use_stubbed_extraction
+from src.micro_automator.extensions import document_pipeline
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) is None
+
+
+def test_compare_flags_latency_and_error_regressions():
+    row = {"p95Ms": 100.0, "errors": 0}
+    baseline = {"endpoints": {"clients.list": row, "audits.page": row}}
+    current = {
+        "endpoints": {
+            "clients.list": {"p95Ms": 150.0, "errors": 0},
+            "audits.page": {"p95Ms": 90.0, "errors": 2},
+        }
+    }
+    _, regressions = compare(baseline, current, threshold=0.2)
+    assert sorted(regressions) == ["audits.page", "clients.list"]
+
+
+def test_stub_model_answers_statement_prompts_with_the_listed_transactions():
+    model = StubModel("gemini-2.5-flash", Latency())
+    prompt = "Act as an expert data entry clerk ...\n---\n2024-08-15 5250.00 POL-987654 Premium Payment\n---"
+    [transaction] = json.loads(model.generate_content(prompt).text)
+    assert transaction == {
+        "transaction_date": "2024-08-15",
+        "amount": 5250.0,
+        "reference_id": "POL-987654",
+        "description": "Premium Payment",
+    }
+
+
+def test_stubbed_app_extracts_on_threads(app):
+    # Config defaults to a process pool, which would not see the in-process stubs
+    app.config["DOCUMENT_PIPELINE_MODE"] = "staged"
+    try:
+        use_stubbed_extraction(app)
+        assert document_pipeline.extract.kind == "thread"
+    finally:
+        for stage in document_pipeline.stages.values():
+            stage.shutdown()
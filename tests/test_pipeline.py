@@ -0,0 +1,145 @@
+import io
+import json
+import os
+import threading
+import types
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from conftest import TestConfig
+
+from src.micro_automator import extraction, llm
+from src.micro_automator.app import create_app
+from src.micro_automator.extensions import db, document_pipeline
+from src.micro_automator.metrics import MetricsRegistry
+from src.micro_automator.models import Client, Document
+from src.micro_automator.pipeline import PipelineFull, Stage, StageMetrics
+
+
+class FakeModel:
+    def __init__(self, name, **kwargs):
+        pass
+
+    def generate_content(self, prompt):
+        name = "Asha Rao" if "Asha" in prompt else "Vikram Shah"
+        return types.SimpleNamespace(
+            text=json.dumps(
+                {
+                    "extraction": {"name": name, "policyId": "TRTL-LIFE-6969"},
+                    "analysis": {
+                        "summary": "A welcome kit.",
+                        "category": "New Policy Document",
+                    },
+                }
+            )
+        )
+
+
+@pytest.fixture
+def fake_extraction(monkeypatch):
+    monkeypatch.setattr(llm, "_genai", types.SimpleNamespace(GenerativeModel=FakeModel))
+    monkeypatch.setattr(
+        extraction, "image_text", lambda data: data.decode(errors="ignore")
+    )
+
+
+def test_stage_rejects_work_beyond_its_queue():
+    registry = MetricsRegistry()
+    stage = Stage("extract", "thread", workers=1, queue_size=1, submit_timeout=0.05)
+    stage.metrics = StageMetrics(registry, lambda: {"extract": stage})
+    release = threading.Event()
+
+    running = stage.submit(release.wait, 5)
+    queued = stage.submit(lambda: "done")
+    with pytest.raises(PipelineFull):
+        stage.submit(lambda: "rejected")
+    assert 'pipeline_stage_tasks{stage="extract",state="queued"} 1' in registry.render()
+
+    release.set()
+    assert running.result(5) and queued.result(5) == "done"
+    stage.shutdown()
+    assert stage.in_flight == 0
+    assert (
+        registry.get("pipeline_stage_tasks_total").get(stage="extract", outcome="ok")
+        == 2
+    )
+    assert registry.get("pipeline_stage_rejected_total").get(stage="extract") == 1
+
+
+def test_bulk_upload_runs_each_file_through_the_stages(app, client, fake_extraction):
+    response = client.post(
+        "/api/documents/process-bulk",
+        data={
+            "documents": [
+                (io.BytesIO(b"Welcome Kit for Asha"), "asha.png", "image/png"),
+                (io.BytesIO(b"Welcome Kit for Vikram"), "vikram.png", "image/png"),
+                (io.BytesIO(b"plain text"), "notes.txt", "text/plain"),
+            ]
+        },
+        content_type="multipart/form-data",
+    )
+
+    body = response.get_json()
+    assert response.status_code == 200 and body["processed"] == 2
+    assert [item["filename"] for item in body["items"]] == [
+        "asha.png",
+        "vikram.png",
+        "notes.txt",
+    ]
+    assert body["items"][2] == {
+        "status": "error",
+        "message": "Unsupported file type",
+        "filename": "notes.txt",
+    }
+    assert {c.name for c in Client.query} == {"Asha Rao", "Vikram Shah"}
+    assert Document.query.count() == 2
+    # The uploaded image doubles as the client's photo
+    assert Client.query.filter_by(name="Asha Rao").one().photo_url.endswith(".bin")
+
+
+def test_staged_pipeline_processes_an_upload_on_worker_threads(
+    tmp_path, fake_extraction
+):
+    class StagedConfig(TestConfig):
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+        DOCUMENT_PIPELINE_MODE = "staged"
+        DOCUMENT_EXTRACT_EXECUTOR = "thread"
+
+    app = create_app(StagedConfig)
+    with app.app_context():
+        db.create_all()
+        try:
+            response = app.test_client().post(
+                "/api/documents/process",
+                data={
+                    "document": (
+                        io.BytesIO(b"Welcome Kit for Asha"),
+                        "asha.png",
+                        "image/png",
+                    ),
+                },
+                content_type="multipart/form-data",
+            )
+            assert response.status_code == 200
+            assert response.get_json()["data"]["extracted_data"]["name"] == "Asha Rao"
+            assert Client.query.filter_by(name="Asha Rao").one().status == "Active"
+            assert not document_pipeline.inline
+            assert all(
+                stage.kind == "thread" for stage in document_pipeline.stages.values()
+            )
+        finally:
+            for stage in document_pipeline.stages.values():
+                stage.shutdown()
+            db.session.remove()
+            db.drop_all()
+
+
+def test_process_stage_recovers_when_a_worker_dies():
+    stage = Stage("extract", "process", workers=1, queue_size=1, submit_timeout=1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            stage.run(os._exit, 1)
+        assert stage.run(abs, -3) == 3
+        assert stage.in_flight == 0
+    finally:
+        stage.shutdown()
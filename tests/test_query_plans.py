@@ -0,0 +1,132 @@
+"""
+Query-plan regression tests: runs each endpoint against seeded data, captures the
+SELECTs it issues and fails if EXPLAIN shows a sequential scan on a hot table.
+"""
+
+import json
+import re
+from contextlib import contextmanager
+
+import pytest
+from conftest import TestConfig
+from sqlalchemy import event
+
+from benchmarks.loadtest.seed import seed_database
+from src.micro_automator.app import create_app
+from src.micro_automator.extensions import db
+from src.micro_automator.services import sweep_renewal_reminders
+
+HOT_TABLES = {
+    "client",
+    "follow_up",
+    "form",
+    "document",
+    "reminder",
+    "audit_log",
+    "transaction",
+}
+
+# (path, tables a full scan is expected on)
+ENDPOINTS = [
+    # The unfiltered list and name search return or test every client
+    ("/api/clients/", {"client"}),
+    ("/api/clients/?search=Iyer", {"client"}),
+    ("/api/dashboard/stats", set()),
+    ("/api/dashboard/todays-follow-ups", set()),
+    # Recent clients walk the primary key backwards under a LIMIT, which SQLite
+    # also reports as a SCAN
+    ("/api/dashboard/snapshot", {"client"}),
+    ("/api/documents/", set()),
+    ("/api/documents/?category=Policy Renewal,KYC Document&since=2026-01-01", set()),
+    ("/api/documents/3", set()),
+    ("/api/documents/search?q=TRTL-LIFE-000042", set()),
+    ("/api/audits/?limit=100", set()),
+    ("/api/audits/?eventType=client_created,login&limit=50", set()),
+    ("/api/reconciliation/batches/2", set()),
+]
+
+SQLITE_SCAN = re.compile(r'^SCAN "?(\w+)"?(?: AS \w+)?$')
+
+
+@pytest.fixture(scope="module")
+def seeded_app():
+    # Seeding takes a moment, so the read-only tests here share one database
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed_database(clients=600, seed=7)
+        # Give the planner real statistics, as production would have
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def captured_selects():
+    statements = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.setdefault(statement, parameters)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+
+def sequential_scans(statement, parameters):
+    """Tables the database would read in full to answer `statement`."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).all()
+            return {m.group(1) for row in rows if (m := SQLITE_SCAN.match(row[3]))}
+
+        # Small seeded tables make a Seq Scan the cheapest plan even with a usable index;
+        # with seq scans disabled, one only shows up when there is no alternative
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        ).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        tables, nodes = set(), [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                tables.add(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return tables
+
+
+def assert_indexed(statements, allowed=frozenset()):
+    assert statements, "no queries were captured"
+    for statement, parameters in statements.items():
+        scanned = (sequential_scans(statement, parameters) & HOT_TABLES) - allowed
+        assert not scanned, (
+            f"Sequential scan on {', '.join(sorted(scanned))} for:\n{statement}"
+        )
+
+
+@pytest.mark.parametrize(
+    "path, allowed", ENDPOINTS, ids=[path for path, _ in ENDPOINTS]
+)
+def test_endpoint_queries_use_indexes(seeded_app, path, allowed):
+    client = seeded_app.test_client()
+    with captured_selects() as statements:
+        response = client.get(path)
+        response.get_data()  # streamed bodies run their queries while being read
+    assert response.status_code == 200
+    assert_indexed(statements, allowed)
+
+
+def test_renewal_sweep_uses_indexes(seeded_app):
+    # Not the dispatcher's claim: SQLite costs its OR over a bound LIMIT as a full scan
+    # at this size, while PostgreSQL answers it with a bitmap OR on ix_reminder_status_due_at
+    with captured_selects() as statements:
+        sweep_renewal_reminders()
+    assert_indexed(statements)
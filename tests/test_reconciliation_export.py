@@ -0,0 +1,101 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from src.micro_automator import reconciliation_export
+from src.micro_automator.extensions import db
+from src.micro_automator.models import ReconciliationBatch, Transaction
+
+
+def add_batch(timestamp, rows):
+    batch = ReconciliationBatch(timestamp=timestamp)
+    db.session.add(batch)
+    db.session.flush()
+    for source, amount, status in rows:
+        db.session.add(
+            Transaction(
+                batch_id=batch.id,
+                source=source,
+                transaction_date=timestamp.date(),
+                amount=amount,
+                status=status,
+            )
+        )
+    db.session.commit()
+    return batch
+
+
+def test_monthly_analytics_without_pyarrow(client, monkeypatch):
+    def missing():
+        raise reconciliation_export.AnalyticsUnavailable(
+            "Reconciliation analytics need pyarrow."
+        )
+
+    monkeypatch.setattr(reconciliation_export, "_require_pyarrow", missing)
+    assert (
+        client.get("/api/reconciliation/analytics/monthly?since=2026-13").status_code
+        == 400
+    )
+    response = client.get("/api/reconciliation/analytics/monthly")
+    assert response.status_code == 501
+    assert "pyarrow" in response.get_json()["message"]
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_export_appends_new_batches_and_aggregates(app, client, export_format):
+    pytest.importorskip("pyarrow")
+    folder = app.config["ANALYTICS_EXPORT_FOLDER"]
+    add_batch(
+        datetime(2026, 1, 10),
+        [
+            ("bank_statement", 100.0, "matched"),
+            ("policy_log", 100.0, "matched"),
+            ("bank_statement", 40.0, "unmatched"),
+        ],
+    )
+    add_batch(
+        datetime(2026, 2, 3),
+        [("bank_statement", 75.5, "unmatched"), ("policy_log", 60.0, "reconciled")],
+    )
+
+    first = reconciliation_export.export_transactions(
+        db.session, folder, export_format, chunk_size=2
+    )
+    assert first["transactions"] == 5
+    assert first["files"] == [
+        f"month=2026-01/part-0000000001.{reconciliation_export.FORMATS[export_format][1]}",
+        f"month=2026-02/part-0000000001.{reconciliation_export.FORMATS[export_format][1]}",
+    ]
+
+    add_batch(datetime(2026, 2, 20), [("policy_log", 10.0, "unmatched")])
+    # A batch still inside the settle window waits for the next run
+    add_batch(
+        datetime.now(UTC).replace(tzinfo=None), [("policy_log", 999.0, "unmatched")]
+    )
+    second = reconciliation_export.export_transactions(
+        db.session, folder, export_format
+    )
+    assert second["transactions"] == 1 and second["lastBatchId"] == 3
+
+    response = client.get(
+        "/api/reconciliation/analytics/monthly?since=2026-01&until=2026-02"
+    )
+    months = response.get_json()["months"]
+    assert [m["month"] for m in months] == ["2026-01", "2026-02"]
+    january, february = months
+    assert january["transactions"] == 3 and january["matchRate"] == pytest.approx(
+        2 / 3, abs=1e-4
+    )
+    assert january["unmatchedAmount"] == 40.0
+    assert january["bySource"]["bank_statement"] == {
+        "transactions": 2,
+        "amount": 140.0,
+        "unmatchedAmount": 40.0,
+    }
+    assert february["transactions"] == 3 and february["matched"] == 1
+    assert february["unmatchedAmount"] == 85.5
+
+    only_february = client.get(
+        "/api/reconciliation/analytics/monthly?since=2026-02"
+    ).get_json()["months"]
+    assert [m["month"] for m in only_february] == ["2026-02"]
@@ -0,0 +1,67 @@
+import re
+
+from src.micro_automator.redaction import (
+    DEFAULT_PATTERNS,
+    Redactor,
+    default_redactor,
+    restore,
+)
+from src.micro_automator.services import redact_pii
+
+SAMPLE = (
+    "Name: Priya Sharma, email priya.sharma@example.co.in, Aadhaar 1234 5678 9012, "
+    "PAN ABCDE1234F. Mobile +91 9876543210, A/C 001234567890123 IFSC HDFC0001234. "
+    "Policy TRTL-LIFE-6969 premium 22222.00"
+)
+
+
+def _legacy(text):
+    text = re.sub(
+        r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[REDACTED_EMAIL]", text
+    )
+    text = re.sub(r"\b\d{4}\s\d{4}\s\d{4}\b", "[REDACTED_AADHAAR]", text)
+    return re.sub(r"\b[A-Z]{5}[0-9]{4}[A-Z]{1}\b", "[REDACTED_PAN]", text)
+
+
+def test_all_pattern_kinds_are_redacted_in_one_pass():
+    redacted = redact_pii(SAMPLE)
+    for kind in ("EMAIL", "AADHAAR", "PAN", "PHONE", "ACCOUNT", "IFSC"):
+        assert f"[REDACTED_{kind}]" in redacted
+    assert "TRTL-LIFE-6969" in redacted and "22222.00" in redacted
+
+
+def test_matches_legacy_output_for_the_original_patterns():
+    redactor = Redactor(
+        [p for p in DEFAULT_PATTERNS if p.name in ("EMAIL", "AADHAAR", "PAN")]
+    )
+    assert redactor.redact(SAMPLE) == _legacy(SAMPLE)
+
+
+def test_stream_handles_every_chunk_boundary():
+    expected = default_redactor.redact(SAMPLE * 3)
+    text = SAMPLE * 3
+    for size in (1, 7, 64, 500):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        assert "".join(default_redactor.redact_stream(chunks)) == expected
+
+
+def test_spans_reverse_the_redaction():
+    redacted, spans = default_redactor.redact(SAMPLE, with_spans=True)
+    assert restore(redacted, spans) == SAMPLE
+    assert [s.kind for s in spans][:3] == ["EMAIL", "AADHAAR", "PAN"]
+
+    streamed_spans = []
+    text = "".join(
+        default_redactor.redact_stream(
+            [SAMPLE[:100], SAMPLE[100:]], spans=streamed_spans
+        )
+    )
+    assert streamed_spans == spans and text == redacted
+
+
+def test_long_email_local_parts_are_redacted():
+    text = f"Reach me at {'a' * 70}@example.com today"
+    assert redact_pii(text) == "Reach me at [REDACTED_EMAIL] today"
+    assert "".join(
+        default_redactor.redact_stream([text[:40], text[40:]])
+    ) == redact_pii(text)
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from src.micro_automator.extensions import db
+from src.micro_automator.models import Client, Reminder
+from src.micro_automator.services import (
+    _insert_ignoring_duplicates,
+    schedule_renewal_reminder,
+    sweep_renewal_reminders,
+)
+
+TODAY = date(2026, 10, 1)
+
+
+def _seed_book(count):
+    for i in range(count):
+        db.session.add(
+            Client(
+                name=f"Client {i}",
+                policy_id=f"POL-{i}",
+                expiration_date=TODAY + timedelta(days=i),
+            )
+        )
+    # Outside the 30 day window
+    db.session.add(Client(name="Later", expiration_date=TODAY + timedelta(days=90)))
+    db.session.commit()
+
+
+def test_sweep_creates_missing_reminders_with_constant_queries(app):
+    _seed_book(20)
+    statements = []
+
+    def listener(conn, cursor, stmt, params, ctx, many):
+        statements.append(stmt)
+
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        report = sweep_renewal_reminders(window_days=30, days_before=15, today=TODAY)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert report["created"] == 20
+    assert Reminder.query.count() == 20
+    # clients + existing reminders + bulk insert + summary audit row
+    assert len(statements) <= 4
+
+
+def test_second_sweep_is_idempotent(app):
+    _seed_book(5)
+    sweep_renewal_reminders(today=TODAY)
+    report = sweep_renewal_reminders(today=TODAY)
+    assert report["created"] == 0
+    assert report["alreadyScheduled"] == 5
+
+
+def test_single_client_scheduling_uses_the_unique_key(app):
+    _seed_book(1)
+    client = Client.query.filter_by(name="Client 0").first()
+    sweep_renewal_reminders(today=TODAY)
+    client.policy_id = "POL-RENAMED"
+    # A changed message no longer sneaks a duplicate past the check
+    assert schedule_renewal_reminder(client) is None
+
+
+def test_created_count_leaves_out_rows_a_concurrent_sweep_inserted(app):
+    _seed_book(2)
+    sweep_renewal_reminders(today=TODAY)
+    existing = Reminder.query.first()
+    client = Client(name="New", expiration_date=TODAY)
+    db.session.add(client)
+    db.session.flush()
+    rows = [
+        {
+            "client_id": client_id,
+            "message": "Renew.",
+            "due_at": existing.due_at,
+            "status": "pending",
+            "kind": "renewal",
+        }
+        for client_id in (existing.client_id, client.id)
+    ]
+    assert (
+        _insert_ignoring_duplicates(Reminder, rows, ["client_id", "due_at", "kind"])
+        == 1
+    )
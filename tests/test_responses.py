@@ -0,0 +1,119 @@
+import gzip
+import json
+from datetime import date, datetime
+
+from src.micro_automator.extensions import db
+from src.micro_automator.models.document import Document
+from src.micro_automator.models.reconciliation import ReconciliationBatch, Transaction
+from src.micro_automator.responses import (
+    IsoJSONProvider,
+    OrjsonProvider,
+    _compress_response,
+    orjson,
+    stream_json_array,
+)
+
+
+def _add_documents(count):
+    for i in range(count):
+        db.session.add(
+            Document(
+                filename=f"policy-{i}.pdf",
+                extracted_data={"policyId": f"P-{i:04d}", "notes": "x" * 200},
+            )
+        )
+    db.session.commit()
+
+
+def test_large_json_is_gzipped_when_accepted(client):
+    _add_documents(20)
+    plain = client.get("/api/documents/?include=extracted_data")
+    compressed = client.get(
+        "/api/documents/?include=extracted_data", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert gzip.decompress(compressed.data) == plain.data
+    assert len(json.loads(plain.data)) == 20
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_streamed_array_is_valid_json_across_batches(app):
+    rows = [{"id": i, "at": datetime(2024, 1, 1, 9, 30)} for i in range(7)]
+    with app.test_request_context():
+        body = b"".join(stream_json_array(rows, batch_size=3).response)
+    assert json.loads(body) == [
+        {"id": i, "at": "2024-01-01T09:30:00"} for i in range(7)
+    ]
+
+
+def test_streamed_rows_compress_like_a_buffered_body(app):
+    app.config["COMPRESS_STREAM_FLUSH_SECONDS"] = 60
+    rows = [
+        {"id": i, "status": "unmatched", "source": "bank_statement"}
+        for i in range(2000)
+    ]
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = _compress_response(stream_json_array(rows, batch_size=10))
+        streamed = b"".join(response.response)
+    body = json.dumps(rows, separators=(",", ":")).encode() + b"\n"
+    assert gzip.decompress(streamed) == body
+    assert len(streamed) < 1.2 * len(gzip.compress(body))
+
+
+def test_compressed_snapshot_still_revalidates(app, client):
+    app.config["COMPRESS_MIN_SIZE"] = 0
+    headers = {"Accept-Encoding": "gzip"}
+    etag = client.get("/api/dashboard/snapshot", headers=headers).headers["ETag"]
+    assert etag.startswith("W/")
+    assert (
+        client.get(
+            "/api/dashboard/snapshot", headers={**headers, "If-None-Match": etag}
+        ).status_code
+        == 304
+    )
+
+
+def test_json_providers_write_the_same_dates(app):
+    payload = {"b": datetime(2024, 1, 1, 9, 30, 15, 250), "a": date(2024, 1, 2)}
+    expected = {"b": "2024-01-01T09:30:15.000250", "a": "2024-01-02"}
+    assert json.loads(IsoJSONProvider(app).dumps(payload)) == expected
+    if orjson is not None:
+        assert json.loads(OrjsonProvider(app).dumps(payload)) == expected
+
+
+def test_batch_details_stream_unmatched_transactions(client):
+    batch = ReconciliationBatch()
+    db.session.add(batch)
+    db.session.flush()
+    for i, (source, status) in enumerate(
+        [
+            ("bank_statement", "unmatched"),
+            ("policy_log", "unmatched"),
+            ("bank_statement", "matched"),
+            ("policy_log", "matched"),
+        ]
+    ):
+        db.session.add(
+            Transaction(
+                batch_id=batch.id,
+                source=source,
+                status=status,
+                amount=100.0 + i,
+                transaction_date=date(2026, 1, 1),
+            )
+        )
+    db.session.commit()
+
+    response = client.get(f"/api/reconciliation/batches/{batch.id}")
+    assert response.is_streamed
+    body = response.get_json()
+    assert body["matchedCount"] == 1
+    assert [t["amount"] for t in body["exceptions"]["bank"]] == [100.0]
+    assert [t["amount"] for t in body["exceptions"]["policy"]] == [101.0]
@@ -0,0 +1,86 @@
+import zlib
+
+from src.micro_automator.extensions import db
+from src.micro_automator.models import Client, Document
+from src.micro_automator.search import fts5_query
+
+POLICY_TEXT = (
+    "WELCOME KIT\nPolicy Number: TRTL-LIFE-6969\nPlan: SecureLife Term Plan\n"
+    "Nominee: Asha Sharma\nAnnual premium of Rs 22,222 due every April.\n"
+)
+
+
+def _add(filename, text=None, policy_id=None, summary=None, client=None):
+    document = Document(
+        filename=filename,
+        extracted_text=text,
+        ai_summary=summary,
+        client=client,
+        extracted_data={"policyId": policy_id} if policy_id else None,
+    )
+    db.session.add(document)
+    db.session.commit()
+    return document
+
+
+def test_search_ranks_documents_by_policy_number_and_links_the_client(client):
+    owner = Client(name="Asha Sharma")
+    _add(
+        "kit.pdf",
+        POLICY_TEXT,
+        policy_id="TRTL-LIFE-6969",
+        summary="Welcome kit for a term plan.",
+        client=owner,
+    )
+    _add(
+        "renewal.pdf",
+        "Renewal notice for TRTL-LIFE-7000. Term plan premium due.",
+        policy_id="TRTL-LIFE-7000",
+    )
+    _add("kyc.png", "PAN card scan", summary="KYC document.")
+
+    hits = client.get(
+        "/api/documents/search?q=the policy with TRTL-LIFE-6969"
+    ).get_json()["items"]
+    assert [h["filename"] for h in hits] == ["kit.pdf"]
+    assert hits[0]["client"] == {"id": owner.id, "name": "Asha Sharma"}
+    assert "TRTL-LIFE-6969" in hits[0]["snippet"]
+
+    page = client.get("/api/documents/search?q=term plan&limit=1").get_json()
+    assert len(page["items"]) == 1 and page["nextOffset"] == 1
+    assert (
+        client.get("/api/documents/search?q=term plan&offset=1").get_json()[
+            "nextOffset"
+        ]
+        is None
+    )
+    assert client.get("/api/documents/search").status_code == 400
+
+
+def test_index_follows_updates_and_deletes(client):
+    document = _add("notes.pdf", "Motor comprehensive cover", summary="Car policy")
+    assert client.get("/api/documents/search?q=motor").get_json()["items"]
+
+    document = db.session.get(Document, document.id)
+    document.ai_summary = "Two-wheeler policy"
+    db.session.commit()
+    assert client.get("/api/documents/search?q=wheeler").get_json()["items"]
+
+    db.session.delete(document)
+    db.session.commit()
+    assert client.get("/api/documents/search?q=motor").get_json()["items"] == []
+
+
+def test_extracted_text_is_stored_compressed(app):
+    document = _add("big.pdf", POLICY_TEXT * 50)
+    raw = db.session.execute(
+        db.text("SELECT extracted_text FROM document WHERE id = :id"),
+        {"id": document.id},
+    ).scalar()
+    assert len(raw) < len(POLICY_TEXT * 50) / 10
+    assert zlib.decompress(raw).decode() == POLICY_TEXT * 50
+
+
+def test_fts5_query_quotes_user_input():
+    assert fts5_query("the policy with TRTL-LIFE-6969") == '"policy" "trtl life 6969"'
+    assert fts5_query('NEAR("x" OR *) title:pan') == '"near x" "title pan"'
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from conftest import TestConfig
+from sqlalchemy import inspect
+
+from src.micro_automator.app import create_app
+from src.micro_automator.extensions import db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_app_import_defers_heavy_modules():
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite://",
+        AUDIT_WRITER_MODE="inline",
+        LAZY_IMPORTS="true",
+    )
+    heavy = ("google.generativeai", "fitz", "pytesseract", "pyarrow")
+    code = f"import sys, src.micro_automator.app; print([m for m in {heavy!r} if m in sys.modules])"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_create_app_leaves_schema_to_migrations(tmp_path):
+    TestConfig.UPLOAD_FOLDER = str(tmp_path / "uploads")
+    app = create_app(TestConfig)
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
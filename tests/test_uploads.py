@@ -0,0 +1,63 @@
+import io
+import os
+
+from PIL import Image
+
+from src.micro_automator.extensions import db, upload_store
+from src.micro_automator.models import Client
+
+
+def _jpeg(color=(200, 40, 40), size=(600, 400)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_identical_uploads_are_stored_once_under_their_hash(app):
+    data = _jpeg()
+    name = upload_store.put(data)
+    assert upload_store.put(data) == name
+    assert name.endswith(".jpg") and name[:2] == name[6:8] and name[3:5] == name[8:10]
+
+    files = [f for _, _, fs in os.walk(app.config["UPLOAD_FOLDER"]) for f in fs]
+    # The original plus a WebP and a JPEG thumbnail per configured size
+    assert len(files) == 1 + 2 * len(app.config["UPLOAD_THUMBNAIL_SIZES"])
+    with Image.open(upload_store.path(name.replace(".jpg", "_96.webp"))) as thumbnail:
+        assert thumbnail.format == "WEBP" and max(thumbnail.size) == 96
+
+
+def test_stored_files_are_immutable_revalidatable_and_rangeable(app, client):
+    name = upload_store.put(_jpeg())
+    response = client.get(f"/uploads/{name}")
+    assert response.status_code == 200 and response.mimetype == "image/jpeg"
+    assert response.headers["ETag"] == f'"{name.split("/")[-1][:-4]}"'
+    assert (
+        "immutable" in response.headers["Cache-Control"]
+        and "max-age=31536000" in response.headers["Cache-Control"]
+    )
+
+    assert (
+        client.get(
+            f"/uploads/{name}", headers={"If-None-Match": response.headers["ETag"]}
+        ).status_code
+        == 304
+    )
+    partial = client.get(f"/uploads/{name}", headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206 and partial.data == response.data[:10]
+    assert client.get(f"/uploads/{name[:-4]}_7.webp").status_code == 404
+
+
+def test_client_thumbnail_is_generated_on_demand(app, client):
+    app.extensions["upload_store"].mode = "off"
+    name = upload_store.put(_jpeg(color=(10, 120, 200)))
+    db.session.add(
+        Client(name="Ravi Iyer", photo_url=f"http://localhost/uploads/{name}")
+    )
+    db.session.commit()
+
+    [listed] = client.get("/api/clients/").get_json()
+    assert listed["photoThumbnailUrl"].endswith(name.replace(".jpg", "_96.webp"))
+    assert (
+        client.get(listed["photoThumbnailUrl"].replace("http://localhost", "")).mimetype
+        == "image/webp"
+    )